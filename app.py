@@ -1,8 +1,37 @@
-from flask import Flask, request, jsonify, render_template
-import os, sys, re
-from generate_recipe_gemini_api import generate_recipe
+from flask import Flask, Response, request, jsonify, render_template, stream_with_context, send_file, g
+import os, sys, time
+from recipe_core import generate_recipe, stream_recipe, recipe_flights
+from recipe_parser import IncrementalRecipeParser
+from recipe_batch import run_batch
+from clients import registry
+from resilience import gemini_guard
+from metrics import metrics, CONTENT_TYPE, HTTP_IN_FLIGHT, HTTP_SECONDS
+from image_store import MIMETYPES
+from app_common import (
+    RecipeAPI, STREAM_HEADERS, IMAGE_MAX_AGE_SEC, sse_event, ndjson_line, image_job_dict,
+    valid_image_name, image_cache_control,
+)
 
 app = Flask(__name__)
+# 레시피/이미지 저장소와 이미지 작업 큐, 그리고 라우트 공통 처리 (app_async.py와 같은 코드)
+api = RecipeAPI(recipe_flights)
+api.export_metrics()
+
+def finish_request_metrics(endpoint: str, start: float):
+    HTTP_IN_FLIGHT.dec(endpoint)
+    HTTP_SECONDS.observe(time.perf_counter() - start, endpoint)
+
+@app.before_request
+def track_request_start():
+    g.request_metrics = (request.endpoint or "unknown", time.perf_counter())
+    HTTP_IN_FLIGHT.inc(g.request_metrics[0])
+
+@app.after_request
+def track_request_end(response):
+    # 스트리밍 응답(SSE, NDJSON)은 본문을 모두 보낸 뒤 닫힐 때 기록
+    endpoint, start = g.request_metrics
+    response.call_on_close(lambda: finish_request_metrics(endpoint, start))
+    return response
 
 @app.route("/")
 def index():
@@ -21,119 +50,93 @@ def api_recipe():
     if not dish:
         return jsonify({"error": "No dish parameter provided."}), 400
 
-    full_text = generate_recipe(dish)
-    if full_text.startswith("Error"):
-        return jsonify({"error": full_text}), 500
+    body, status, headers = api.recipe_result(dish, generate_recipe(dish))
+    return jsonify(body), status, headers
 
-    def parse_structured_recipe(recipe_text: str) -> dict:
-        parsed_data = {"dish_name": dish, "tools": [], "ingredients": [], "steps": [], "tips": ""}
+@app.route("/api/recipe/stream")
+def api_recipe_stream():
+    dish = request.args.get("dish", "").strip()
+    if not dish:
+        return jsonify({"error": "No dish parameter provided."}), 400
+
+    def events():
+        # 토큰 스트림을 줄 단위로 파싱해서 재료/도구/단계가 완성되는 즉시 전송
+        parser = IncrementalRecipeParser()
         try:
-            # Tools
-            tools_match = re.search(
-                r"\*\*필요한 도구:\*\*\s*\n(.*?)(?=\n\*\*만드는 단계:\*\*|\Z)",
-                recipe_text, re.DOTALL | re.IGNORECASE
-            )
-            if tools_match:
-                block = tools_match.group(1).strip()
-                parsed_data["tools"] = [
-                    line.strip().lstrip("- ").strip()
-                    for line in block.split("\n") if line.strip().startswith("-")
-                ]
-
-            # Ingredients
-            ingredients_match = re.search(
-                r"\*\*재료:\*\*\s*\n(.*?)(?=\n\*\*필요한 도구:\*\*|\Z)",
-                recipe_text, re.DOTALL | re.IGNORECASE
-            )
-            if ingredients_match:
-                block = ingredients_match.group(1).strip()
-                parsed_data["ingredients"] = [
-                    line.strip().lstrip("- ").strip()
-                    for line in block.split("\n") if line.strip().startswith("-")
-                ]
-
-            # Steps
-            steps_match = re.search(
-                r"\*\*만드는 단계:\*\*\s*\n(.*?)(?=\n\*\*팁:\*\*|\Z)",
-                recipe_text, re.DOTALL | re.IGNORECASE
-            )
-            if steps_match:
-                block = steps_match.group(1).strip()
-                raw = [
-                    line.strip() for line in block.split("\n")
-                    if re.match(r"^\d+\.\s+", line.strip())
-                ]
-                parsed_data["steps"] = [
-                    re.sub(r"^\d+\.\s*", "", s).strip() for s in raw
-                ]
-
-            # Tips
-            tips_match = re.search(r"\*\*팁:\*\*\s*\n(.*?)(?=\Z)", recipe_text, re.DOTALL | re.IGNORECASE)
-            if tips_match:
-                parsed_data["tips"] = tips_match.group(1).strip()
-
-        except:
-            pass
-
-        return parsed_data
-
-    parsed = parse_structured_recipe(full_text)
-    parsed["dish_name"] = dish
-    return jsonify(parsed)
+            for chunk in stream_recipe(dish):
+                for event, data in parser.feed(chunk):
+                    yield sse_event(event, data)
+        except RuntimeError as e:
+            yield sse_event("error", {"error": str(e)})
+            return
+        yield api.finish_stream(dish, parser)
+
+    return Response(stream_with_context(events()), mimetype="text/event-stream", headers=STREAM_HEADERS)
+
+@app.route("/api/recipes/batch", methods=["POST"])
+def api_recipes_batch():
+    dishes, duplicates, error = api.batch_dishes(request.get_json(silent=True) or {})
+    if error:
+        return jsonify(error), 400
+
+    def lines():
+        # 캐시된 레시피가 먼저, 나머지는 생성이 끝나는 순서대로 한 줄씩 전송
+        errors = 0
+        for dish, text, cached in run_batch(dishes):
+            item = api.batch_item(dish, text, cached)
+            errors += item["status"] == "error"
+            yield ndjson_line(item)
+        yield ndjson_line({"done": True, "dishes": len(dishes), "duplicates": duplicates, "errors": errors})
+
+    return Response(stream_with_context(lines()), mimetype="application/x-ndjson", headers=STREAM_HEADERS)
 
 @app.route("/api/image")
 def api_image():
-    dish = request.args.get("dish", "").strip()
-    step_index = request.args.get("step_index", "").strip()
-    if not dish or step_index == "":
-        return jsonify({"error": "Missing parameters."}), 400
-
-    from generate_recipe_gemini_api import generate_recipe
-
-    full_text = generate_recipe(dish)
-    if full_text.startswith("Error"):
-        return jsonify({"error": full_text}), 500
-
-    def parse_structured_recipe(recipe_text: str) -> dict:
-        parsed_data = {"steps": []}
-        try:
-            steps_match = re.search(
-                r"\*\*만드는 단계:\*\*\s*\n(.*?)(?=\n\*\*팁:\*\*|\Z)",
-                recipe_text, re.DOTALL | re.IGNORECASE
-            )
-            if steps_match:
-                block = steps_match.group(1).strip()
-                raw = [
-                    line.strip() for line in block.split("\n")
-                    if re.match(r"^\d+\.\s+", line.strip())
-                ]
-                parsed_data["steps"] = [
-                    re.sub(r"^\d+\.\s*", "", s).strip() for s in raw
-                ]
-        except:
-            pass
-        return parsed_data
-
-    parsed = parse_structured_recipe(full_text)
-    steps = parsed.get("steps", [])
-    try:
-        idx = int(step_index)
-        current_step_desc = steps[idx]
-    except:
-        return jsonify({"error": "Invalid step index."}), 400
-
-    # 실제 AI 이미지 생성 모델 호출
-    try:
-        import generativeai as genai
-        model = genai.GenerativeModel(model_name="models/image-alpha-001")
-        prompt = f"An illustrative photo of how to do step {idx+1} of making {dish}: {current_step_desc}"
-        response = model.generate_image(prompt=prompt, size="512x512")
-        image_url = response.data[0].url
-    except Exception as e:
-        print(f"[Image API Error] {e}")
-        image_url = f"https://via.placeholder.com/300x200?text={dish.replace(' ', '+')}_step{idx+1}"
-
-    return jsonify({"url": image_url})
+    body, status = api.image_result(request.args.get("recipe_id", "").strip(),
+                                    request.args.get("step_index", "").strip())
+    return jsonify(body), status
+
+@app.route("/api/image/jobs/<job_id>")
+def api_image_job(job_id):
+    job, wait, error = api.image_job(job_id, request.args.get("wait"))
+    if error:
+        return jsonify(error[0]), error[1]
+    if wait > 0:
+        job.wait(wait)
+    return jsonify(image_job_dict(job))
+
+@app.route("/images/<name>")
+def serve_image(name):
+    if not valid_image_name(name):
+        return jsonify({"error": "Invalid image name."}), 404
+    requested = name
+    path, variant = api.find_image(name)
+    if variant is not None:
+        name = variant.result()
+        path = api.image_path(name)
+    if path is None:
+        return jsonify({"error": "Image not found."}), 404
+    stem, ext = name.rsplit(".", 1)
+    # conditional=True: If-None-Match → 304, Range → 206
+    response = send_file(path, mimetype=MIMETYPES[ext], conditional=True, etag=stem, max_age=IMAGE_MAX_AGE_SEC)
+    response.headers["Cache-Control"] = image_cache_control(name, requested)
+    return response
+
+@app.route("/api/cache/stats")
+def api_cache_stats():
+    return jsonify(api.cache_stats())
+
+@app.route("/api/clients/stats")
+def api_clients_stats():
+    return jsonify(registry.stats())
+
+@app.route("/metrics")
+def metrics_endpoint():
+    return Response(metrics.render(), content_type=CONTENT_TYPE)
+
+@app.route("/api/resilience/stats")
+def api_resilience_stats():
+    return jsonify({"gemini": gemini_guard.stats()})
 
 if __name__ == "__main__":
     gemini_key = os.getenv("GEMINI_API_KEY")
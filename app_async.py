@@ -0,0 +1,160 @@
+# app_async.py
+#
+# app.py와 같은 라우트를 제공하는 ASGI(Quart) 서버.
+# Gemini 호출을 이벤트 루프에서 기다리므로 요청 하나가 워커 스레드를 잡고 있지 않습니다.
+#   pip install quart hypercorn
+#   hypercorn app_async:app --bind 0.0.0.0:5000
+
+import os, sys, time, asyncio
+from quart import Quart, Response, request, jsonify, render_template, send_file, g
+from recipe_core import generate_recipe_async, stream_recipe_async, recipe_flights_async
+from recipe_parser import IncrementalRecipeParser
+from recipe_batch import run_batch_async
+from clients import registry
+from resilience import gemini_guard
+from metrics import metrics, CONTENT_TYPE, HTTP_IN_FLIGHT, HTTP_SECONDS
+from image_store import MIMETYPES
+from app_common import (
+    RecipeAPI, STREAM_HEADERS, sse_event, ndjson_line, image_job_dict,
+    valid_image_name, image_cache_control,
+)
+
+# 이미지 생성은 동기 SDK뿐이라 image_jobs의 제한된 워커 스레드에서 실행 (이벤트 루프는 짧게 확인하며 대기)
+IMAGE_JOB_POLL_SEC = 0.2
+
+app = Quart(__name__)
+# 레시피/이미지 저장소와 이미지 작업 큐, 그리고 라우트 공통 처리 (app.py와 같은 코드)
+api = RecipeAPI(recipe_flights_async)
+api.export_metrics()
+
+@app.before_request
+async def track_request_start():
+    g.request_metrics = (request.endpoint or "unknown", time.perf_counter())
+    HTTP_IN_FLIGHT.inc(g.request_metrics[0])
+
+@app.after_request
+async def track_request_end(response):
+    # 스트리밍 응답은 본문 전송이 아니라 응답 객체를 돌려준 시점까지 기록됨
+    endpoint, start = g.request_metrics
+    HTTP_IN_FLIGHT.dec(endpoint)
+    HTTP_SECONDS.observe(time.perf_counter() - start, endpoint)
+    return response
+
+@app.route("/")
+async def index():
+    return await render_template("index.html")
+
+@app.route("/recipe")
+async def recipe_page():
+    dish = request.args.get("dish", "")
+    if not dish:
+        return await render_template("index.html")
+    return await render_template("recipe.html", dish=dish)
+
+@app.route("/api/recipe")
+async def api_recipe():
+    dish = request.args.get("dish", "").strip()
+    if not dish:
+        return jsonify({"error": "No dish parameter provided."}), 400
+
+    body, status, headers = api.recipe_result(dish, await generate_recipe_async(dish))
+    return jsonify(body), status, headers
+
+@app.route("/api/recipe/stream")
+async def api_recipe_stream():
+    dish = request.args.get("dish", "").strip()
+    if not dish:
+        return jsonify({"error": "No dish parameter provided."}), 400
+
+    async def events():
+        parser = IncrementalRecipeParser()
+        try:
+            async for chunk in stream_recipe_async(dish):
+                for event, data in parser.feed(chunk):
+                    yield sse_event(event, data)
+        except RuntimeError as e:
+            yield sse_event("error", {"error": str(e)})
+            return
+        yield api.finish_stream(dish, parser)
+
+    response = Response(events(), mimetype="text/event-stream", headers=STREAM_HEADERS)
+    response.timeout = None
+    return response
+
+@app.route("/api/recipes/batch", methods=["POST"])
+async def api_recipes_batch():
+    dishes, duplicates, error = api.batch_dishes(await request.get_json(silent=True) or {})
+    if error:
+        return jsonify(error), 400
+
+    async def lines():
+        # 캐시된 레시피가 먼저, 나머지는 생성이 끝나는 순서대로 한 줄씩 전송
+        errors = 0
+        async for dish, text, cached in run_batch_async(dishes):
+            item = api.batch_item(dish, text, cached)
+            errors += item["status"] == "error"
+            yield ndjson_line(item)
+        yield ndjson_line({"done": True, "dishes": len(dishes), "duplicates": duplicates, "errors": errors})
+
+    response = Response(lines(), mimetype="application/x-ndjson", headers=STREAM_HEADERS)
+    response.timeout = None
+    return response
+
+@app.route("/api/image")
+async def api_image():
+    body, status = api.image_result(request.args.get("recipe_id", "").strip(),
+                                    request.args.get("step_index", "").strip())
+    return jsonify(body), status
+
+@app.route("/api/image/jobs/<job_id>")
+async def api_image_job(job_id):
+    job, wait, error = api.image_job(job_id, request.args.get("wait"))
+    if error:
+        return jsonify(error[0]), error[1]
+    # 스레드를 잡지 않도록 이벤트 루프에서 짧게 확인하며 대기
+    deadline = asyncio.get_running_loop().time() + wait
+    while not job.done.is_set() and asyncio.get_running_loop().time() < deadline:
+        await asyncio.sleep(IMAGE_JOB_POLL_SEC)
+    return jsonify(image_job_dict(job))
+
+@app.route("/images/<name>")
+async def serve_image(name):
+    if not valid_image_name(name):
+        return jsonify({"error": "Invalid image name."}), 404
+    requested = name
+    path, variant = api.find_image(name)
+    if variant is not None:
+        name = await asyncio.wrap_future(variant)
+        path = api.image_path(name)
+    if path is None:
+        return jsonify({"error": "Image not found."}), 404
+    stem, ext = name.rsplit(".", 1)
+    response = await send_file(path, mimetype=MIMETYPES[ext], add_etags=False)
+    response.set_etag(stem)
+    response.headers["Cache-Control"] = image_cache_control(name, requested)
+    # If-None-Match → 304, Range → 206
+    return await response.make_conditional(request, accept_ranges=True, complete_length=os.path.getsize(path))
+
+@app.route("/api/cache/stats")
+async def api_cache_stats():
+    return jsonify(api.cache_stats())
+
+@app.route("/api/clients/stats")
+async def api_clients_stats():
+    return jsonify(registry.stats())
+
+@app.route("/metrics")
+async def metrics_endpoint():
+    return Response(metrics.render(), content_type=CONTENT_TYPE)
+
+@app.route("/api/resilience/stats")
+async def api_resilience_stats():
+    return jsonify({"gemini": gemini_guard.stats()})
+
+if __name__ == "__main__":
+    gemini_key = os.getenv("GEMINI_API_KEY")
+    gcp_creds = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
+    if not gemini_key or not gcp_creds:
+        print("Error: Required environment variables not set.")
+        sys.exit(1)
+    app.run(host="0.0.0.0", port=5000)
@@ -0,0 +1,217 @@
+# app_common.py
+#
+# app.py(Flask)와 app_async.py(Quart)가 함께 쓰는 요청/응답 처리.
+# 두 앱은 Gemini 호출을 기다리는 방식과 응답 객체를 만드는 방식만 다르고,
+# 검증/파싱/저장/이미지 작업/통계는 모두 여기 있는 한 벌의 코드를 사용합니다.
+
+import json
+import functools
+from recipe_core import generate_step_image, placeholder_image_url, recipe_cache, GEMINI_OVERLOADED_ERROR
+from recipe_parser import parse_structured_recipe
+from recipe_store import RecipeStore
+from recipe_batch import BATCH_MAX_DISHES, dedupe_dishes
+from resilience import gemini_guard
+from metrics import export_stats, STAGE_SECONDS
+from image_jobs import ImageJobQueue
+from image_store import ImageStore, NAME_RE
+from image_variants import VariantBuilder, VARIANT_RE, srcset
+
+STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+# 최대 대기 시간(초)을 주면 작업이 끝날 때까지 기다렸다가 응답 (long polling)
+IMAGE_JOB_MAX_WAIT_SEC = 25
+# 이미지 이름이 내용의 해시라 바뀌지 않으므로 브라우저가 재검증 없이 1년간 캐시
+IMAGE_MAX_AGE_SEC = 365 * 24 * 3600
+
+
+def sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def ndjson_line(data: dict) -> str:
+    return json.dumps(data, ensure_ascii=False) + "\n"
+
+
+def image_job_dict(job) -> dict:
+    data = job.to_dict()
+    sets = srcset(job.url)
+    if sets:
+        data["srcset"] = sets
+    return data
+
+
+def valid_image_name(name: str) -> bool:
+    return bool(NAME_RE.match(name) or VARIANT_RE.match(name))
+
+
+def image_cache_control(name: str, requested: str) -> str:
+    if name == requested:
+        return f"public, max-age={IMAGE_MAX_AGE_SEC}, immutable"
+    # 대신 보낸 원본은 변형 URL에 오래 캐시되지 않도록
+    return "no-cache"
+
+
+class RecipeAPI:
+    """
+    State and request handling behind the web routes: the recipe store, the
+    local image store and its variants, and the background image job queue.
+    Methods take values already read from the request and return plain data
+    (JSON bodies as dicts, with a status code where it can fail), so the
+    Flask and Quart apps only differ in how they wait and build responses.
+    `flights` is the app's recipe SingleFlight, reported in the stats.
+    """
+
+    def __init__(self, flights):
+        self.flights = flights
+        self.recipe_store = RecipeStore()
+        self.image_store = ImageStore()
+        # 작은 화면용 WebP/JPEG 변형은 처음 요청될 때 만들어 원본 옆에 저장
+        self.image_variants = VariantBuilder(self.image_store)
+        # 레시피를 보내는 즉시 모든 단계 이미지를 백그라운드에서 생성 (현재 단계부터)
+        self.image_jobs = ImageJobQueue(
+            functools.partial(generate_step_image, store=self.image_store), fallback=placeholder_image_url
+        )
+
+    def export_metrics(self):
+        # ——— 지표 (/metrics) ———
+        # 모듈마다 이미 세고 있는 통계는 /metrics를 읽을 때 가져옴
+        export_stats("aichef_recipe_cache", "Recipe cache", recipe_cache.stats,
+                     counters=("memory_hits", "disk_hits", "misses", "stores", "expired"),
+                     gauges=("memory_bytes", "disk_bytes"))
+        export_stats("aichef_recipe_singleflight", "Recipe requests sharing one Gemini call", self.flights.stats,
+                     counters=("executions", "coalesced"), gauges=("in_flight",))
+        export_stats("aichef_gemini_guard", "Gemini rate limiter, retries and circuit breaker", gemini_guard.stats,
+                     counters=("attempts", "retries", "rejected_rate_limited", "rejected_circuit_open", "gave_up"))
+        export_stats("aichef_image_jobs", "Background step image generation", self.image_jobs.stats,
+                     counters=("enqueued", "completed", "fallbacks"), gauges=("queued", "running"))
+        export_stats("aichef_image_store", "Local image store", self.image_store.stats,
+                     counters=("stores", "dedup_hits", "fetch_errors", "evictions"), gauges=("bytes",))
+
+    # ─── 레시피 ───
+    def _save(self, dish: str, recipe: dict) -> dict:
+        recipe["dish_name"] = dish
+        recipe["recipe_id"] = self.recipe_store.save(recipe)
+        return recipe
+
+    def recipe_result(self, dish: str, full_text: str) -> tuple:
+        """
+        (body, status, headers) for /api/recipe given the generated text.
+        """
+        if full_text.startswith(GEMINI_OVERLOADED_ERROR):
+            # 클라이언트가 바로 재시도해서 과부하를 키우지 않도록 Retry-After를 알려 줌
+            return {"error": full_text}, 503, {"Retry-After": str(gemini_guard.retry_after())}
+        if full_text.startswith("Error"):
+            return {"error": full_text}, 500, {}
+
+        with STAGE_SECONDS.time("recipe_parse"):
+            parsed = parse_structured_recipe(full_text)
+        self._save(dish, parsed)
+        self.image_jobs.enqueue_recipe(parsed["recipe_id"], dish, parsed["steps"])
+        return parsed, 200, {}
+
+    def finish_stream(self, dish: str, parser) -> str:
+        """
+        SSE text for the end of /api/recipe/stream: the parser's last events,
+        then "done" once the recipe is saved and its images are queued.
+        """
+        events = [sse_event(event, data) for event, data in parser.close()]
+        STAGE_SECONDS.observe(parser.parse_sec, "recipe_parse")
+        recipe = self._save(dish, parser.recipe)
+        self.image_jobs.enqueue_recipe(recipe["recipe_id"], dish, recipe["steps"])
+        events.append(sse_event("done", {"recipe_id": recipe["recipe_id"], "step_count": len(recipe["steps"])}))
+        return "".join(events)
+
+    # ─── 여러 요리 한 번에 (/api/recipes/batch) ───
+    @staticmethod
+    def batch_dishes(payload) -> tuple:
+        """
+        (dishes, duplicates, None) for a valid batch body, else (None, None, error body).
+        """
+        dishes = payload.get("dishes") if isinstance(payload, dict) else None
+        if not isinstance(dishes, list) or not all(isinstance(d, str) for d in dishes):
+            return None, None, {"error": "Request body must be JSON like {\"dishes\": [\"bulgogi\", ...]}."}
+        dishes, duplicates = dedupe_dishes(dishes)
+        if not dishes:
+            return None, None, {"error": "No dishes provided."}
+        if len(dishes) > BATCH_MAX_DISHES:
+            return None, None, {"error": f"Too many dishes (max {BATCH_MAX_DISHES})."}
+        return dishes, duplicates, None
+
+    def batch_item(self, dish: str, text: str, cached: bool) -> dict:
+        # 한 요리의 실패가 나머지 결과를 막지 않도록 줄마다 오류를 담아 보냄
+        if text.startswith(GEMINI_OVERLOADED_ERROR):
+            return {"dish": dish, "status": "error", "error": text, "retry_after": gemini_guard.retry_after()}
+        if text.startswith("Error"):
+            return {"dish": dish, "status": "error", "error": text}
+        try:
+            with STAGE_SECONDS.time("recipe_parse"):
+                parsed = parse_structured_recipe(text)
+        except Exception as e:
+            return {"dish": dish, "status": "error", "error": f"Error: Failed to parse recipe: {e}"}
+        return {"dish": dish, "status": "ok", "cached": cached, "recipe": self._save(dish, parsed)}
+
+    # ─── 단계 이미지 ───
+    def image_result(self, recipe_id: str, step_index: str) -> tuple:
+        """
+        (body, status) for /api/image: 200 with the image, 202 with a poll URL, or an error.
+        """
+        if not recipe_id or step_index == "":
+            return {"error": "Missing parameters."}, 400
+
+        # /api/recipe 에서 이미 화면에 보낸 레시피를 그대로 사용 (재생성하지 않음)
+        recipe = self.recipe_store.get(recipe_id)
+        if recipe is None:
+            return {"error": "Recipe not found or expired."}, 404
+
+        dish = recipe["dish_name"]
+        steps = recipe.get("steps", [])
+        try:
+            idx = int(step_index)
+            if idx < 0:
+                raise IndexError
+            current_step_desc = steps[idx]
+        except (ValueError, IndexError):
+            return {"error": "Invalid step index."}, 400
+
+        # 미리 생성된 이미지가 있으면 바로 반환, 아니면 이 단계를 큐 맨 앞으로 올리고 작업 id 반환
+        job = self.image_jobs.request(recipe_id, idx, dish, current_step_desc)
+        data = image_job_dict(job)
+        if job.status == "done":
+            return data, 200
+        data["poll"] = f"/api/image/jobs/{job.job_id}"
+        return data, 202
+
+    def image_job(self, job_id: str, wait: str) -> tuple:
+        """
+        (job, seconds to wait, None) for /api/image/jobs/<job_id>, else (None, 0, (error body, status)).
+        """
+        job = self.image_jobs.get(job_id)
+        if job is None:
+            return None, 0, ({"error": "Unknown image job."}, 404)
+        try:
+            wait_sec = min(float(wait or 0), IMAGE_JOB_MAX_WAIT_SEC)
+        except ValueError:
+            return None, 0, ({"error": "Invalid wait parameter."}, 400)
+        return job, wait_sec, None
+
+    def find_image(self, name: str) -> tuple:
+        """
+        (path, None) for a stored image; (None, Future of the name to serve) when a
+        variant is requested for the first time; (None, None) if there is nothing to serve.
+        """
+        path = self.image_store.path(name)
+        if path is None and VARIANT_RE.match(name):
+            # 처음 요청된 변형은 워커 풀에서 생성 (만들 수 없으면 원본을 대신 보냄)
+            return None, self.image_variants.submit(name)
+        return path, None
+
+    def image_path(self, name: str):
+        return self.image_store.path(name) if name else None
+
+    # ─── 통계 ───
+    def cache_stats(self) -> dict:
+        stats = recipe_cache.stats()
+        stats["singleflight"] = self.flights.stats()
+        stats["image_jobs"] = self.image_jobs.stats()
+        stats["image_store"] = self.image_store.stats()
+        stats["image_variants"] = self.image_variants.stats()
+        return stats
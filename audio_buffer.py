@@ -0,0 +1,137 @@
+# audio_buffer.py
+#
+# 마이크 스트림 하나가 소유하는 고정 크기 링 버퍼 (16-bit PCM 프레임).
+# 메모리는 생성할 때 한 번만 잡고, 읽기는 복사 없이 버퍼를 가리키는 memoryview로 돌려줍니다.
+# 인식기가 멈춰서 버퍼가 가득 차면 가장 오래된 오디오를 버리고 그 양을 셉니다 (메모리가 늘지 않음).
+
+import threading
+
+
+class AudioRingBuffer:
+    """
+    Bounded single-producer / single-consumer buffer of 16-bit PCM frames.
+
+    `write()` never blocks (it is called from the audio callback): when the
+    buffer is full the oldest unread frames are dropped and counted.
+    `read()` returns a memoryview into the buffer itself; it stays valid
+    until the next `read()` unless the writer laps a stalled reader
+    (counted as `overruns`), so copy what you keep (e.g. `bytes(view)`).
+    `close()` ends the stream: readers get the remaining frames, then None.
+    """
+
+    def __init__(self, capacity_frames: int, sample_rate: int = 16000, frame_bytes: int = 2):
+        self.sample_rate = sample_rate
+        self.frame_bytes = frame_bytes
+        self.capacity = capacity_frames * frame_bytes   # bytes
+        self._buf = bytearray(self.capacity)
+        self._view = memoryview(self._buf)
+        # 절대 위치(바이트, 계속 증가): 읽을 데이터는 [_read, _write), 마지막으로 빌려준 구간은 [_lease, _read)
+        self._read = 0
+        self._write = 0
+        self._lease = 0
+        self._cond = threading.Condition()
+        self.closed = False
+        self._stats = {
+            "written_frames": 0, "read_frames": 0, "dropped_frames": 0, "discarded_frames": 0,
+            "overflows": 0, "overruns": 0, "high_water_frames": 0,
+        }
+
+    # ─── 쓰기 (오디오 콜백 스레드) ───
+    def write(self, data) -> int:
+        """
+        Append PCM frames; returns how many frames were dropped to make room.
+        """
+        data = memoryview(data).cast("B")
+        n = len(data) - len(data) % self.frame_bytes
+        with self._cond:
+            if self.closed:
+                return 0
+            dropped = 0
+            if n > self.capacity:
+                # 버퍼보다 큰 쓰기는 최신 부분만 남김
+                dropped += n - self.capacity
+                data, n = data[n - self.capacity:n], self.capacity
+            overflow = self._write - self._read + n - self.capacity
+            if overflow > 0:
+                dropped += overflow
+                self._read += overflow
+                self._stats["overflows"] += 1
+            if self._write + n > self._lease + self.capacity and self._lease < self._read:
+                self._stats["overruns"] += 1
+            pos = self._write % self.capacity
+            first = min(n, self.capacity - pos)
+            self._view[pos:pos + first] = data[:first]
+            if first < n:
+                self._view[:n - first] = data[first:n]
+            self._write += n
+            dropped //= self.frame_bytes
+            self._stats["written_frames"] += n // self.frame_bytes
+            self._stats["dropped_frames"] += dropped
+            buffered = (self._write - self._read) // self.frame_bytes
+            if buffered > self._stats["high_water_frames"]:
+                self._stats["high_water_frames"] = buffered
+            self._cond.notify_all()
+        return dropped
+
+    def wait_for_space(self, frames: int, timeout: float = None) -> bool:
+        """
+        Block until `frames` can be written without dropping (for sources that can wait, e.g. files).
+        """
+        need = frames * self.frame_bytes
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: self.closed or self.capacity - (self._write - self._read) >= need, timeout
+            )
+
+    # ─── 읽기 (인식 스레드) ───
+    def read(self, frames: int, timeout: float = None):
+        """
+        Up to `frames` frames as a memoryview, waiting until that many are
+        buffered (fewer at the end of the ring, on timeout or after close()).
+        Returns None if nothing arrived before the timeout, or when the buffer
+        is closed and empty.
+        """
+        want = frames * self.frame_bytes
+        with self._cond:
+            self._lease = self._read
+            self._cond.wait_for(lambda: self.closed or self._write - self._read >= want, timeout)
+            available = self._write - self._read
+            if available == 0:
+                return None
+            pos = self._read % self.capacity
+            n = min(want, available, self.capacity - pos)
+            self._lease = self._read
+            self._read += n
+            self._stats["read_frames"] += n // self.frame_bytes
+            self._cond.notify_all()
+            return self._view[pos:pos + n]
+
+    def clear(self) -> int:
+        """
+        Discard everything buffered (e.g. audio captured while a prompt was playing); returns frames discarded.
+        """
+        with self._cond:
+            frames = (self._write - self._read) // self.frame_bytes
+            self._read = self._write
+            self._stats["discarded_frames"] += frames
+            self._cond.notify_all()
+        return frames
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    # ─── 상태 ───
+    def buffered_frames(self) -> int:
+        with self._cond:
+            return (self._write - self._read) // self.frame_bytes
+
+    def stats(self) -> dict:
+        with self._cond:
+            data = dict(self._stats)
+            data["buffered_frames"] = (self._write - self._read) // self.frame_bytes
+        data["capacity_frames"] = self.capacity // self.frame_bytes
+        data["fill_ratio"] = round(data["buffered_frames"] / data["capacity_frames"], 3)
+        data["lag_sec"] = round(data["buffered_frames"] / self.sample_rate, 3)
+        return data
@@ -0,0 +1,267 @@
+# audio_player.py
+
+import time
+import queue
+import atexit
+import threading
+from concurrent.futures import Future
+
+
+class PlaybackHandle:
+    """
+    Returned by `AudioPlayer.play()`. `wait()` blocks until the audio has been
+    written to the output device (or dropped because synthesis or playback
+    failed, in which case `error` is set). `on_started(callback)` runs
+    `callback(handle)` on the playback thread once output starts or fails.
+    """
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.done = threading.Event()
+        self.queued_at = time.perf_counter()
+        self.ready_at = None        # PCM이 준비된 시점 (합성 중인 Future를 받았으면 합성이 끝난 시점)
+        self.started_at = None
+        self.finished_at = None
+        self.error = None
+        self._callbacks = []
+        self._callbacks_lock = threading.Lock()
+
+    def wait(self, timeout: float = None) -> bool:
+        return self.done.wait(timeout)
+
+    def on_started(self, callback):
+        """
+        Call `callback(handle)` when playback starts (or fails); right away if it already has.
+        """
+        with self._callbacks_lock:
+            if not self.started.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def _set_started(self):
+        with self._callbacks_lock:
+            if self.started.is_set():
+                return
+            self.started.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                print(f"[Audio Error] Playback callback failed: {e}")
+
+
+class AudioPlayer:
+    """
+    Long-lived PCM output: one PyAudio instance and one open output stream,
+    fed through a queue by a dedicated thread. The device is opened lazily on
+    the first `play()` and kept open until `close()`.
+    """
+
+    def __init__(self, rate: int = 24000, channels: int = 1, sample_width: int = 2):
+        self.rate = rate
+        self.channels = channels
+        self.sample_width = sample_width
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._pa = None
+        self._stream = None
+        self.timings = {
+            "setup_sec": None,          # PyAudio() + open() (한 번만 발생)
+            "utterances": 0,
+            "total_write_sec": 0.0,
+            "total_queue_wait_sec": 0.0,
+        }
+
+    # ─── 장치 열기/닫기 (재생 스레드에서만 호출) ───
+    def _open(self):
+        import pyaudio  # type: ignore
+
+        start = time.perf_counter()
+        self._pa = pyaudio.PyAudio()
+        self._stream = self._pa.open(
+            format=self._pa.get_format_from_width(self.sample_width),
+            channels=self.channels,
+            rate=self.rate,
+            output=True
+        )
+        self.timings["setup_sec"] = time.perf_counter() - start
+        print(f"[Audio] Output stream opened in {self.timings['setup_sec'] * 1000:.1f} ms")
+
+    def _release(self):
+        try:
+            if self._stream is not None:
+                self._stream.stop_stream()
+                self._stream.close()
+            if self._pa is not None:
+                self._pa.terminate()
+        except Exception as e:
+            print(f"[Audio Error] Failed to close output stream: {e}")
+        self._stream = None
+        self._pa = None
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            pcm_data, handle = item
+            if isinstance(pcm_data, Future):
+                # 앞 발화를 재생하는 동안 합성이 끝났으면 기다리지 않음. 순서는 play() 호출 순서 그대로
+                try:
+                    pcm_data = pcm_data.result()
+                except Exception as e:
+                    pcm_data, handle.error = None, e
+                if handle.ready_at is None:   # 완료 콜백보다 먼저 깨어난 경우
+                    handle.ready_at = time.perf_counter()
+                if not pcm_data:
+                    handle.error = handle.error or "Speech synthesis failed."
+                    handle._set_started()
+                    handle.done.set()
+                    continue
+            try:
+                if self._stream is None:
+                    self._open()
+                handle.started_at = time.perf_counter()
+                handle._set_started()
+                self._stream.write(pcm_data)
+                handle.finished_at = time.perf_counter()
+                self.timings["utterances"] += 1
+                self.timings["total_write_sec"] += handle.finished_at - handle.started_at
+                self.timings["total_queue_wait_sec"] += handle.started_at - handle.ready_at
+            except Exception as e:
+                print(f"[Audio Error] Audio playback failed: {e}")
+                handle.error = e
+                # 장치 오류 후에는 다음 재생에서 새로 연다
+                self._release()
+            finally:
+                handle._set_started()
+                handle.done.set()
+        self._release()
+
+    # ─── 공개 API ───
+    def play(self, pcm_data) -> PlaybackHandle:
+        """
+        Queue `pcm_data` for playback and return immediately. `pcm_data` may
+        also be a Future that resolves to PCM (None or an exception = failed
+        synthesis); it is played in queue order once it resolves.
+        """
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="audio-player", daemon=True)
+                self._thread.start()
+        handle = PlaybackHandle()
+        if isinstance(pcm_data, Future):
+            pcm_data.add_done_callback(lambda _: setattr(handle, "ready_at", time.perf_counter()))
+        else:
+            handle.ready_at = handle.queued_at
+        self._queue.put((pcm_data, handle))
+        return handle
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def close(self, timeout: float = 5.0):
+        with self._lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join(timeout)
+
+
+class NullAudioSink(AudioPlayer):
+    """
+    AudioPlayer without an output device, for headless runs and benchmarks.
+    Utterances still go through the same queue and playback thread; each one
+    takes its real duration divided by `speed` (0 = no time at all).
+    """
+
+    def __init__(self, rate: int = 24000, channels: int = 1, sample_width: int = 2, speed: float = 0.0):
+        super().__init__(rate, channels, sample_width)
+        self.speed = speed
+
+    def _open(self):
+        self._stream = self
+        self.timings["setup_sec"] = 0.0
+
+    def _release(self):
+        self._stream = None
+
+    def duration_sec(self, pcm_data: bytes) -> float:
+        return len(pcm_data) / (self.rate * self.channels * self.sample_width)
+
+    # 재생 스레드가 출력 스트림 대신 호출
+    def write(self, pcm_data: bytes):
+        if self.speed > 0:
+            time.sleep(self.duration_sec(pcm_data) / self.speed)
+
+
+class RecordingAudioSink(NullAudioSink):
+    """
+    NullAudioSink that keeps what was "played": `played` lists
+    (started_at, duration_sec) per utterance, and the PCM is appended to the
+    WAV file `path` (kept in `frames` when no path is given).
+    """
+
+    def __init__(self, path: str = None, rate: int = 24000, channels: int = 1, sample_width: int = 2,
+                 speed: float = 0.0):
+        super().__init__(rate, channels, sample_width, speed)
+        self.path = path
+        self.played = []
+        self.frames = []
+        self._wav = None
+
+    def _open(self):
+        super()._open()
+        if self.path:
+            import wave
+
+            self._wav = wave.open(self.path, "wb")
+            self._wav.setnchannels(self.channels)
+            self._wav.setsampwidth(self.sample_width)
+            self._wav.setframerate(self.rate)
+
+    def _release(self):
+        if self._wav is not None:
+            self._wav.close()
+            self._wav = None
+        super()._release()
+
+    def write(self, pcm_data: bytes):
+        self.played.append((time.perf_counter(), self.duration_sec(pcm_data)))
+        if self._wav is not None:
+            self._wav.writeframes(pcm_data)
+        else:
+            self.frames.append(pcm_data)
+        super().write(pcm_data)
+
+
+_default_player = None
+_default_player_lock = threading.Lock()
+
+
+def get_player(rate: int = 24000) -> AudioPlayer:
+    """
+    Process-wide player shared by every `tts_speak()` call.
+    """
+    global _default_player
+    with _default_player_lock:
+        if _default_player is None:
+            _default_player = AudioPlayer(rate=rate)
+            atexit.register(_default_player.close)
+        return _default_player
+
+
+def set_player(player: AudioPlayer):
+    """
+    Replace the process-wide player, e.g. with NullAudioSink() on a machine without speakers.
+    """
+    global _default_player
+    with _default_player_lock:
+        previous, _default_player = _default_player, player
+    atexit.register(player.close)
+    if previous is not None and previous is not player:
+        previous.close()
@@ -0,0 +1,93 @@
+# benchmarks/bench_async_serving.py
+#
+# 로컬 대역 백엔드(fake_backends, 레시피 생성 지연은 고정값)로 /api/recipe 동시 요청을 보내
+# 기존 Flask 앱(app.py, 워커 스레드 N개)과 ASGI 앱(app_async.py, 이벤트 루프 1개)을 비교합니다.
+# 서버는 같은 프로세스 안에서 각 프레임워크의 테스트 클라이언트로 구동합니다 (네트워크 없음).
+# 레시피 응답 속도만 비교하도록 단계 이미지 미리 생성은 끕니다.
+#   python benchmarks/bench_async_serving.py [requests] [latency_sec] [sync_workers]
+
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ["AICHEF_BACKEND"] = "fake"
+os.environ.setdefault("GEMINI_API_KEY", "fake-key")
+os.environ["AICHEF_RECIPE_CACHE_DIR"] = tempfile.mkdtemp(prefix="aichef_bench_cache_")
+
+import fake_backends  # noqa: E402
+import recipe_core as recipe_api  # noqa: E402
+from resilience import Guard  # noqa: E402
+import app as sync_app  # noqa: E402
+import app_async  # noqa: E402
+
+# 가짜 백엔드에는 할당량이 없으므로 Gemini 호출 속도를 제한하지 않음
+recipe_api.gemini_guard = Guard("gemini", max_retries=0)
+# 이미지 작업이 같은 프로세스에서 레시피 요청과 경쟁하지 않도록 미리 생성을 끔
+for queue in (sync_app.api.image_jobs, app_async.api.image_jobs):
+    queue.enqueue_recipe = lambda recipe_id, dish, steps, current_step=0: []
+
+
+def summarize(name: str, latencies: list, wall: float, peak: int):
+    latencies = sorted(latencies)
+    p95 = latencies[max(0, int(len(latencies) * 0.95) - 1)]
+    print(f"{name:<22} wall {wall:7.2f}s  throughput {len(latencies) / wall:7.1f} req/s  "
+          f"p50 {statistics.median(latencies):6.2f}s  p95 {p95:6.2f}s  peak upstream in-flight {peak}")
+
+
+def run_sync(n: int, workers: int):
+    """
+    Flask under a fixed pool of `workers` threads, like `gunicorn --threads <workers>`.
+    """
+    client = sync_app.app.test_client()
+
+    def one(i, submitted):
+        response = client.get(f"/api/recipe?dish=sync dish {i}")
+        assert response.status_code == 200, response.get_data(as_text=True)
+        return time.perf_counter() - submitted
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(one, i, time.perf_counter()) for i in range(n)]
+        latencies = [f.result() for f in futures]
+    return latencies, time.perf_counter() - start
+
+
+async def run_async(n: int):
+    client = app_async.app.test_client()
+
+    async def one(i):
+        submitted = time.perf_counter()
+        response = await client.get(f"/api/recipe?dish=async dish {i}")
+        assert response.status_code == 200, await response.get_data(as_text=True)
+        return time.perf_counter() - submitted
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(one(i) for i in range(n)))
+    return list(latencies), time.perf_counter() - start
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    latency_sec = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 8
+
+    print(f"{n} concurrent /api/recipe requests, fake Gemini latency {latency_sec:.1f}s, distinct dishes")
+
+    # p50 = p95 이면 지연이 고정값. set_latency()는 동시 호출 수 집계도 새로 시작함
+    fake_backends.set_latency(1.0, gemini_generate=(latency_sec, latency_sec))
+    latencies, wall = run_sync(n, workers)
+    summarize(f"flask ({workers} workers)", latencies, wall, fake_backends.latency("gemini_generate").peak_in_flight)
+
+    fake_backends.set_latency(1.0, gemini_generate=(latency_sec, latency_sec))
+    latencies, wall = asyncio.run(run_async(n))
+    summarize("asgi (1 event loop)", latencies, wall, fake_backends.latency("gemini_generate").peak_in_flight)
+
+
+if __name__ == "__main__":
+    main()
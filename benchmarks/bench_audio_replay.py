@@ -0,0 +1,161 @@
+# benchmarks/bench_audio_replay.py
+#
+# 오디오 장치 없이 음성 경로 전체를 돌리는 재생 하니스:
+# WavFileStream이 번들된 WAV(recipe_reply.wav, tts_output.wav)를 마이크 대신 자기 링 버퍼로 N배속 재생하고,
+# SpeechSession(VAD → request_generator → 로컬 대역 인식기) → 명령 판단 → TTS(대역) → NullAudioSink 순으로 처리합니다.
+# 배속마다 처리량(실시간 대비 배수), 마이크 버퍼에 쌓인 오디오(조각 수)와 버린 양, 말이 끝난 순간부터 응답 재생 시작까지의 지연을 잽니다.
+# N배속에서는 백엔드 지연과 발화 후 대기 시간(SETTLE_SEC)도 1/N로 줄이고, 지연은 실제 시간으로 환산해 보여 줍니다.
+# 마지막 줄은 인식기 없이 VAD와 request_generator만 최대 속도로 돌린 결과입니다.
+#   python benchmarks/bench_audio_replay.py [speeds, 예: 1,4,16] [repeats]
+
+import os
+import sys
+import time
+import tempfile
+import threading
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ["AICHEF_BACKEND"] = "fake"
+os.environ.setdefault("AICHEF_FAKE_SEED", "1")
+os.environ["AICHEF_TTS_CACHE_DIR"] = tempfile.mkdtemp(prefix="aichef_bench_tts_")
+
+import fake_backends  # noqa: E402
+import stt_session  # noqa: E402
+import stt_tts_test_code  # noqa: E402
+from stt_tts_test_code import WavFileStream, request_generator  # noqa: E402
+from audio_player import NullAudioSink, set_player  # noqa: E402
+from generate_recipe_gemini_api import tts_speak  # noqa: E402
+from intent_matcher import navigation_matcher  # noqa: E402
+from tracing import stage_durations  # noqa: E402
+from vad import EnergyVAD  # noqa: E402
+
+CLIPS = [os.path.join(ROOT, name) for name in ("recipe_reply.wav", "tts_output.wav")]
+GAP_SEC = 3.0            # 발화 사이 무음 (응답을 듣는 시간)
+REPLY = "Okay."
+SETTLE_SEC = stt_session.SETTLE_SEC
+
+
+class BufferSampler:
+    """
+    Samples how many CHUNKs wait in a stream's ring buffer every `interval` seconds on a background thread.
+    """
+
+    def __init__(self, buffer, interval: float = 0.005):
+        self.buffer = buffer
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.samples.append(self.buffer.buffered_frames() / stt_tts_test_code.CHUNK)
+            time.sleep(self.interval)
+
+    def stop(self) -> tuple:
+        self._stop.set()
+        self._thread.join()
+        return max(self.samples, default=0), statistics.fmean(self.samples) if self.samples else 0.0
+
+
+def p(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, int(len(ordered) * q + 0.5) - 1)] if ordered else float("nan")
+
+
+def run_turns(speed: float, repeats: int):
+    fake_backends.set_latency(1.0 / speed)
+    stt_session.SETTLE_SEC = SETTLE_SEC / speed
+    set_player(NullAudioSink(speed=speed))
+
+    stream = WavFileStream(CLIPS * repeats, speed=speed, gap_sec=GAP_SEC)
+    session = stt_session.SpeechSession(language_code="en-US", spot_commands=False, audio_source=lambda: stream)
+    sampler = BufferSampler(stream.buffer)
+    start = time.perf_counter()
+    session.start()
+
+    e2e, stages, heard = [], [], 0
+    for _ in stream.speech_end_offsets:
+        transcript = session.listen(timeout_sec=(GAP_SEC + 5.0) / speed)
+        if not transcript:
+            continue
+        heard += 1
+        marks = dict(session.last_marks)
+        marks.pop("stt_source", None)
+        navigation_matcher.intent(transcript)
+        marks["intent"] = time.perf_counter()
+        marks["tts_request"] = time.perf_counter()
+        handle = tts_speak(REPLY, block=False)
+        handle.started.wait()
+        marks["tts_first_byte"], marks["playback_start"] = handle.ready_at, handle.started_at
+        handle.wait()
+        # 실제로 말이 끝난 시점(WAV에서 마지막으로 큰 샘플) 기준
+        spoken = [t for t in stream.speech_ended_at if t <= marks["vad_end"]]
+        if spoken:
+            e2e.append((marks["playback_start"] - spoken[-1]) * speed)
+        stages.append({name: ms * speed for name, ms in stage_durations(marks).items()})
+
+    stream.finished.wait()
+    wall = time.perf_counter() - start
+    max_depth, mean_depth = sampler.stop()
+    data = session.stats()
+    session.stop()
+    dropped = data["mic_buffer"]["dropped_frames"] + data["mic_buffer"]["discarded_frames"]
+
+    total_ms = [s["total"] for s in stages if "total" in s]
+    print(f"{speed:5g}x  audio {stream.duration_sec:5.1f}s in {wall:5.2f}s ({stream.duration_sec / wall:5.1f}x real time)  "
+          f"utterances {len(stream.speech_end_offsets)}, VAD {data['utterances']}, heard {heard}  "
+          f"mic buffer max {max_depth:.0f} mean {mean_depth:.2f} chunks, dropped {dropped / stt_tts_test_code.RATE:.1f}s")
+    if e2e:
+        print(f"        end of speech → playback start: p50 {p(e2e, 0.5) * 1000:5.0f} ms  p95 {p(e2e, 0.95) * 1000:5.0f} ms"
+              f"  (VAD-estimated total p50 {p(total_ms, 0.5):5.0f} ms)")
+        for name in ("vad_endpoint", "stt", "tts", "playback"):
+            values = [s[name] for s in stages if name in s]
+            print(f"          {name:<13} p50 {p(values, 0.5):6.1f} ms  p95 {p(values, 0.95):6.1f} ms")
+
+
+def run_max_speed(repeats: int):
+    """
+    VAD + request_generator only, audio buffered as fast as possible.
+    """
+    stream = WavFileStream(CLIPS * repeats, speed=0, gap_sec=GAP_SEC)
+    buffer = stream.buffer
+    vad = EnergyVAD(sample_rate=stt_tts_test_code.RATE)
+    sampler = BufferSampler(buffer, interval=0.001)
+    start = time.perf_counter()
+    stream.start()
+    requests = 0
+
+    def drained():
+        return stream.finished.is_set() and not buffer.buffered_frames()
+
+    while not drained():
+        # 발화 하나가 끝날 때마다 생성기가 끝나므로 다시 시작 (SpeechSession과 같음)
+        for _ in request_generator(buffer, should_stop=drained, vad=vad):
+            requests += 1
+    wall = time.perf_counter() - start
+    max_depth, mean_depth = sampler.stop()
+    stream.stop()
+    mic = buffer.stats()
+    print(f"  max  audio {stream.duration_sec:5.1f}s in {wall:5.2f}s ({stream.duration_sec / wall:5.0f}x real time)  "
+          f"{stream.chunks / wall:7.0f} chunks/s  {requests} requests, VAD {vad.stats['utterances']} utterances  "
+          f"mic buffer max {max_depth:.0f} mean {mean_depth:.1f} chunks (capacity {mic['capacity_frames'] // stt_tts_test_code.CHUNK}), "
+          f"dropped {mic['dropped_frames']} frames")
+
+
+def main():
+    speeds = [float(s) for s in (sys.argv[1] if len(sys.argv) > 1 else "1,4,16").split(",")]
+    repeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    print(f"{len(CLIPS) * repeats} utterances from {', '.join(os.path.basename(c) for c in CLIPS)}, "
+          f"{GAP_SEC:g}s gaps, fake STT/TTS, null audio sink")
+    for speed in speeds:
+        run_turns(speed, repeats)
+    run_max_speed(repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# benchmarks/bench_audio_setup.py
+#
+# 문장마다 PyAudio/출력 스트림/TTS 클라이언트를 새로 만들던 기존 방식과
+# 장수(long-lived) AudioPlayer + 재사용 클라이언트 방식의 준비 비용을 비교합니다.
+# 실제 출력 장치가 필요합니다. TTS 클라이언트 비교는 GOOGLE_APPLICATION_CREDENTIALS가 있을 때만 수행합니다.
+#   python benchmarks/bench_audio_setup.py [utterances]
+
+import os
+import sys
+import time
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_player import AudioPlayer  # noqa: E402
+
+RATE = 24000
+SILENCE = b"\x00\x00" * (RATE // 10)   # 100 ms of 16-bit mono silence
+
+
+def per_utterance_setup(n: int) -> list:
+    """
+    The old tts_speak() playback path: open and tear down the device per utterance.
+    Returns setup+teardown seconds per utterance (excluding the write itself).
+    """
+    import pyaudio  # type: ignore
+
+    costs = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        pa = pyaudio.PyAudio()
+        stream = pa.open(format=pa.get_format_from_width(2), channels=1, rate=RATE, output=True)
+        t1 = time.perf_counter()
+        stream.write(SILENCE)
+        t2 = time.perf_counter()
+        stream.stop_stream()
+        stream.close()
+        pa.terminate()
+        t3 = time.perf_counter()
+        costs.append((t1 - t0) + (t3 - t2))
+    return costs
+
+
+def persistent_player(n: int):
+    """
+    The AudioPlayer path: one device open, then only queue hand-off per utterance.
+    """
+    player = AudioPlayer(rate=RATE)
+    overheads = []
+    for _ in range(n):
+        handle = player.play(SILENCE)
+        handle.wait()
+        overheads.append(handle.started_at - handle.queued_at)
+    setup = player.timings["setup_sec"]
+    player.close()
+    # 첫 발화의 대기 시간에는 장치 열기 비용이 포함되므로 분리
+    return setup, overheads[1:] or overheads
+
+
+def tts_client_setup(n: int) -> list:
+    from google.cloud import texttospeech
+
+    costs = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        texttospeech.TextToSpeechClient()
+        costs.append(time.perf_counter() - t0)
+    return costs
+
+
+def ms(values) -> str:
+    return f"mean {statistics.mean(values) * 1000:8.2f} ms   max {max(values) * 1000:8.2f} ms"
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    before = per_utterance_setup(n)
+    setup, after = persistent_player(n)
+
+    print(f"utterances: {n}")
+    print(f"[before] PyAudio + stream setup per utterance : {ms(before)}")
+    print(f"[after ] one-time output stream setup         : {setup * 1000:8.2f} ms")
+    print(f"[after ] per-utterance queue hand-off         : {ms(after)}")
+
+    creds = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
+    if creds and os.path.isfile(creds):
+        clients = tts_client_setup(n)
+        print(f"[before] TextToSpeechClient() per utterance   : {ms(clients)}")
+        print(f"[after ] TextToSpeechClient() once            : {clients[0] * 1000:8.2f} ms")
+    else:
+        print("[skip  ] TTS client comparison (GOOGLE_APPLICATION_CREDENTIALS not set)")
+
+    saved = sum(before) - setup - sum(after)
+    print(f"estimated audio setup saved over {n} utterances: {saved * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
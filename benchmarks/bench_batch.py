@@ -0,0 +1,175 @@
+# benchmarks/bench_batch.py
+#
+# 식단 계획처럼 요리 N개(중복 포함, 일부는 이미 캐시됨, 일부는 Gemini 오류)를 요청할 때
+# /api/recipe를 하나씩 부르는 경우와 POST /api/recipes/batch(NDJSON 스트림)를 비교합니다.
+# 가짜 Gemini 백엔드를 쓰며, 서버는 각 프레임워크의 테스트 클라이언트로 구동합니다 (네트워크 없음).
+#   python benchmarks/bench_batch.py [dishes] [latency_sec] [cached_ratio]
+
+import os
+import sys
+import json
+import time
+import asyncio
+import tempfile
+import threading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("GEMINI_API_KEY", "fake-key")
+os.environ["AICHEF_RECIPE_CACHE_DIR"] = tempfile.mkdtemp(prefix="aichef_bench_cache_")
+os.environ["AICHEF_IMAGE_STORE_DIR"] = tempfile.mkdtemp(prefix="aichef_bench_images_")
+
+import recipe_core as recipe_api  # noqa: E402
+from clients import registry  # noqa: E402
+from resilience import Guard  # noqa: E402
+from recipe_batch import BATCH_CONCURRENCY  # noqa: E402
+from image_jobs import ImageJobQueue  # noqa: E402
+import app as sync_app  # noqa: E402
+import app_async  # noqa: E402
+
+# 가짜 백엔드에는 할당량이 없으므로 Gemini 호출 속도를 제한하지 않음
+recipe_api.gemini_guard = Guard("gemini", max_retries=0)
+
+# /api/recipe가 등록하는 단계 이미지 생성은 이 비교와 무관하므로 자리표시 URL만 반환
+sync_app.api.image_jobs = ImageJobQueue(lambda dish, idx, desc: recipe_api.placeholder_image_url(dish, idx))
+
+with open(os.path.join(ROOT, "benchmarks", "corpus", "en_bulgogi.txt"), encoding="utf-8") as f:
+    RECIPE_TEXT = f.read()
+
+FAILING_MARK = "burnt"   # 이 단어가 들어간 요리는 Gemini 오류를 흉내 냄
+
+
+class FakeGenai:
+    """
+    Stand-in for the `genai` module with a fixed latency; prompts for "burnt" dishes raise.
+    """
+
+    def __init__(self, latency_sec: float):
+        self.latency_sec = latency_sec
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def GenerativeModel(self, model_name: str):
+        return self
+
+    def _count(self, prompt: str):
+        with self._lock:
+            self.calls += 1
+        if FAILING_MARK in prompt:
+            raise RuntimeError("429 Resource has been exhausted")
+
+    def generate_content(self, prompt: str):
+        time.sleep(self.latency_sec)
+        self._count(prompt)
+        return type("FakeResponse", (), {"text": RECIPE_TEXT})()
+
+    async def generate_content_async(self, prompt: str):
+        await asyncio.sleep(self.latency_sec)
+        self._count(prompt)
+        return type("FakeResponse", (), {"text": RECIPE_TEXT})()
+
+
+def make_menu(n: int, cached_ratio: float, tag: str) -> tuple:
+    """
+    Returns (request list with duplicates, dishes to pre-cache).
+    """
+    dishes = [f"{tag} dish {i}" for i in range(n)]
+    dishes[-1] = f"{tag} {FAILING_MARK} dish"
+    cached = dishes[: int(n * cached_ratio)]
+    # 대소문자/공백만 다른 중복 몇 개
+    duplicates = [f"  {d.upper()} " for d in dishes[:: max(1, n // 4)]]
+    return dishes + duplicates, cached
+
+
+def precache(dishes: list):
+    for dish in dishes:
+        recipe_api.recipe_cache.put(recipe_api.recipe_cache_key(dish), RECIPE_TEXT)
+
+
+def install_fake(latency_sec: float) -> FakeGenai:
+    fake = FakeGenai(latency_sec)
+    recipe_api.genai = fake
+    registry.reset()   # 이전 백엔드로 만든 모델을 재사용하지 않도록
+    return fake
+
+
+def report(name: str, wall: float, first: float, lines: list, calls: int):
+    items = [line for line in lines if "dish" in line]
+    errors = sum(1 for line in items if line["status"] == "error")
+    cached = sum(1 for line in items if line.get("cached"))
+    cached_text = f"{cached:3d}" if any("cached" in line for line in items) else "  -"
+    first_text = f"{first:6.2f}s" if first is not None else "     -"
+    print(f"{name:<26} wall {wall:6.2f}s  first result {first_text}  results {len(items):3d}  "
+          f"cached {cached_text}  errors {errors}  gemini calls {calls}")
+
+
+def run_serial(menu: list, fake: FakeGenai):
+    client = sync_app.app.test_client()
+    start = time.perf_counter()
+    first = None
+    lines = []
+    for dish in menu:
+        response = client.get(f"/api/recipe?dish={dish}")
+        lines.append({"dish": dish, "status": "ok" if response.status_code == 200 else "error"})
+        if first is None:
+            first = time.perf_counter() - start
+    report("serial /api/recipe", time.perf_counter() - start, first, lines, fake.calls)
+
+
+def run_sync_batch(menu: list, fake: FakeGenai):
+    client = sync_app.app.test_client()
+    start = time.perf_counter()
+    first = None
+    lines = []
+    response = client.post("/api/recipes/batch", json={"dishes": menu}, buffered=False)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    for raw in response.response:
+        for line in raw.decode("utf-8").splitlines():
+            if first is None:
+                first = time.perf_counter() - start
+            lines.append(json.loads(line))
+    response.close()
+    report("flask batch", time.perf_counter() - start, first, lines, fake.calls)
+
+
+async def run_async_batch(menu: list, fake: FakeGenai):
+    client = app_async.app.test_client()
+    start = time.perf_counter()
+    first = None
+    lines = []
+    async with client.request("/api/recipes/batch", method="POST",
+                              headers={"Content-Type": "application/json"}) as connection:
+        await connection.send(json.dumps({"dishes": menu}).encode("utf-8"))
+        await connection.send_complete()
+        buffer = b""
+        # 마지막 요약 줄({"done": true, ...})이 올 때까지 읽음
+        while not (lines and lines[-1].get("done")):
+            buffer += await connection.receive()
+            while b"\n" in buffer:
+                line, buffer = buffer.split(b"\n", 1)
+                if first is None:
+                    first = time.perf_counter() - start
+                lines.append(json.loads(line))
+    report("asgi batch", time.perf_counter() - start, first, lines, fake.calls)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    latency_sec = float(sys.argv[2]) if len(sys.argv) > 2 else 1.0
+    cached_ratio = float(sys.argv[3]) if len(sys.argv) > 3 else 0.25
+
+    print(f"{n} distinct dishes (+ duplicates), {cached_ratio:.0%} cached, 1 failing, "
+          f"fake Gemini latency {latency_sec:.1f}s, batch concurrency {BATCH_CONCURRENCY}")
+
+    for name, run in [("serial", run_serial), ("flask", run_sync_batch), ("asgi", None)]:
+        menu, cached = make_menu(n, cached_ratio, name)
+        precache(cached)
+        fake = install_fake(latency_sec)
+        if run is None:
+            asyncio.run(run_async_batch(menu, fake))
+        else:
+            run(menu, fake)
+
+
+if __name__ == "__main__":
+    main()
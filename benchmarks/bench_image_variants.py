@@ -0,0 +1,109 @@
+# benchmarks/bench_image_variants.py
+#
+# 512x512 단계 이미지(주어진 파일 또는 사진과 비슷하게 합성한 PNG)로
+# 폭/포맷별 변형의 크기와 인코딩 시간을 재고,
+# Flask 앱의 /images/ 경로로 첫 요청(변형 생성)과 이후 요청(저장본 전송)의 지연을 비교합니다.
+# Pillow가 필요합니다 (pip install pillow). 네트워크는 필요 없습니다.
+#   python benchmarks/bench_image_variants.py [image_path] [runs]
+
+import io
+import os
+import sys
+import time
+import tempfile
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ["AICHEF_IMAGE_STORE_DIR"] = tempfile.mkdtemp(prefix="aichef_bench_images_")
+
+from image_variants import VARIANT_WIDTHS, VARIANT_FORMATS, encode_variant, variant_name  # noqa: E402
+
+# 모달이 90vw로 그려지므로 기기별로 브라우저가 고르는 폭 (CSS 폭 x DPR)
+DEVICES = [("phone 360px @1x", 360 * 0.9), ("phone 360px @2x", 360 * 0.9 * 2),
+           ("phone 412px @3x", 412 * 0.9 * 3), ("desktop @1x", 512)]
+
+
+def synthetic_photo(size: int = 512) -> bytes:
+    """
+    PNG with smooth gradients, soft shapes and sensor-like noise, roughly like a generated food photo.
+    """
+    import numpy as np
+    from PIL import Image, ImageDraw, ImageFilter
+
+    rng = np.random.default_rng(0)
+    y, x = np.mgrid[0:size, 0:size] / size
+    base = np.stack([200 - 80 * y, 150 + 60 * x * y, 90 + 70 * x], axis=-1)
+    image = Image.fromarray(base.clip(0, 255).astype(np.uint8))
+    draw = ImageDraw.Draw(image)
+    for _ in range(12):
+        cx, cy, r = rng.integers(0, size, 2).tolist() + [int(rng.integers(20, 120))]
+        draw.ellipse((cx - r, cy - r, cx + r, cy + r), fill=tuple(rng.integers(0, 255, 3).tolist()))
+    image = image.filter(ImageFilter.GaussianBlur(3))
+    noisy = np.asarray(image, dtype=np.float32) + rng.normal(0, 2, (size, size, 3))
+    out = io.BytesIO()
+    Image.fromarray(noisy.clip(0, 255).astype(np.uint8)).save(out, "PNG")
+    return out.getvalue()
+
+
+def pick_width(device_px: float) -> int:
+    # srcset의 w 설명자 기준: 필요한 폭 이상인 가장 작은 변형 (없으면 가장 큰 것)
+    return min((w for w in VARIANT_WIDTHS if w >= device_px), default=max(VARIANT_WIDTHS))
+
+
+def main():
+    source = sys.argv[1] if len(sys.argv) > 1 else None
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    try:
+        if source:
+            with open(source, "rb") as f:
+                original = f.read()
+        else:
+            original = synthetic_photo()
+    except ImportError as e:
+        print(f"Error: Pillow and numpy are required ({e})")
+        sys.exit(1)
+    print(f"original: {source or 'synthetic 512x512 PNG'}, {len(original):,} bytes\n")
+
+    print(f"{'variant':<12} {'bytes':>9} {'of orig':>8} {'encode p50':>11} {'min':>8}")
+    sizes = {}
+    for ext in VARIANT_FORMATS:
+        for width in VARIANT_WIDTHS:
+            times = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                data = encode_variant(original, width, ext)
+                times.append(time.perf_counter() - start)
+            sizes[(width, ext)] = len(data)
+            print(f"w{width}.{ext:<7} {len(data):>9,} {len(data) / len(original):>7.1%} "
+                  f"{statistics.median(times) * 1000:>8.1f} ms {min(times) * 1000:>5.1f} ms")
+
+    print("\nbytes per modal open (browser picks from srcset; WebP where supported):")
+    for device, px in DEVICES:
+        width = pick_width(px)
+        print(f"  {device:<18} w{width:<4} webp {sizes[(width, 'webp')]:>8,}  jpg {sizes[(width, 'jpg')]:>8,}  "
+              f"png original {len(original):>8,}")
+
+    # 앱을 통한 요청: 첫 요청은 워커 풀에서 인코딩, 이후는 저장된 파일 전송
+    import app
+    name = app.api.image_store.put(original)
+    client = app.app.test_client()
+    digest = name.split(".")[0]
+    print("\nGET /images/<variant> through the Flask app:")
+    for ext in VARIANT_FORMATS:
+        for width in VARIANT_WIDTHS:
+            url = f"/images/{variant_name(digest, width, ext)}"
+            timings = []
+            for _ in range(3):
+                start = time.perf_counter()
+                response = client.get(url)
+                response.get_data()
+                timings.append(time.perf_counter() - start)
+                response.close()
+            print(f"  w{width}.{ext:<5} first {timings[0] * 1000:7.1f} ms  cached {min(timings[1:]) * 1000:6.2f} ms  "
+                  f"{response.headers['Content-Type']}")
+    print(f"\nvariant stats: {app.api.image_variants.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# benchmarks/bench_import_time.py
+#
+# `python -X importtime`으로 웹 서버(app.py)의 import 비용을 측정하고,
+# 오디오/Google Cloud/Gemini SDK가 import 시점에 끌려 들어오면 실패(종료 코드 1)합니다.
+# 비교용으로 음성 비서가 쓰는 generate_recipe_gemini_api의 import 비용도 함께 보여줍니다.
+#   python benchmarks/bench_import_time.py [runs] [max_ms]
+
+import os
+import re
+import sys
+import statistics
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 웹 서버를 띄울 때 import되면 안 되는 모듈 (처음 사용할 때 지연 import)
+FORBIDDEN_FOR_APP = ["pyaudio", "google.cloud.texttospeech", "google.cloud.speech",
+                     "google.generativeai", "generativeai", "google.oauth2"]
+
+LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def import_profile(module: str) -> dict:
+    """
+    Returns {"modules": {name: cumulative_us}, "total_us": cumulative us of `module`, "error": str|None}.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    modules = {}
+    for line in proc.stderr.splitlines():
+        m = LINE_RE.match(line)
+        if m:
+            modules[m.group(4)] = int(m.group(2))
+    error = None
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"
+    return {"modules": modules, "total_us": modules.get(module), "error": error}
+
+
+def report(module: str, runs: int, top: int = 8):
+    profiles = [import_profile(module) for _ in range(runs)]
+    if profiles[0]["error"]:
+        print(f"[{module}] import failed: {profiles[0]['error']}")
+        return None, profiles[0]
+    totals = [p["total_us"] / 1000 for p in profiles]
+    print(f"[{module}] cumulative import time over {runs} run(s): "
+          f"median {statistics.median(totals):.1f} ms, min {min(totals):.1f} ms")
+    # 자기 자신을 제외하고 누적 시간이 큰 모듈 (마지막 실행 기준)
+    heaviest = sorted(((us, name) for name, us in profiles[-1]["modules"].items() if name != module), reverse=True)
+    for us, name in heaviest[:top]:
+        print(f"    {us / 1000:8.1f} ms  {name}")
+    return statistics.median(totals), profiles[-1]
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    max_ms = float(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    app_ms, app_profile = report("app", runs)
+    print()
+    report("generate_recipe_gemini_api", runs)
+    print()
+
+    failed = False
+    if app_ms is None:
+        failed = True
+    else:
+        leaked = [name for name in FORBIDDEN_FOR_APP if name in app_profile["modules"]]
+        if leaked:
+            print(f"FAIL: importing app pulled in {', '.join(leaked)}")
+            failed = True
+        if max_ms is not None and app_ms > max_ms:
+            print(f"FAIL: app import {app_ms:.1f} ms exceeds budget {max_ms:.1f} ms")
+            failed = True
+    print("FAIL" if failed else "OK: app imports without the audio stack or Google/Gemini SDKs")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# benchmarks/bench_intents.py
+#
+# tests/test_intents.py의 명령어 표로 IntentMatcher와 기존 any(k in cmd ...) 체인의
+# 정확도/속도를 비교합니다.
+#   python benchmarks/bench_intents.py [iterations]
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from intent_matcher import navigation_matcher, ready_matcher  # noqa: E402
+from tests.test_intents import NAVIGATION_CASES, READY_CASES  # noqa: E402
+
+
+# ─── 기존 방식 (recipe_step_by_step.py에 있던 체인, 영어 목록 포함) ───
+LEGACY_CHAIN = [
+    ("next", ["다음 단계", "다음", "넥스트", "next step", "next"]),
+    ("repeat", ["다시 알려줘", "반복", "리핏", "repeat", "again", "뭐라고"]),
+    ("previous", ["이전 단계", "이전", "프리비어스", "previous step", "previous"]),
+    ("ingredients", ["재료 확인", "재료 목록", "재료 뭐였지", "ingredients", "what ingredients", "list ingredients"]),
+    ("tools", ["도구 확인", "도구 목록", "도구 뭐였지", "tools", "what tools", "list tools"]),
+    ("current_step", ["현재 단계", "지금 몇 단계", "current step", "what step", "which step"]),
+    ("finish", ["요리 종료", "그만할래", "종료", "스탑", "finish", "stop", "exit"]),
+]
+LEGACY_READY = ["시작", "준비 됐어", "준비됐어", "다음", "네", "응", "next", "start", "yes", "ok"]
+
+
+def legacy_navigation(cmd: str):
+    cmd = cmd.lower()
+    for intent, keywords in LEGACY_CHAIN:
+        if any(k in cmd for k in keywords):
+            return intent
+    return None
+
+
+def legacy_ready(cmd: str):
+    return "start" if any(k in cmd.lower() for k in LEGACY_READY) else None
+
+
+def check(name: str, fn, cases: list) -> int:
+    failures = 0
+    for text, expected in cases:
+        got = fn(text)
+        if got != expected:
+            failures += 1
+            print(f"  [{name}] {text!r}: expected {expected}, got {got}")
+    return failures
+
+
+def per_call_us(fn, texts: list, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for text in texts:
+            fn(text)
+    return (time.perf_counter() - start) / (iterations * len(texts)) * 1e6
+
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    total = len(NAVIGATION_CASES) + len(READY_CASES)
+
+    print("legacy any() chain:")
+    legacy_failures = check("legacy", legacy_navigation, NAVIGATION_CASES) + check("legacy", legacy_ready, READY_CASES)
+    print("IntentMatcher:")
+    failures = check("matcher", navigation_matcher.intent, NAVIGATION_CASES) + check("matcher", ready_matcher.intent, READY_CASES)
+    print(f"cases passed: legacy {total - legacy_failures}/{total}, matcher {total - failures}/{total}")
+
+    texts = [text for text, _ in NAVIGATION_CASES]
+    exact = [text for text, expected in NAVIGATION_CASES if expected and navigation_matcher.match(text)
+             and not navigation_matcher.match(text).fuzzy]
+    print(f"legacy chain           : {per_call_us(legacy_navigation, texts, iterations):7.2f} us/call")
+    print(f"matcher (all cases)    : {per_call_us(navigation_matcher.intent, texts, iterations):7.2f} us/call")
+    print(f"matcher (exact hits)   : {per_call_us(navigation_matcher.intent, exact, iterations):7.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
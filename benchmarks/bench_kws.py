@@ -0,0 +1,130 @@
+# benchmarks/bench_kws.py
+#
+# 온디바이스 키워드 검출기(KeywordSpotter)의 정확도와 지연 시간을 평가합니다.
+# 템플릿은 앱이 실제로 싣는 kws_templates/<language_code>를 그대로 쓰고, 질의는 템플릿에 없는
+# 화자의 녹음(benchmarks/kws_clips/<language_code>)을 깨끗한 상태와 레인지후드 소음을 섞은 상태로 넣습니다.
+#   python benchmarks/bench_kws.py [language_code ...]            (기본: en-US ko-KR)
+#   python benchmarks/bench_kws.py --clips <dir> --templates <dir>
+#     <dir>/<label>/*.wav    : 명령어 녹음 (label = 인식 결과 문자열)
+#     <clips>/_unknown/*.wav : 명령어가 아닌 발화 (클라우드로 넘어가야 정답)
+# 번들된 클립은 benchmarks/make_kws_clips.py가 espeak-ng로 합성한 것입니다 (사람 녹음 아님).
+
+import os
+import sys
+import argparse
+import statistics
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from keyword_spotter import KWS_TEMPLATE_DIR, KeywordSpotter, read_wav  # noqa: E402
+
+RATE = 16000
+UNKNOWN = "_unknown"
+CLIPS_DIR = os.path.join(ROOT, "benchmarks", "kws_clips")
+
+
+def load_clip_dir(directory: str) -> list:
+    clips = []
+    for label in sorted(os.listdir(directory)):
+        label_dir = os.path.join(directory, label)
+        if not os.path.isdir(label_dir):
+            continue
+        for name in sorted(os.listdir(label_dir)):
+            if name.lower().endswith(".wav"):
+                clips.append((label, read_wav(os.path.join(label_dir, name), RATE)))
+    return clips
+
+
+def with_noise(samples: np.ndarray, rng, noisy: bool) -> np.ndarray:
+    """
+    Pad like the VAD does (pre-roll + end silence) and optionally add range-hood noise.
+    """
+    out = samples.astype(np.float32) * rng.uniform(0.5, 1.5)
+    out = np.concatenate([np.zeros(RATE * 3 // 10), out, np.zeros(RATE * 7 // 10)])
+    if noisy:
+        t = np.arange(len(out)) / RATE
+        out += rng.normal(0, 300, len(out)) + 200 * np.sin(2 * np.pi * 120 * t)
+    else:
+        out += rng.normal(0, 20, len(out))
+    return np.clip(out, -32768, 32767).astype(np.int16)
+
+
+# ─── 평가 ───
+def evaluate(spotter: KeywordSpotter, clips: list, noisy: bool, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    result = {"correct": 0, "wrong": 0, "fallback": 0, "oov_rejected": 0, "oov_accepted": 0,
+              "latency": [], "n_commands": 0, "n_oov": 0, "errors": []}
+    for label, samples in clips:
+        predicted, _, elapsed = spotter.spot(with_noise(samples, rng, noisy))
+        result["latency"].append(elapsed)
+        if label == UNKNOWN:
+            result["n_oov"] += 1
+            result["oov_rejected" if predicted is None else "oov_accepted"] += 1
+            if predicted is not None:
+                result["errors"].append(f"non-command -> {predicted}")
+        else:
+            result["n_commands"] += 1
+            if predicted is None:
+                result["fallback"] += 1
+            elif predicted == label:
+                result["correct"] += 1
+            else:
+                result["wrong"] += 1
+                result["errors"].append(f"{label} -> {predicted}")
+    return result
+
+
+def pct(part: int, whole: int) -> str:
+    return f"{part / whole:6.1%}" if whole else "   n/a"
+
+
+def report(name: str, spotter: KeywordSpotter, clips: list):
+    n_commands = sum(1 for label, _ in clips if label != UNKNOWN)
+    print(f"\n{name}: {len(spotter)} template(s) for {', '.join(spotter.labels())}; "
+          f"{n_commands} held-out command clip(s), {len(clips) - n_commands} non-command clip(s)")
+    print(f"{'':24} {'clean':>7} {'noisy':>7}")
+    results = [evaluate(spotter, clips, noisy) for noisy in (False, True)]
+    rows = [
+        ("resolved on-device", lambda r: pct(r["correct"] + r["wrong"], r["n_commands"])),
+        ("  correct", lambda r: pct(r["correct"], r["n_commands"])),
+        ("  wrong (false accept)", lambda r: pct(r["wrong"], r["n_commands"])),
+        ("fell back to cloud STT", lambda r: pct(r["fallback"], r["n_commands"])),
+        ("non-commands rejected", lambda r: pct(r["oov_rejected"], r["n_oov"])),
+    ]
+    for title, value in rows:
+        print(f"{title:24} {value(results[0]):>7} {value(results[1]):>7}")
+    latency_ms = sorted(v * 1000 for r in results for v in r["latency"])
+    print(f"spot latency: p50 {statistics.median(latency_ms):.1f} ms, "
+          f"p95 {latency_ms[int(len(latency_ms) * 0.95) - 1]:.1f} ms, max {latency_ms[-1]:.1f} ms")
+    errors = sorted(set(results[0]["errors"] + results[1]["errors"]))
+    if errors:
+        print(f"misrecognized: {', '.join(errors)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Keyword spotter accuracy on held-out speakers")
+    parser.add_argument("languages", nargs="*", default=["en-US", "ko-KR"])
+    parser.add_argument("--clips", help="<label>/*.wav directory of test recordings")
+    parser.add_argument("--templates", help="<label>/*.wav directory of templates")
+    args = parser.parse_args()
+
+    if args.clips or args.templates:
+        if not (args.clips and args.templates):
+            sys.exit("Error: --clips and --templates go together")
+        runs = [(args.clips, args.templates, args.clips)]
+    else:
+        runs = [(lang, os.path.join(KWS_TEMPLATE_DIR, lang), os.path.join(CLIPS_DIR, lang))
+                for lang in args.languages]
+
+    for name, template_dir, clips_dir in runs:
+        spotter = KeywordSpotter(sample_rate=RATE)
+        if spotter.load_templates(template_dir) == 0 or not os.path.isdir(clips_dir):
+            print(f"\n{name}: no templates in {template_dir} or no clips in {clips_dir}; skipped")
+            continue
+        report(name, spotter, load_clip_dir(clips_dir))
+
+
+if __name__ == "__main__":
+    main()
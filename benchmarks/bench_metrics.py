@@ -0,0 +1,88 @@
+# benchmarks/bench_metrics.py
+#
+# metrics.py 계측 비용 측정: 히스토그램 관측/카운터 증가 한 번의 비용(단일 스레드, 여러 스레드 경합),
+# 그리고 실제 서버에 있을 만큼의 시계열을 /metrics 텍스트로 만드는 시간.
+#   python benchmarks/bench_metrics.py [ops] [threads]
+
+import os
+import sys
+import time
+import threading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from metrics import MetricsRegistry  # noqa: E402
+
+STAGES = ["gemini_generate", "gemini_stream_open", "gemini_stream_body", "recipe_parse",
+          "image_generate", "image_fetch", "tts_synthesize", "stt_finalize"]
+
+
+def per_op_ns(fn, ops: int) -> float:
+    start = time.perf_counter()
+    for i in range(ops):
+        fn(i)
+    return (time.perf_counter() - start) / ops * 1e9
+
+
+def threaded_per_op_ns(fn, ops: int, threads: int) -> float:
+    per_thread = ops // threads
+    workers = [threading.Thread(target=lambda: [fn(i) for i in range(per_thread)]) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return (time.perf_counter() - start) / (per_thread * threads) * 1e9
+
+
+def main():
+    ops = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+
+    registry = MetricsRegistry()
+    histogram = registry.histogram("bench_stage_seconds", "Bench histogram.", ("stage",))
+    counter = registry.counter("bench_errors_total", "Bench counter.", ("upstream", "kind"))
+    gauge = registry.gauge("bench_in_flight", "Bench gauge.", ("endpoint",))
+
+    def observe(i):
+        histogram.observe((i % 1000) / 250.0, STAGES[i % len(STAGES)])
+
+    def timed(i):
+        with histogram.time(STAGES[i % len(STAGES)]):
+            pass
+
+    def inc(i):
+        counter.inc("gemini", "error")
+
+    def track(i):
+        with gauge.track("api_recipe"):
+            pass
+
+    def baseline(i):
+        pass
+
+    print(f"{ops:,} operations; {threads} threads for the contended run")
+    base = per_op_ns(baseline, ops)
+    for name, fn in [("histogram.observe", observe), ("histogram.time (ctx)", timed),
+                     ("counter.inc", inc), ("gauge.track (ctx)", track)]:
+        single = per_op_ns(fn, ops) - base
+        contended = threaded_per_op_ns(fn, ops, threads) - base
+        print(f"  {name:<22} {single:7.0f} ns/op single thread   {contended:7.0f} ns/op across {threads} threads")
+
+    # 실제 서버 규모: 단계 8개 + 대기열 2개 + 엔드포인트 15개 히스토그램, 카운터/게이지 수십 개
+    for i in range(15):
+        histogram.observe(0.1, f"endpoint_{i}")
+        gauge.inc(f"endpoint_{i}")
+    for i in range(30):
+        registry.callback(f"bench_callback_{i}_total", "Bench callback.", "counter", lambda: 42)
+    runs = 200
+    start = time.perf_counter()
+    for _ in range(runs):
+        text = registry.render()
+    elapsed = (time.perf_counter() - start) / runs
+    print(f"  render /metrics        {elapsed * 1000:7.2f} ms per scrape ({len(text.splitlines())} lines, {len(text):,} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+# benchmarks/bench_parser.py
+#
+# 통합 파서(recipe_parser.parse_structured_recipe)와 기존 파서 4종을
+# benchmarks/corpus/ 에 저장된 Gemini 응답으로 비교하는 마이크로 벤치마크입니다.
+# (결과가 맞는지의 검증은 tests/test_recipe_parser.py)
+#   python benchmarks/bench_parser.py [repeat]
+
+import os
+import re
+import sys
+import glob
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from recipe_parser import IncrementalRecipeParser, parse_structured_recipe  # noqa: E402
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+
+
+# ─── 기존 파서 (비교용으로 원본 그대로 보존) ───
+# app.py api_recipe() 내부 함수
+def legacy_app_api_recipe(recipe_text: str, dish: str = "") -> dict:
+    parsed_data = {"dish_name": dish, "tools": [], "ingredients": [], "steps": [], "tips": ""}
+    try:
+        # Tools
+        tools_match = re.search(
+            r"\*\*필요한 도구:\*\*\s*\n(.*?)(?=\n\*\*만드는 단계:\*\*|\Z)",
+            recipe_text, re.DOTALL | re.IGNORECASE
+        )
+        if tools_match:
+            block = tools_match.group(1).strip()
+            parsed_data["tools"] = [
+                line.strip().lstrip("- ").strip()
+                for line in block.split("\n") if line.strip().startswith("-")
+            ]
+
+        # Ingredients
+        ingredients_match = re.search(
+            r"\*\*재료:\*\*\s*\n(.*?)(?=\n\*\*필요한 도구:\*\*|\Z)",
+            recipe_text, re.DOTALL | re.IGNORECASE
+        )
+        if ingredients_match:
+            block = ingredients_match.group(1).strip()
+            parsed_data["ingredients"] = [
+                line.strip().lstrip("- ").strip()
+                for line in block.split("\n") if line.strip().startswith("-")
+            ]
+
+        # Steps
+        steps_match = re.search(
+            r"\*\*만드는 단계:\*\*\s*\n(.*?)(?=\n\*\*팁:\*\*|\Z)",
+            recipe_text, re.DOTALL | re.IGNORECASE
+        )
+        if steps_match:
+            block = steps_match.group(1).strip()
+            raw = [
+                line.strip() for line in block.split("\n")
+                if re.match(r"^\d+\.\s+", line.strip())
+            ]
+            parsed_data["steps"] = [
+                re.sub(r"^\d+\.\s*", "", s).strip() for s in raw
+            ]
+
+        # Tips
+        tips_match = re.search(r"\*\*팁:\*\*\s*\n(.*?)(?=\Z)", recipe_text, re.DOTALL | re.IGNORECASE)
+        if tips_match:
+            parsed_data["tips"] = tips_match.group(1).strip()
+
+    except:
+        pass
+
+    return parsed_data
+
+
+# app.py api_image() 내부 함수
+def legacy_app_api_image(recipe_text: str) -> dict:
+    parsed_data = {"steps": []}
+    try:
+        steps_match = re.search(
+            r"\*\*만드는 단계:\*\*\s*\n(.*?)(?=\n\*\*팁:\*\*|\Z)",
+            recipe_text, re.DOTALL | re.IGNORECASE
+        )
+        if steps_match:
+            block = steps_match.group(1).strip()
+            raw = [
+                line.strip() for line in block.split("\n")
+                if re.match(r"^\d+\.\s+", line.strip())
+            ]
+            parsed_data["steps"] = [
+                re.sub(r"^\d+\.\s*", "", s).strip() for s in raw
+            ]
+    except:
+        pass
+    return parsed_data
+
+
+# recipe_step_by_step.py
+def legacy_step_by_step(recipe_text: str) -> dict:
+    parsed_data = {
+        "dish_name": "정보 없음",
+        "total_time": "정보 없음",
+        "ingredients": [],
+        "tools": [],
+        "steps": [],
+        "tips": "특별한 팁 없음"
+    }
+
+    if not recipe_text or recipe_text.startswith("오류:") or recipe_text.startswith("Gemini API 호출 중 오류"):
+        print(f"[Parser] 유효하지 않은 레시피 텍스트: {recipe_text}")
+        return parsed_data
+
+    try:
+        dish_name_match = re.search(r"\*\*요리 이름:\*\*\s*(.+?)\s*(?=\n\*\*|$)", recipe_text, re.IGNORECASE)
+        if dish_name_match:
+            parsed_data["dish_name"] = dish_name_match.group(1).strip()
+
+        total_time_match = re.search(r"\*\*전체 소요 시간:\*\*\s*(.+?)\s*(?=\n\*\*|$)", recipe_text, re.IGNORECASE)
+        if total_time_match:
+            parsed_data["total_time"] = total_time_match.group(1).strip()
+
+        ingredients_block_match = re.search(
+            r"\*\*재료:\*\*\s*\n(.*?)(?=\n\*\*필요한 도구:\*\*|\n\*\*만드는 단계:\*\*|\Z)",
+            recipe_text, re.DOTALL | re.IGNORECASE
+        )
+        if ingredients_block_match:
+            ing_text = ingredients_block_match.group(1).strip()
+            parsed_data["ingredients"] = [
+                line.strip().lstrip('- ').strip()
+                for line in ing_text.split('\n') if line.strip().lstrip('- ').strip()
+            ]
+
+        tools_block_match = re.search(
+            r"\*\*필요한 도구:\*\*\s*\n(.*?)(?=\n\*\*만드는 단계:\*\*|\n\*\*팁:\*\*|\Z)",
+            recipe_text, re.DOTALL | re.IGNORECASE
+        )
+        if tools_block_match:
+            tools_text = tools_block_match.group(1).strip()
+            parsed_data["tools"] = [
+                line.strip().lstrip('- ').strip()
+                for line in tools_text.split('\n') if line.strip().lstrip('- ').strip()
+            ]
+
+        steps_block_match = re.search(
+            r"\*\*만드는 단계:\*\*\s*\n(.*?)(?=\n\*\*팁:\*\*|\Z)",
+            recipe_text, re.DOTALL | re.IGNORECASE
+        )
+        if steps_block_match:
+            steps_text = steps_block_match.group(1).strip()
+            raw_steps = [
+                line.strip() for line in steps_text.split('\n')
+                if re.match(r"^\d+\.\s*\S+", line.strip())
+            ]
+            parsed_data["steps"] = [re.sub(r"^\d+\.\s*", "", step).strip() for step in raw_steps]
+
+        tips_block_match = re.search(r"\*\*팁:\*\*\s*\n(.*?)(?=\Z)", recipe_text, re.DOTALL | re.IGNORECASE)
+        if tips_block_match:
+            tips_text = tips_block_match.group(1).strip()
+            if tips_text:
+                parsed_data["tips"] = tips_text
+
+    except Exception as e:
+        print(f"[Parser Error] 레시피 파싱 중 오류: {e}")
+        print(f"원본 텍스트(일부): {recipe_text[:300]}")
+
+    return parsed_data
+
+# recipe_voice_assistant.py
+def legacy_voice_assistant(recipe_text: str) -> dict:
+    data = {
+        "dish_name": "Unknown",
+        "total_time": "Unknown",
+        "ingredients": [],
+        "tools": [],
+        "steps": [],
+        "tips": "No special tips"
+    }
+
+    if not recipe_text or recipe_text.startswith("Error"):
+        print(f"[Parser] Invalid recipe text: {recipe_text}")
+        return data
+
+    try:
+        # Dish Name
+        dn = re.search(r"【Dish Name】:\s*(.+?)(?=\n|$)", recipe_text, re.IGNORECASE)
+        if dn:
+            data["dish_name"] = dn.group(1).strip()
+
+        # Total Time
+        tt = re.search(r"【Total Time】:\s*(.+?)(?=\n|$)", recipe_text, re.IGNORECASE)
+        if tt:
+            data["total_time"] = tt.group(1).strip()
+
+        # Ingredients block
+        ing_block = re.search(
+            r"【Ingredients】:\s*\n(.*?)(?=\n【Tools】:|\n【Steps】:|\Z)",
+            recipe_text, re.DOTALL | re.IGNORECASE
+        )
+        if ing_block:
+            lines = ing_block.group(1).strip().split("\n")
+            data["ingredients"] = [
+                line.strip().lstrip("- ").strip()
+                for line in lines if line.strip().startswith("-")
+            ]
+
+        # Tools block
+        tools_block = re.search(
+            r"【Tools】:\s*\n(.*?)(?=\n【Steps】:|\n【Tips】:|\Z)",
+            recipe_text, re.DOTALL | re.IGNORECASE
+        )
+        if tools_block:
+            lines = tools_block.group(1).strip().split("\n")
+            data["tools"] = [
+                line.strip().lstrip("- ").strip()
+                for line in lines if line.strip().startswith("-")
+            ]
+
+        # Steps block
+        steps_block = re.search(
+            r"【Steps】:\s*\n(.*?)(?=\n【Tips】:|\Z)",
+            recipe_text, re.DOTALL | re.IGNORECASE
+        )
+        if steps_block:
+            lines = steps_block.group(1).strip().split("\n")
+            raw_steps = [
+                line.strip() for line in lines
+                if re.match(r"^\d+\.\s+", line.strip())
+            ]
+            data["steps"] = [
+                re.sub(r"^\d+\.\s*", "", step).strip() for step in raw_steps
+            ]
+
+        # Tips block
+        tips_block = re.search(r"【Tips】:\s*(.+?)(?=\Z)", recipe_text, re.DOTALL | re.IGNORECASE)
+        if tips_block:
+            data["tips"] = tips_block.group(1).strip()
+
+    except Exception as e:
+        print(f"[Parser Error] Parsing recipe failed: {e}")
+        print(f"Partial text: {recipe_text[:300]}")
+
+    return data
+
+LEGACY_PARSERS = {
+    "app.api_recipe": legacy_app_api_recipe,
+    "app.api_image": legacy_app_api_image,
+    "recipe_step_by_step": legacy_step_by_step,
+    "recipe_voice_assistant": legacy_voice_assistant,
+}
+
+
+def load_corpus() -> dict:
+    corpus = {}
+    for path in sorted(glob.glob(os.path.join(CORPUS_DIR, "*.txt"))):
+        with open(path, encoding="utf-8") as f:
+            corpus[os.path.basename(path)] = f.read()
+    return corpus
+
+
+def bench(fn, texts, repeat: int) -> float:
+    """
+    Best-of-5 mean microseconds per parse over `texts`.
+    """
+    timer = timeit.Timer(lambda: [fn(t) for t in texts])
+    best = min(timer.repeat(repeat=5, number=repeat))
+    return best / (repeat * len(texts)) * 1e6
+
+
+def parse_streamed(text: str) -> dict:
+    parser = IncrementalRecipeParser()
+    for i in range(0, len(text), 16):
+        parser.feed(text[i:i + 16])
+    parser.close()
+    return parser.recipe
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    corpus = load_corpus()
+
+    # 기존 파서가 출력하는 로그를 벤치마크 결과와 섞지 않도록 stdout을 잠시 막음
+    real_stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    try:
+        # 각 기존 파서는 자기가 이해하는 제목 형식의 응답에 대해서만 비교 (단계를 1개 이상 찾은 응답)
+        understood = {
+            name: [text for text in corpus.values() if fn(text).get("steps")]
+            for name, fn in LEGACY_PARSERS.items()
+        }
+        rows = []
+        for name, fn in LEGACY_PARSERS.items():
+            texts = understood[name]
+            if texts:
+                rows.append((name, len(texts), bench(fn, texts, repeat),
+                             bench(parse_structured_recipe, texts, repeat)))
+        all_texts = list(corpus.values())
+        unified_all = bench(parse_structured_recipe, all_texts, repeat)
+        streamed_all = bench(parse_streamed, all_texts, repeat)
+
+        coverage = []
+        for filename, text in corpus.items():
+            unified = parse_structured_recipe(text)
+            legacy = {name: fn(text) for name, fn in LEGACY_PARSERS.items()}
+            coverage.append((filename, unified, legacy))
+    finally:
+        sys.stdout.close()
+        sys.stdout = real_stdout
+
+    print(f"corpus: {len(corpus)} responses from {CORPUS_DIR}")
+    print(f"unified parser over the whole corpus: {unified_all:.1f} us/parse")
+    print(f"streaming parser (16-char chunks)   : {streamed_all:.1f} us/parse")
+    print()
+    print(f"{'legacy parser':<24}{'responses':>10}{'legacy us':>11}{'unified us':>12}{'speedup':>9}")
+    for name, count, legacy_us, unified_us in rows:
+        print(f"{name:<24}{count:>10}{legacy_us:>11.1f}{unified_us:>12.1f}{legacy_us / unified_us:>8.2f}x")
+
+    print()
+    print("steps found (unified / " + " / ".join(LEGACY_PARSERS) + ")")
+    for filename, unified, legacy in coverage:
+        counts = " / ".join(str(len(parsed.get("steps", []))) for parsed in legacy.values())
+        print(f"  {filename:<26}{len(unified['steps']):>3} / {counts}")
+
+
+if __name__ == "__main__":
+    main()
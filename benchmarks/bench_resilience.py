@@ -0,0 +1,146 @@
+# benchmarks/bench_resilience.py
+#
+# 429(할당량 초과)와 503(장애)을 흉내 내는 가짜 Gemini로 generate_recipe()를 두드려서
+# 보호 장치가 없을 때와 resilience.Guard(토큰 버킷 + 백오프 재시도 + 서킷 브레이커)를 쓸 때를 비교합니다.
+# 클라이언트는 오류를 받으면 곧바로 최대 3번 다시 요청합니다 (과부하를 키우는 전형적인 재시도).
+#   python benchmarks/bench_resilience.py [requests] [quota_per_sec] [latency_sec]
+
+import os
+import sys
+import time
+import tempfile
+import threading
+import statistics
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("GEMINI_API_KEY", "fake-key")
+os.environ["AICHEF_RECIPE_CACHE_DIR"] = tempfile.mkdtemp(prefix="aichef_bench_cache_")
+
+import recipe_core as recipe_api  # noqa: E402
+from clients import registry  # noqa: E402
+from resilience import Guard, TokenBucket, CircuitBreaker  # noqa: E402
+
+CLIENT_THREADS = 32
+CLIENT_RETRIES = 3
+
+
+class ResourceExhausted(Exception):
+    """Same class name as google.api_core.exceptions.ResourceExhausted (HTTP 429)."""
+
+
+class ServiceUnavailable(Exception):
+    """Same class name as google.api_core.exceptions.ServiceUnavailable (HTTP 503)."""
+
+
+class QuotaFakeGenai:
+    """
+    Stand-in for `genai` that accepts at most `quota_per_sec` calls in any 1 s window
+    (others get a 429) and fails every call with a 503 while `outage` is set.
+    """
+
+    def __init__(self, quota_per_sec: int, latency_sec: float):
+        self.quota_per_sec = quota_per_sec
+        self.latency_sec = latency_sec
+        self.outage = False
+        self.calls = 0
+        self.rejected_429 = 0
+        self.failed_503 = 0
+        self._window = deque()
+        self._lock = threading.Lock()
+
+    def GenerativeModel(self, model_name: str):
+        return self
+
+    def generate_content(self, prompt: str):
+        now = time.monotonic()
+        with self._lock:
+            self.calls += 1
+            if self.outage:
+                self.failed_503 += 1
+                raise ServiceUnavailable("503 The service is currently unavailable.")
+            while self._window and now - self._window[0] >= 1.0:
+                self._window.popleft()
+            if len(self._window) >= self.quota_per_sec:
+                self.rejected_429 += 1
+                raise ResourceExhausted("429 Resource has been exhausted (e.g. check quota).")
+            self._window.append(now)
+        time.sleep(self.latency_sec)
+        return type("FakeResponse", (), {"text": f"Recipe for {prompt[-40:]}"})()
+
+
+def client_request(i: int) -> tuple:
+    """
+    One client: up to CLIENT_RETRIES immediate retries. Returns (ok, overloaded, seconds).
+    """
+    start = time.perf_counter()
+    for _ in range(CLIENT_RETRIES + 1):
+        text = recipe_api.generate_recipe(f"bench dish {i} {time.perf_counter()}", use_cache=False)
+        if not text.startswith("Error"):
+            return True, False, time.perf_counter() - start
+    return False, text.startswith(recipe_api.GEMINI_OVERLOADED_ERROR), time.perf_counter() - start
+
+
+def run(name: str, guard: Guard, fake: QuotaFakeGenai, n: int, interval: float = 0.0, outage_sec: float = 0.0):
+    recipe_api.genai = fake
+    recipe_api.gemini_guard = guard
+    registry.reset()   # 이전 백엔드로 만든 모델을 재사용하지 않도록
+
+    if outage_sec:
+        fake.outage = True
+        threading.Timer(outage_sec, lambda: setattr(fake, "outage", False)).start()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=CLIENT_THREADS) as pool:
+        futures = []
+        for i in range(n):
+            futures.append(pool.submit(client_request, i))
+            if interval:
+                time.sleep(interval)
+        results = [f.result() for f in futures]
+    wall = time.perf_counter() - start
+
+    ok = [sec for success, _, sec in results if success]
+    failed = [sec for success, _, sec in results if not success]
+    shed = sum(1 for success, overloaded, _ in results if not success and overloaded)
+    p95 = sorted(ok)[max(0, int(len(ok) * 0.95) - 1)] if ok else 0.0
+    print(f"  {name:<10} ok {len(ok):4d}/{n}  failed {len(failed):4d} (503-able {shed:4d})  "
+          f"upstream calls {fake.calls:5d}  429s {fake.rejected_429:5d}  503s {fake.failed_503:4d}  "
+          f"ok p50 {statistics.median(ok) if ok else 0:5.2f}s p95 {p95:5.2f}s  "
+          f"failed p50 {statistics.median(failed) if failed else 0:5.2f}s  wall {wall:5.1f}s")
+    stats = guard.stats()
+    if guard.bucket is not None:
+        print(f"  {'':<10} retries {stats['retries']}  queue waits {stats['queue_waits']} "
+              f"(max {stats['max_queue_wait_sec']:.2f}s)  rejected: rate limit {stats['rejected_rate_limited']}, "
+              f"circuit {stats['rejected_circuit_open']}  circuit opened {stats.get('circuit_opened', 0)}")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 120
+    quota = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    latency_sec = float(sys.argv[3]) if len(sys.argv) > 3 else 0.2
+
+    def unguarded():
+        return Guard("gemini", max_retries=0)
+
+    def guarded(reset_sec=30.0):
+        return Guard("gemini", TokenBucket(quota, quota), CircuitBreaker(5, reset_sec),
+                     max_retries=3, max_queue_wait=10.0)
+
+    print(f"burst: {n} requests at once, quota {quota}/s, latency {latency_sec:.1f}s, "
+          f"{CLIENT_THREADS} client threads, clients retry {CLIENT_RETRIES}x immediately")
+    run("none", unguarded(), QuotaFakeGenai(quota, latency_sec), n)
+    run("guard", guarded(), QuotaFakeGenai(quota, latency_sec), n)
+
+    outage_sec = 3.0
+    print(f"\noutage: upstream returns 503 for the first {outage_sec:.0f}s, {n // 2} requests over "
+          f"{n // 2 * 0.1:.0f}s (breaker opens after 5 failures, probes after 1s)")
+    run("none", unguarded(), QuotaFakeGenai(quota, latency_sec), n // 2, interval=0.1, outage_sec=outage_sec)
+    run("guard", guarded(reset_sec=1.0), QuotaFakeGenai(quota, latency_sec), n // 2, interval=0.1,
+        outage_sec=outage_sec)
+
+
+if __name__ == "__main__":
+    main()
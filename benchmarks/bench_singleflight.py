@@ -0,0 +1,77 @@
+# benchmarks/bench_singleflight.py
+#
+# 느린 가짜 Gemini 백엔드로 동시 요청 N개가 업스트림 호출 몇 번으로 합쳐지는지와 걸린 시간을 봅니다.
+# (호출이 1번인지의 검증은 tests/test_singleflight.py)
+#   python benchmarks/bench_singleflight.py [N] [latency_sec]
+
+import os
+import sys
+import time
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GEMINI_API_KEY", "fake-key")
+os.environ["AICHEF_RECIPE_CACHE_DIR"] = tempfile.mkdtemp(prefix="aichef_bench_cache_")
+
+import recipe_core as recipe_api  # noqa: E402
+from clients import registry  # noqa: E402
+from resilience import Guard  # noqa: E402
+
+# 가짜 백엔드에는 할당량이 없으므로 Gemini 호출 속도를 제한하지 않음
+recipe_api.gemini_guard = Guard("gemini", max_retries=0)
+
+
+class FakeSlowGenai:
+    """
+    Stand-in for the `genai` module: every generate_content call sleeps
+    `latency_sec` and is counted.
+    """
+
+    def __init__(self, latency_sec: float):
+        self.latency_sec = latency_sec
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def GenerativeModel(self, model_name: str):
+        return self
+
+    def generate_content(self, prompt: str):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency_sec)
+        return type("FakeResponse", (), {"text": "【Dish Name】: Kimchi Jjim\n【Steps】:\n1. Simmer.\n"})()
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    latency_sec = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+
+    fake = FakeSlowGenai(latency_sec)
+    recipe_api.genai = fake
+    registry.reset()   # 이전 백엔드로 만든 모델을 재사용하지 않도록
+    recipe_api.recipe_cache.clear()
+
+    # 대소문자/공백이 달라도 같은 요리로 정규화되어야 함
+    dishes = ["kimchi jjim", "Kimchi Jjim", "  kimchi   jjim "]
+    barrier = threading.Barrier(n)
+
+    def request(i):
+        barrier.wait()
+        return recipe_api.generate_recipe(dishes[i % len(dishes)])
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        results = list(pool.map(request, range(n)))
+    elapsed = time.perf_counter() - start
+
+    print(f"concurrent requests : {n}")
+    print(f"upstream calls      : {fake.calls}")
+    print(f"distinct results    : {len(set(results))}")
+    print(f"wall time           : {elapsed:.3f}s (backend latency {latency_sec:.3f}s)")
+    print(f"singleflight stats  : {recipe_api.recipe_flights.stats()}")
+
+
+if __name__ == "__main__":
+    main()
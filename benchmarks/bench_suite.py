@@ -0,0 +1,313 @@
+# benchmarks/bench_suite.py
+#
+# 자격 증명/네트워크 없이 fake_backends(실제와 비슷한 지연 분포의 Gemini, TTS, STT 대역)로 돌리는 종합 벤치마크:
+#   recipe  — Flask /api/recipe 처리량 (캐시 미스 / 캐시 적중)
+#   image   — /api/image 단계 이미지가 준비되기까지의 시간과, 준비된 뒤 /api/image 처리량
+#   parse   — benchmarks/corpus 레시피 파싱 비용
+#   voice   — 음성 한 턴 (발화 끝 → VAD → STT → 명령 판단 → TTS 첫 바이트), 프리페치 유무 비교
+# 결과는 커밋 해시와 함께 JSON으로 저장되어 커밋 간 비교에 씁니다.
+#   python benchmarks/bench_suite.py [--scale 1.0] [--only recipe,voice] [--out result.json]
+#   python benchmarks/bench_suite.py --compare old.json new.json
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ["AICHEF_BACKEND"] = "fake"
+os.environ.setdefault("AICHEF_FAKE_SEED", "1")
+os.environ.setdefault("GEMINI_API_KEY", "fake-key")
+os.environ["AICHEF_RECIPE_CACHE_DIR"] = tempfile.mkdtemp(prefix="aichef_bench_cache_")
+os.environ["AICHEF_IMAGE_STORE_DIR"] = tempfile.mkdtemp(prefix="aichef_bench_images_")
+os.environ["AICHEF_TTS_CACHE_DIR"] = tempfile.mkdtemp(prefix="aichef_bench_tts_")
+os.environ["AICHEF_TRACE_DIR"] = ""
+
+import fake_backends  # noqa: E402
+import recipe_core as recipe_api  # noqa: E402
+from resilience import Guard  # noqa: E402
+from image_jobs import ImageJobQueue  # noqa: E402
+from recipe_parser import parse_structured_recipe  # noqa: E402
+from intent_matcher import navigation_matcher  # noqa: E402
+from speech_prefetch import SpeechPrefetcher  # noqa: E402
+from tracing import stage_durations  # noqa: E402
+from vad import EnergyVAD  # noqa: E402
+from clients import speech_client, speech_module  # noqa: E402
+from generate_recipe_gemini_api import synthesize_speech  # noqa: E402
+import app as sync_app  # noqa: E402
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+SECTIONS = ("recipe", "image", "parse", "voice")
+
+# 가짜 백엔드에는 할당량이 없으므로 Gemini 호출 속도를 제한하지 않음
+recipe_api.gemini_guard = Guard("gemini", max_retries=0)
+
+
+def summary(values: list) -> dict:
+    ordered = sorted(values)
+    return {
+        "n": len(ordered),
+        "p50": round(statistics.median(ordered), 4),
+        "p95": round(ordered[max(0, int(len(ordered) * 0.95 + 0.5) - 1)], 4),
+        "mean": round(statistics.fmean(ordered), 4),
+    }
+
+
+def run_threads(fn, items: list, workers: int) -> tuple:
+    """
+    Returns (per-item seconds, wall seconds).
+    """
+    def timed(item):
+        start = time.perf_counter()
+        fn(item)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        latencies = list(pool.map(timed, items))
+    return latencies, time.perf_counter() - start
+
+
+# ─── /api/recipe ───
+def bench_recipe(dishes: int = 32, workers: int = 8) -> dict:
+    client = sync_app.app.test_client()
+    # 이 구간은 레시피 처리만 재므로 단계 이미지 생성은 자리표시 URL로 대신함
+    image_jobs = sync_app.api.image_jobs
+    sync_app.api.image_jobs = ImageJobQueue(lambda dish, idx, desc: recipe_api.placeholder_image_url(dish, idx))
+
+    def get(dish):
+        response = client.get(f"/api/recipe?dish={dish}")
+        assert response.status_code == 200, response.get_data(as_text=True)
+
+    names = [f"suite dish {i}" for i in range(dishes)]
+    try:
+        cold, cold_wall = run_threads(get, names, workers)
+        warm, warm_wall = run_threads(get, names * 4, workers)
+    finally:
+        sync_app.api.image_jobs = image_jobs
+    return {
+        "workers": workers,
+        "miss": {"req_per_sec": round(len(cold) / cold_wall, 2), "latency_sec": summary(cold)},
+        "hit": {"req_per_sec": round(len(warm) / warm_wall, 1), "latency_sec": summary(warm)},
+    }
+
+
+# ─── /api/image ───
+def bench_image(recipes: int = 2, hot_requests: int = 500, workers: int = 8) -> dict:
+    client = sync_app.app.test_client()
+    pending = []
+    start = time.perf_counter()
+    for i in range(recipes):
+        data = client.get(f"/api/recipe?dish=suite image dish {i}").get_json()
+        pending.extend((data["recipe_id"], idx) for idx in range(len(data["steps"])))
+
+    # 화면이 단계마다 /api/image를 부르고, 아직 없으면 작업이 끝날 때까지 long polling
+    def ready(item):
+        recipe_id, idx = item
+        response = client.get(f"/api/image?recipe_id={recipe_id}&step_index={idx}")
+        data = response.get_json()
+        if response.status_code == 202:
+            data = client.get(f"{data['poll']}?wait=25").get_json()
+        assert data["status"] == "done", data
+        return data["url"]
+
+    waits, _ = run_threads(ready, pending, workers)
+    ready_wall = time.perf_counter() - start
+    local = sum(1 for item in pending if ready(item).startswith(recipe_api.IMAGE_URL_PREFIX))
+
+    hot, hot_wall = run_threads(ready, [pending[i % len(pending)] for i in range(hot_requests)], workers)
+    return {
+        "images": len(pending),
+        "stored_locally": local,
+        "all_ready_sec": round(ready_wall, 3),
+        "images_per_sec": round(len(pending) / ready_wall, 2),
+        "wait_sec": summary(waits),
+        "hot": {"req_per_sec": round(len(hot) / hot_wall, 1), "latency_sec": summary(hot)},
+    }
+
+
+# ─── 파싱 ───
+def bench_parse(repeat: int = 200) -> dict:
+    texts = []
+    for name in sorted(os.listdir(os.path.join(ROOT, "benchmarks", "corpus"))):
+        with open(os.path.join(ROOT, "benchmarks", "corpus", name), encoding="utf-8") as f:
+            texts.append(f.read())
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            parse_structured_recipe(text)
+    per_recipe = (time.perf_counter() - start) / (repeat * len(texts))
+    return {"recipes": len(texts), "us_per_recipe": round(per_recipe * 1e6, 1)}
+
+
+# ─── 음성 한 턴 ───
+STEPS = [f"Step description number {i} with enough words to take a few seconds to say." for i in range(12)]
+RATE = 16000
+CHUNK_SEC = 0.1
+
+
+def command_chunks() -> list:
+    """
+    A synthetic 0.6 s voiced "command" between quiet stretches, as 100 ms mic chunks.
+    """
+    rng = np.random.default_rng(0)
+    t = np.arange(int(0.6 * RATE)) / RATE
+    voiced = sum(np.sin(2 * np.pi * 150 * k * t) / k for k in range(1, 6)) * 6000
+    audio = np.concatenate([np.zeros(int(0.3 * RATE)), voiced, np.zeros(int(1.5 * RATE))])
+    pcm = (audio + rng.normal(0, 30, len(audio))).astype(np.int16).tobytes()
+    step = int(RATE * CHUNK_SEC) * 2
+    return [pcm[i:i + step] for i in range(0, len(pcm), step)]
+
+
+COMMAND_CHUNKS = command_chunks()
+
+
+def voice_turn(prefetcher, idx: int, think_sec: float, audio_scale: float) -> dict:
+    """
+    One "next step" turn. The spoken command goes through EnergyVAD with
+    chunks paced at `audio_scale` x their duration, so the end of speech and
+    the VAD endpoint are measured. The fake recognizer only counts bytes;
+    there is no speaker, so playback starts as soon as the PCM is ready.
+    """
+    speech = speech_module()
+    config = speech.StreamingRecognitionConfig(config=speech.RecognitionConfig(), interim_results=False)
+    phrase = f"Step {idx + 2}: {STEPS[idx + 1]}"
+    if prefetcher is not None:
+        prefetcher.prefetch([phrase, f"Repeating step {idx + 1}: {STEPS[idx]}"])
+    # 사용자가 단계를 수행하는 동안 (이 사이에 프리페치가 진행됨)
+    time.sleep(think_sec)
+
+    vad = EnergyVAD(sample_rate=RATE)
+    requests = []
+    for chunk in COMMAND_CHUNKS:
+        # 마이크처럼 조각 하나가 다 녹음된 뒤에 도착
+        time.sleep(CHUNK_SEC * audio_scale)
+        requests += [speech.StreamingRecognizeRequest(audio_content=voiced) for voiced in vad.process(chunk)]
+        if vad.utterance_ended:
+            break
+    assert vad.utterance_ended
+    marks = {"speech_end": vad.last_voiced_at, "vad_end": time.perf_counter()}
+    transcript = ""
+    for response in speech_client().streaming_recognize(config, iter(requests)):
+        transcript = response.results[0].alternatives[0].transcript
+    marks["stt_final"] = time.perf_counter()
+    assert navigation_matcher.intent(transcript) == "next", transcript
+    marks["intent"] = time.perf_counter()
+    marks["tts_request"] = time.perf_counter()
+    pcm_data = prefetcher.get(phrase) if prefetcher is not None else None
+    if pcm_data is None:
+        pcm_data = synthesize_speech(phrase)
+    assert pcm_data
+    marks["tts_first_byte"] = marks["playback_start"] = time.perf_counter()
+    return stage_durations(marks)
+
+
+def bench_voice(turns: int = 10, think_sec: float = 2.0, audio_scale: float = 1.0) -> dict:
+    results = {}
+    for mode in ("no_prefetch", "prefetch"):
+        # 모드마다 다른 문장을 써서 앞 모드의 TTS 캐시를 재사용하지 않도록
+        STEPS[:] = [f"{mode} step description number {i} with enough words to take a few seconds to say."
+                    for i in range(turns + 1)]
+        prefetcher = SpeechPrefetcher(synthesize_speech, None) if mode == "prefetch" else None
+        stages = [voice_turn(prefetcher, idx, think_sec, audio_scale) for idx in range(turns)]
+        if prefetcher is not None:
+            prefetcher.close()
+        results[mode] = {name: summary([s[name] for s in stages]) for name in stages[0]}
+    return results
+
+
+# ─── 결과 저장/비교 ───
+def git_revision() -> dict:
+    def git(*args):
+        return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, timeout=30).stdout.strip()
+    try:
+        return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+    except (OSError, subprocess.SubprocessError):
+        return {"commit": None, "dirty": None}
+
+
+def flatten(data: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in data.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def compare(old_path: str, new_path: str):
+    with open(old_path, encoding="utf-8") as f:
+        old = json.load(f)
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)
+    print(f"old: {(old.get('commit') or '?')[:10]}  {old_path}")
+    print(f"new: {(new.get('commit') or '?')[:10]}  {new_path}")
+    if old.get("settings") != new.get("settings"):
+        print(f"warning: settings differ: {old.get('settings')} vs {new.get('settings')}")
+    before, after = flatten(old["results"]), flatten(new["results"])
+    for key in sorted(before.keys() & after.keys()):
+        a, b = before[key], after[key]
+        change = f"{(b - a) / a:+7.1%}" if a else "      -"
+        print(f"  {key:<45} {a:>12g} → {b:>12g}  {change}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark suite on fake Gemini/TTS/STT backends.")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every fake latency (1.0 = realistic)")
+    parser.add_argument("--only", default=",".join(SECTIONS), help=f"comma-separated sections ({', '.join(SECTIONS)})")
+    parser.add_argument("--out", help="result JSON path (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    sections = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = set(sections) - set(SECTIONS)
+    if unknown:
+        parser.error(f"unknown section(s): {', '.join(sorted(unknown))}")
+
+    fake_backends.set_latency(args.scale)
+    random.seed(int(os.environ["AICHEF_FAKE_SEED"]))
+    runs = {"recipe": bench_recipe, "image": bench_image, "parse": bench_parse,
+            # 생각하는 시간도 같은 비율로 줄여야 프리페치 효과가 실제와 같게 나타남
+            "voice": lambda: bench_voice(think_sec=2.0 * args.scale, audio_scale=args.scale)}
+    results = {}
+    for name in sections:
+        print(f"[Bench] {name} ...")
+        start = time.perf_counter()
+        results[name] = runs[name]()
+        print(f"[Bench] {name} done in {time.perf_counter() - start:.1f}s: {json.dumps(results[name])}")
+
+    revision = git_revision()
+    report = {
+        **revision,
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "settings": {"latency_scale": args.scale, "seed": os.environ["AICHEF_FAKE_SEED"],
+                     "latency": fake_backends.LATENCY},
+        "results": results,
+    }
+    out = args.out
+    if not out:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        out = os.path.join(RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{(revision['commit'] or 'nogit')[:10]}.json")
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"[Bench] Results written to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+# benchmarks/make_kws_clips.py
+#
+# 키워드 검출기용 명령어 WAV를 espeak-ng로 합성합니다 (개발용 도구, 앱은 필요 없음).
+#   pip install espeakng-loader numpy
+#   python benchmarks/make_kws_clips.py
+# 화자(음성 변형)를 둘로 나눠서
+#   kws_templates/<language_code>/<label>/<voice>.wav          : 앱이 싣는 템플릿
+#   benchmarks/kws_clips/<language_code>/<label>/<voice>.wav   : 평가용 (템플릿에 없는 화자)
+#   benchmarks/kws_clips/<language_code>/_unknown/<voice>-N.wav : 명령어가 아닌 발화
+# 를 만듭니다. 합성 음성이므로 실제 사용자 녹음으로 바꾸면 정확도가 더 올라갑니다.
+
+import os
+import sys
+import wave
+import ctypes
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE_DIR = os.path.join(ROOT, "kws_templates")
+CLIPS_DIR = os.path.join(ROOT, "benchmarks", "kws_clips")
+RATE = 16000
+
+# label(폴더 이름)은 인식 결과로 intent_matcher에 그대로 전달되므로 NAVIGATION_INTENTS의 문구여야 함
+COMMANDS = {
+    "en-US": {"next": "next", "previous": "previous", "repeat": "repeat", "stop": "stop"},
+    "ko-KR": {"다음": "다음", "이전": "이전", "반복": "반복", "그만": "그만"},
+}
+# 명령어가 아닌 짧은 발화: 클라우드로 넘어가야 정답 (발음이 비슷한 "next time", "다음에" 포함)
+UNKNOWN = {
+    "en-US": ["next time", "what's next for dinner", "salt", "how long", "hello there", "not yet"],
+    "ko-KR": ["다음에", "소금", "몇 분", "안녕", "잠깐만", "이거 뭐야"],
+}
+# (espeak 음성 변형, 말하기 속도 wpm, 기본 음높이 0-99). 템플릿과 평가용 화자는 겹치지 않음
+TEMPLATE_VOICES = [("m1", 165, 45), ("f2", 170, 60), ("m3", 150, 35), ("f4", 160, 70)]
+HELDOUT_VOICES = [("m7", 175, 40), ("f1", 155, 65), ("m5", 185, 50), ("f5", 145, 55), ("klatt3", 165, 45)]
+ESPEAK_LANG = {"en-US": "en-us", "ko-KR": "ko"}
+
+
+class Espeak:
+    """
+    Minimal ctypes binding: synthesizes text to int16 samples at 16 kHz.
+    """
+
+    def __init__(self):
+        try:
+            import espeakng_loader
+        except ImportError:
+            sys.exit("Error: pip install espeakng-loader (only needed to regenerate the clips)")
+        self.lib = ctypes.cdll.LoadLibrary(espeakng_loader.get_library_path())
+        # AUDIO_OUTPUT_SYNCHRONOUS = 2
+        self.rate = self.lib.espeak_Initialize(2, 0, espeakng_loader.get_data_path().encode(), 0)
+        self._samples = []
+        callback_type = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.POINTER(ctypes.c_short), ctypes.c_int, ctypes.c_void_p)
+        self._callback = callback_type(self._collect)
+        self.lib.espeak_SetSynthCallback(self._callback)
+
+    def _collect(self, wav, n, events):
+        if n > 0:
+            self._samples.append(np.ctypeslib.as_array(wav, shape=(n,)).copy())
+        return 0
+
+    def say(self, text: str, voice: str, wpm: int, pitch: int) -> np.ndarray:
+        self.lib.espeak_SetVoiceByName(voice.encode())
+        self.lib.espeak_SetParameter(1, wpm, 0)     # espeakRATE
+        self.lib.espeak_SetParameter(3, pitch, 0)   # espeakPITCH
+        self._samples = []
+        data = text.encode("utf-8")
+        # espeakCHARS_UTF8 = 1, POS_CHARACTER = 1
+        self.lib.espeak_Synth(data, len(data) + 1, 0, 1, 0, 1, None, None)
+        self.lib.espeak_Synchronize()
+        samples = np.concatenate(self._samples).astype(np.float32)
+        positions = np.arange(0, len(samples), self.rate / RATE)
+        return np.interp(positions, np.arange(len(samples)), samples).astype(np.int16)
+
+
+def write_wav(path: str, samples: np.ndarray):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(RATE)
+        wf.writeframes(samples.tobytes())
+
+
+def main():
+    espeak = Espeak()
+    count = 0
+    for language_code, commands in COMMANDS.items():
+        lang = ESPEAK_LANG[language_code]
+        for target, voices in ((TEMPLATE_DIR, TEMPLATE_VOICES), (CLIPS_DIR, HELDOUT_VOICES)):
+            for label, text in commands.items():
+                for variant, wpm, pitch in voices:
+                    samples = espeak.say(text, f"{lang}+{variant}", wpm, pitch)
+                    write_wav(os.path.join(target, language_code, label, f"{variant}.wav"), samples)
+                    count += 1
+        for variant, wpm, pitch in HELDOUT_VOICES:
+            for i, text in enumerate(UNKNOWN[language_code]):
+                samples = espeak.say(text, f"{lang}+{variant}", wpm, pitch)
+                write_wav(os.path.join(CLIPS_DIR, language_code, "_unknown", f"{variant}-{i}.wav"), samples)
+                count += 1
+    print(f"[KWS] Wrote {count} clip(s) to {TEMPLATE_DIR} and {CLIPS_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+# clients.py
+
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+
+class _Entry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.client = None
+        self.construct_sec = None
+        self.first_call_sec = None
+        self.calls = 0
+
+
+class ClientRegistry:
+    """
+    Process-wide registry of API clients. Each client is constructed once (on
+    first use) and then shared by every thread; construction and first-call
+    latency are recorded per client. Building one client does not block
+    lookups of other clients that already exist.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def _entry(self, name: str) -> _Entry:
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                entry = self._entries[name] = _Entry()
+            return entry
+
+    def get(self, name: str, factory):
+        """
+        Return the client registered as `name`, calling `factory()` to build it the first time.
+        """
+        entry = self._entry(name)
+        if entry.client is not None:
+            return entry.client
+        with entry.lock:
+            if entry.client is None:
+                start = time.perf_counter()
+                client = factory()
+                entry.construct_sec = time.perf_counter() - start
+                entry.client = client
+                print(f"[Clients] {name} created in {entry.construct_sec * 1000:.1f} ms")
+            return entry.client
+
+    def record_call(self, name: str, seconds: float):
+        entry = self._entry(name)
+        with entry.lock:
+            entry.calls += 1
+            if entry.first_call_sec is None:
+                entry.first_call_sec = seconds
+
+    @contextmanager
+    def timed(self, name: str):
+        """
+        `with registry.timed("tts"): client.synthesize_speech(...)` records the call latency.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_call(name, time.perf_counter() - start)
+
+    def reset(self):
+        """
+        Forget every client (e.g. after swapping in a fake SDK in a benchmark).
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = dict(self._entries)
+        return {
+            name: {
+                "created": entry.client is not None,
+                "construct_sec": entry.construct_sec,
+                "first_call_sec": entry.first_call_sec,
+                "calls": entry.calls,
+            }
+            for name, entry in entries.items()
+        }
+
+
+registry = ClientRegistry()
+
+# ——— 백엔드 선택 ———
+# "fake"이면 Google SDK 대신 fake_backends의 로컬 대역을 사용 (자격 증명/네트워크 없이 실행, 벤치마크)
+BACKEND = os.getenv("AICHEF_BACKEND", "google")
+
+
+def use_fake_backends() -> bool:
+    return BACKEND == "fake"
+
+
+def texttospeech_module():
+    """
+    `google.cloud.texttospeech`, or its stand-in with AICHEF_BACKEND=fake.
+    """
+    if use_fake_backends():
+        from fake_backends import texttospeech
+        return texttospeech
+    from google.cloud import texttospeech
+    return texttospeech
+
+
+def speech_module():
+    """
+    `google.cloud.speech`, or its stand-in with AICHEF_BACKEND=fake.
+    """
+    if use_fake_backends():
+        from fake_backends import speech
+        return speech
+    from google.cloud import speech
+    return speech
+
+
+# ——— 클라이언트별 접근 함수 ———
+def gemini_model(genai, model_name: str):
+    """
+    Shared `genai.GenerativeModel` for `model_name`.
+    """
+    return registry.get(f"gemini:{model_name}", lambda: genai.GenerativeModel(model_name=model_name))
+
+
+def tts_client():
+    texttospeech = texttospeech_module()
+    return registry.get("tts", texttospeech.TextToSpeechClient)
+
+
+def speech_client(credentials=None):
+    speech = speech_module()
+    return registry.get("speech", lambda: speech.SpeechClient(credentials=credentials))
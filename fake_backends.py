@@ -0,0 +1,308 @@
+# fake_backends.py
+#
+# Google 자격 증명이나 네트워크 없이 실행하기 위한 로컬 대역 백엔드 (Gemini, Google TTS, Google STT).
+# 각 대역은 이 프로젝트가 쓰는 SDK 표면(genai, texttospeech, speech 모듈)을 그대로 흉내 내고,
+# 실제 서비스와 비슷한 지연 분포(로그 정규분포, p50/p95)와 미리 준비된 응답을 돌려줍니다.
+# AICHEF_BACKEND=fake로 켭니다 (clients.use_fake_backends()). 벤치마크: benchmarks/bench_suite.py
+
+import os
+import glob
+import math
+import time
+import zlib
+import base64
+import random
+import struct
+import asyncio
+import hashlib
+import threading
+from types import SimpleNamespace
+
+# 모든 지연에 곱하는 값 (0이면 지연 없음, 1이면 아래 분포 그대로)
+LATENCY_SCALE = float(os.getenv("AICHEF_FAKE_LATENCY_SCALE", 1.0))
+# 호출마다 이 확률로 429(할당량 초과)를 흉내 냄
+ERROR_RATE = float(os.getenv("AICHEF_FAKE_ERROR_RATE", 0.0))
+SEED = os.getenv("AICHEF_FAKE_SEED")
+
+# ——— 지연 분포 (초, (p50, p95)) ———
+# 실제 호출에서 관찰한 대략적인 값. 필요하면 set_latency()로 바꿉니다.
+LATENCY = {
+    "gemini_generate": (4.0, 9.0),      # 레시피 전체 생성
+    "gemini_stream_open": (0.9, 2.5),   # 스트리밍 첫 조각까지
+    "image_generate": (3.0, 7.0),
+    "tts_synthesize": (0.35, 0.9),
+    "stt_finalize": (0.45, 1.2),        # 마지막 오디오를 보낸 뒤 최종 결과까지
+}
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "corpus")
+FALLBACK_RECIPE = """【Dish Name】: Fried Egg
+
+【Total Time】: 5 minutes
+
+【Ingredients】:
+- Egg (1)
+- Oil (1 teaspoon)
+
+【Tools】:
+- Frying pan
+
+【Steps】:
+1. Heat the oil over medium heat.
+2. Crack the egg into the pan and cook until the white sets.
+
+【Tips】 (optional; if none, write "No special tips"):
+- No special tips
+"""
+
+TTS_SAMPLE_RATE = 24000
+TTS_SEC_PER_CHAR = 0.07     # 보통 말하기 속도 (초당 약 14자)
+TTS_MAX_SEC = 30
+
+
+class LatencyModel:
+    """
+    Log-normal latency with the given p50/p95 (seconds), scaled by LATENCY_SCALE.
+    `in_flight` / `peak_in_flight` count concurrent sleeps (calls waiting on the fake upstream).
+    """
+
+    def __init__(self, p50: float, p95: float, seed=None):
+        self.mu = math.log(p50)
+        # p95 = p50 * exp(1.645 * sigma)
+        self.sigma = math.log(p95 / p50) / 1.645 if p95 > p50 else 0.0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def sample(self) -> float:
+        with self._lock:
+            value = self._random.lognormvariate(self.mu, self.sigma)
+        return value * LATENCY_SCALE
+
+    def _enter(self):
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def _exit(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def sleep(self) -> float:
+        seconds = self.sample()
+        self._enter()
+        try:
+            time.sleep(seconds)
+        finally:
+            self._exit()
+        return seconds
+
+    async def sleep_async(self) -> float:
+        seconds = self.sample()
+        self._enter()
+        try:
+            await asyncio.sleep(seconds)
+        finally:
+            self._exit()
+        return seconds
+
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def latency(stage: str) -> LatencyModel:
+    with _models_lock:
+        model = _models.get(stage)
+        if model is None:
+            p50, p95 = LATENCY[stage]
+            model = _models[stage] = LatencyModel(p50, p95, seed=f"{SEED}:{stage}" if SEED is not None else None)
+        return model
+
+
+def set_latency(scale: float = None, **stages):
+    """
+    Change LATENCY_SCALE and/or per-stage (p50, p95), e.g. set_latency(0.1, tts_synthesize=(0.2, 0.5)).
+    """
+    global LATENCY_SCALE
+    if scale is not None:
+        LATENCY_SCALE = scale
+    with _models_lock:
+        LATENCY.update(stages)
+        _models.clear()
+
+
+class ResourceExhausted(Exception):
+    """Same class name as google.api_core.exceptions.ResourceExhausted (HTTP 429)."""
+
+
+def _maybe_fail(upstream: str):
+    if ERROR_RATE and random.random() < ERROR_RATE:
+        raise ResourceExhausted(f"429 Resource has been exhausted ({upstream}, fake)")
+
+
+# ——— 미리 준비된 응답 ———
+_recipes = None
+
+
+def canned_recipe(prompt: str) -> str:
+    """
+    A recorded Gemini answer (benchmarks/corpus/en_*.txt), chosen by a hash of the prompt.
+    """
+    global _recipes
+    if _recipes is None:
+        texts = []
+        for path in sorted(glob.glob(os.path.join(CORPUS_DIR, "en_*.txt"))):
+            with open(path, encoding="utf-8") as f:
+                texts.append(f.read())
+        _recipes = texts or [FALLBACK_RECIPE]
+    digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+    return _recipes[digest[0] % len(_recipes)]
+
+
+def solid_png(size: int, rgb: tuple) -> bytes:
+    """
+    Single-color RGB PNG (no Pillow needed).
+    """
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    row = b"\x00" + bytes(rgb) * size
+    header = struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(row * size)) + chunk(b"IEND", b""))
+
+
+def _response(text: str):
+    return SimpleNamespace(text=text)
+
+
+# ——— Gemini (genai 모듈 대역) ———
+class FakeStream:
+    """
+    Iterable (sync and async) over recipe chunks, paced so the whole body takes `body_sec`.
+    """
+
+    def __init__(self, text: str, body_sec: float, chunks: int = 8):
+        size = max(1, math.ceil(len(text) / chunks))
+        self.parts = [text[i:i + size] for i in range(0, len(text), size)]
+        self.delay = body_sec / len(self.parts)
+
+    def __iter__(self):
+        for part in self.parts:
+            time.sleep(self.delay)
+            yield _response(part)
+
+    async def __aiter__(self):
+        for part in self.parts:
+            await asyncio.sleep(self.delay)
+            yield _response(part)
+
+
+class FakeGenerativeModel:
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+
+    def _stream(self, prompt: str, opened_sec: float) -> FakeStream:
+        body_sec = max(0.0, latency("gemini_generate").sample() - opened_sec)
+        return FakeStream(canned_recipe(prompt), body_sec)
+
+    def generate_content(self, prompt: str, stream: bool = False):
+        _maybe_fail("gemini")
+        if stream:
+            return self._stream(prompt, latency("gemini_stream_open").sleep())
+        latency("gemini_generate").sleep()
+        return _response(canned_recipe(prompt))
+
+    async def generate_content_async(self, prompt: str, stream: bool = False):
+        _maybe_fail("gemini")
+        if stream:
+            return self._stream(prompt, await latency("gemini_stream_open").sleep_async())
+        await latency("gemini_generate").sleep_async()
+        return _response(canned_recipe(prompt))
+
+    def generate_image(self, prompt: str, size: str = "512x512"):
+        _maybe_fail("image")
+        latency("image_generate").sleep()
+        # 프롬프트마다 다른 색의 PNG를 data: URL로 (ImageStore.fetch가 네트워크 없이 내려받음)
+        rgb = tuple(hashlib.sha256(prompt.encode("utf-8")).digest()[:3])
+        png = solid_png(int(size.split("x")[0]), rgb)
+        url = "data:image/png;base64," + base64.b64encode(png).decode("ascii")
+        return SimpleNamespace(data=[SimpleNamespace(url=url)])
+
+
+class FakeGenai:
+    def configure(self, api_key: str = None):
+        pass
+
+    def GenerativeModel(self, model_name: str):
+        return FakeGenerativeModel(model_name)
+
+
+genai = FakeGenai()
+
+
+# ——— Google TTS (texttospeech 모듈 대역) ———
+class FakeTextToSpeechClient:
+    """
+    Returns silent LINEAR16 PCM roughly as long as the text would take to say.
+    """
+
+    def synthesize_speech(self, input=None, voice=None, audio_config=None):
+        _maybe_fail("tts")
+        latency("tts_synthesize").sleep()
+        seconds = min(TTS_MAX_SEC, len(input.text) * TTS_SEC_PER_CHAR)
+        return SimpleNamespace(audio_content=bytes(int(seconds * TTS_SAMPLE_RATE) * 2))
+
+
+texttospeech = SimpleNamespace(
+    TextToSpeechClient=FakeTextToSpeechClient,
+    SynthesisInput=SimpleNamespace,
+    VoiceSelectionParams=SimpleNamespace,
+    AudioConfig=SimpleNamespace,
+    SsmlVoiceGender=SimpleNamespace(NEUTRAL="NEUTRAL"),
+    AudioEncoding=SimpleNamespace(LINEAR16="LINEAR16"),
+)
+
+
+# ——— Google STT (speech 모듈 대역) ———
+class FakeRecognitionConfig(SimpleNamespace):
+    AudioEncoding = SimpleNamespace(LINEAR16="LINEAR16")
+
+
+class FakeSpeechClient:
+    """
+    `streaming_recognize()` consumes every request (the caller paces the audio),
+    then after the STT finalize latency returns one final result whose
+    transcript is the next entry of `transcripts` (cycled).
+    """
+
+    transcripts = ["next step"]
+
+    def __init__(self, credentials=None):
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def _next_transcript(self) -> str:
+        with self._lock:
+            transcript = self.transcripts[self._count % len(self.transcripts)]
+            self._count += 1
+        return transcript
+
+    def streaming_recognize(self, config, requests):
+        audio_bytes = sum(len(req.audio_content) for req in requests)
+        if not audio_bytes:
+            return
+        _maybe_fail("stt")
+        latency("stt_finalize").sleep()
+        alternative = SimpleNamespace(transcript=self._next_transcript(), confidence=0.95)
+        result = SimpleNamespace(is_final=True, alternatives=[alternative])
+        yield SimpleNamespace(results=[result])
+
+
+speech = SimpleNamespace(
+    SpeechClient=FakeSpeechClient,
+    RecognitionConfig=FakeRecognitionConfig,
+    StreamingRecognitionConfig=SimpleNamespace,
+    StreamingRecognizeRequest=SimpleNamespace,
+)
@@ -1,126 +1,141 @@
 # generate_recipe_gemini_api.py
+#
+# 음성 비서용 모듈: TTS 합성/재생과, recipe_core의 레시피 생성 함수를 함께 제공합니다.
+# 웹 서버는 오디오 스택이 필요 없으므로 recipe_core를 직접 사용합니다.
 
 import os
-import pyaudio        # type: ignore
-from google.cloud import texttospeech
-from google.oauth2 import service_account
-
-# ——— Gemini(Generative AI) 로드 ———
-try:
-    import generativeai as genai
-    if not hasattr(genai, "configure"):
-        raise ImportError
-except ImportError:
-    try:
-        import google.generativeai as genai
-    except ImportError:
-        genai = None
-
-if genai:
-    api_key = os.getenv("GEMINI_API_KEY")
-    if api_key:
-        genai.configure(api_key=api_key)
-    else:
-        print("Error: GEMINI_API_KEY environment variable is not set.")
-else:
-    print("Error: Cannot find Gemini module. Run 'pip install google-generativeai' or 'pip install generativeai'.")
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from audio_player import get_player
+from clients import registry, tts_client, texttospeech_module, use_fake_backends
+from singleflight import SingleFlight
+from tts_cache import TTSCache, make_tts_key
+from metrics import STAGE_SECONDS, UPSTREAM_ERRORS
+from recipe_core import generate_recipe, stream_recipe  # 음성 비서가 이 모듈에서 함께 가져다 씀
 
 # ——— TTS 함수 (PCM → PyAudio) ———
-def tts_speak(text: str):
+TTS_LANGUAGE_CODE = "en-US"
+TTS_VOICE_NAME = ""            # 빈 문자열이면 언어/성별 기준으로 Google이 음성을 고름
+TTS_ENCODING = "LINEAR16"
+TTS_SAMPLE_RATE = 24000        # default sample rate for LINEAR16
+
+tts_cache = TTSCache()
+# 워밍업 스레드와 실제 발화가 같은 문장을 동시에 합성하지 않도록 공유
+tts_flights = SingleFlight()
+
+# tts_speak()는 합성을 이 스레드들에 맡기고 바로 돌아감 (재생 순서는 AudioPlayer 큐가 보장)
+_speak_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tts-speak")
+
+# TTS 클라이언트는 clients.registry에서 프로세스당 하나만 만들어 공유
+# _speak_pool 스레드들이 함께 갱신하므로 읽고 쓸 때 _tts_timings_lock을 잡음 (읽기는 tts_timing_stats())
+tts_timings = {"synthesis_calls": 0, "total_synthesis_sec": 0.0}
+_tts_timings_lock = threading.Lock()
+
+
+def tts_timing_stats() -> dict:
+    with _tts_timings_lock:
+        return dict(tts_timings)
+
+
+def synthesize_speech(text: str, language_code: str = TTS_LANGUAGE_CODE, voice_name: str = TTS_VOICE_NAME):
     """
-    Convert `text` to speech (LINEAR16 PCM) via Google TTS
-    and play it immediately through PyAudio without writing to disk.
+    Return LINEAR16 PCM for `text`, from the on-disk TTS cache when possible,
+    otherwise via Google TTS (and then cached). Returns None on failure.
     """
+    key = make_tts_key(text, language_code, voice_name or "NEUTRAL", TTS_ENCODING)
+    pcm_data = tts_cache.get(key)
+    if pcm_data is not None:
+        return pcm_data
+    return tts_flights.do(key, _synthesize_and_cache, text, language_code, voice_name, key)
+
+def _synthesize_and_cache(text: str, language_code: str, voice_name: str, key: str):
     creds_path = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
-    if not creds_path or not os.path.isfile(creds_path):
+    if not use_fake_backends() and (not creds_path or not os.path.isfile(creds_path)):
         print(f"[TTS Skip] Credentials missing or file not found at {creds_path}. Skipping TTS for: {text}")
-        return
+        return None
 
     try:
-        client = texttospeech.TextToSpeechClient()
+        client = tts_client()
     except Exception as e:
         print(f"[TTS Error] Failed to create TTS client: {e}")
-        return
+        return None
 
     # Build synthesis request
+    texttospeech = texttospeech_module()
     synthesis_input = texttospeech.SynthesisInput(text=text)
-    voice = texttospeech.VoiceSelectionParams(
-        language_code="en-US",
-        ssml_gender=texttospeech.SsmlVoiceGender.NEUTRAL
-    )
+    if voice_name:
+        voice = texttospeech.VoiceSelectionParams(language_code=language_code, name=voice_name)
+    else:
+        voice = texttospeech.VoiceSelectionParams(
+            language_code=language_code,
+            ssml_gender=texttospeech.SsmlVoiceGender.NEUTRAL
+        )
     audio_config = texttospeech.AudioConfig(
         audio_encoding=texttospeech.AudioEncoding.LINEAR16
     )
 
     # Perform the Text-to-Speech request
     try:
-        response = client.synthesize_speech(
-            input=synthesis_input, voice=voice, audio_config=audio_config
-        )
+        start = time.perf_counter()
+        with registry.timed("tts"), STAGE_SECONDS.time("tts_synthesize"):
+            response = client.synthesize_speech(
+                input=synthesis_input, voice=voice, audio_config=audio_config
+            )
+        elapsed = time.perf_counter() - start
+        with _tts_timings_lock:
+            tts_timings["synthesis_calls"] += 1
+            tts_timings["total_synthesis_sec"] += elapsed
     except Exception as e:
+        UPSTREAM_ERRORS.inc("tts", "error")
         print(f"[TTS Error] Speech synthesis failed: {e}")
-        return
+        return None
 
     pcm_data = response.audio_content
-    try:
-        pa = pyaudio.PyAudio()
-        stream = pa.open(
-            format=pa.get_format_from_width(2),  # 16-bit PCM
-            channels=1,                          # mono
-            rate=24000,                          # default sample rate for LINEAR16
-            output=True
-        )
-        stream.write(pcm_data)
-        stream.stop_stream()
-        stream.close()
-        pa.terminate()
-    except Exception as e:
-        print(f"[TTS Error] Audio playback failed: {e}")
+    tts_cache.put(key, pcm_data)
+    return pcm_data
 
-# ——— Gemini 레시피 생성 함수 ———
-def generate_recipe(dish_name: str) -> str:
+def play_pcm(pcm_data, block: bool = True):
     """
-    Send an English-language prompt to Gemini to get a recipe for `dish_name`.
-    Returns the raw text response.
+    Play 16-bit mono PCM (or a Future of it) through the shared,
+    already-open output stream without writing to disk. Returns a
+    PlaybackHandle; with block=True it returns after playback has finished.
     """
-    if not genai:
-        return "Error: Gemini module is not installed."
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        return "Error: GEMINI_API_KEY environment variable is not set."
-
-    try:
-        model = genai.GenerativeModel(model_name="models/gemini-1.5-pro-latest")
-        prompt = f'''
-Please provide a detailed cooking recipe for the dish named "{dish_name}". 
-Use the following format exactly, including headings:
-
-【Dish Name】: [Insert dish name]
-
-【Total Time】: [Insert estimated total time, or "Unknown" if not available]
-
-【Ingredients】:
-- [Ingredient 1 (quantity)]
-- [Ingredient 2 (quantity)]
-- ...
-
-【Tools】:
-- [Tool 1]
-- [Tool 2]
-- ...
+    handle = get_player(TTS_SAMPLE_RATE).play(pcm_data)
+    if block:
+        handle.wait()
+    return handle
 
-【Steps】:
-1. [First step detailed description]
-2. [Second step detailed description]
-3. ...
-
-【Tips】 (optional; if none, write "No special tips"):
-- [Any additional tip or caution]
+def tts_speak(text: str, block: bool = True):
+    """
+    Convert `text` to speech (LINEAR16 PCM) via Google TTS
+    and play it immediately through PyAudio without writing to disk.
+    Repeated texts are played from the TTS cache without a network call.
+    Synthesis runs in the background, so with block=False the call returns
+    a PlaybackHandle right away (utterances still play in call order);
+    `wait()` on it, and check `error` to see whether synthesis failed.
+    """
+    return play_pcm(_speak_pool.submit(synthesize_speech, text), block=block)
 
-Make sure not to repeat tool names inside the step descriptions. List ingredient quantities (e.g., "Pork (300g)").
-'''
-        response = model.generate_content(prompt)
-        return response.text.strip()
-    except Exception as e:
-        print(f"[Gemini Error] Failed to generate recipe: {e}")
-        return f"Error during Gemini API call: {e}"
+def warmup_tts(texts, background: bool = True, max_workers: int = 4):
+    """
+    Pre-synthesize fixed prompts into the TTS cache so they play with no network latency.
+    Runs in a daemon thread by default and returns it; texts already cached are skipped.
+    """
+    def _warmup():
+        missing = [
+            t for t in dict.fromkeys(texts)
+            if not tts_cache.contains(make_tts_key(t, TTS_LANGUAGE_CODE, TTS_VOICE_NAME or "NEUTRAL", TTS_ENCODING))
+        ]
+        if not missing:
+            return
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            list(pool.map(synthesize_speech, missing))
+        print(f"[TTS] Warmed up {len(missing)} prompt(s).")
+
+    if not background:
+        _warmup()
+        return None
+    thread = threading.Thread(target=_warmup, name="tts-warmup", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,218 @@
+# image_jobs.py
+
+import os
+import time
+import uuid
+import heapq
+import itertools
+import threading
+from collections import OrderedDict
+from metrics import QUEUE_WAIT_SECONDS
+
+# ——— 이미지 작업 큐 설정 ———
+IMAGE_WORKERS = int(os.getenv("AICHEF_IMAGE_WORKERS", 4))
+IMAGE_MAX_JOBS = int(os.getenv("AICHEF_IMAGE_MAX_JOBS", 5000))
+
+# 사용자가 지금 보고 있는 단계를 요청하면 미리 넣어 둔 작업보다 먼저 처리
+PRIORITY_REQUESTED = -1
+
+
+class ImageJob:
+    def __init__(self, recipe_id: str, step_index: int, dish: str, step_desc: str, priority: int):
+        self.job_id = uuid.uuid4().hex
+        self.recipe_id = recipe_id
+        self.step_index = step_index
+        self.dish = dish
+        self.step_desc = step_desc
+        self.priority = priority
+        self.status = "queued"        # queued → running → done (밀려난 대기 작업은 queued → cancelled)
+        self.url = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.done = threading.Event()
+
+    def wait(self, timeout: float = None) -> bool:
+        return self.done.wait(timeout)
+
+    def to_dict(self) -> dict:
+        data = {
+            "job_id": self.job_id,
+            "recipe_id": self.recipe_id,
+            "step_index": self.step_index,
+            "status": self.status,
+        }
+        if self.url is not None:
+            data["url"] = self.url
+        if self.error is not None:
+            data["error"] = self.error
+        return data
+
+
+class ImageJobQueue:
+    """
+    Bounded pool of worker threads that generate step images in priority
+    order. There is one job per (recipe id, step), and finished jobs keep
+    their URL, so they double as the result cache.
+
+    `enqueue_recipe()` queues every step, nearest to the current step first.
+    `request()` moves one step to the front of the queue.
+    `generate(dish, step_index, step_desc)` must return a URL (e.g. a
+    placeholder URL on failure). If it raises, `fallback(dish, step_index)`
+    supplies the URL instead.
+
+    Past `max_jobs`, the least recently used finished job is forgotten
+    first. Only when no finished job is left is the least recently used
+    queued job cancelled (never generated). Running jobs are never evicted.
+    """
+
+    def __init__(self, generate, fallback=None, workers: int = IMAGE_WORKERS, max_jobs: int = IMAGE_MAX_JOBS):
+        self._generate = generate
+        self._fallback = fallback
+        self.workers = workers
+        self.max_jobs = max_jobs
+        self._cond = threading.Condition()
+        self._heap = []                      # (priority, seq, job)
+        self._seq = itertools.count()
+        self._stale = 0                      # heap에 남아 있는 건너뛸 항목 수 (우선순위 변경, 취소)
+        self._by_key = OrderedDict()         # (recipe_id, step_index) -> job
+        self._by_id = {}                     # job_id -> job
+        self._finished = OrderedDict()       # (recipe_id, step_index) -> 끝난 job, 오래 안 쓴 순서
+        self._threads = []
+        self._counters = {"enqueued": 0, "completed": 0, "fallbacks": 0, "reprioritized": 0,
+                          "evicted": 0, "cancelled": 0, "total_sec": 0.0}
+
+    # ─── 작업 등록 ───
+    def _start_workers(self):
+        # _cond를 잡은 상태에서 호출
+        self._threads = [t for t in self._threads if t.is_alive()]
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._worker, name=f"image-job-{len(self._threads)}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _submit(self, recipe_id: str, step_index: int, dish: str, step_desc: str, priority: int) -> ImageJob:
+        # _cond를 잡은 상태에서 호출
+        key = (recipe_id, step_index)
+        job = self._by_key.get(key)
+        if job is not None:
+            self._by_key.move_to_end(key)
+            if key in self._finished:
+                self._finished.move_to_end(key)
+            if job.status == "queued" and priority < job.priority:
+                # heap에서 직접 지우지 않고 더 높은 우선순위로 다시 넣음 (이전 항목은 꺼낼 때 건너뜀)
+                job.priority = priority
+                heapq.heappush(self._heap, (priority, next(self._seq), job))
+                self._counters["reprioritized"] += 1
+                self._stale += 1
+                self._compact_heap()
+                self._cond.notify()
+            return job
+
+        job = ImageJob(recipe_id, step_index, dish, step_desc, priority)
+        self._by_key[key] = job
+        self._by_id[job.job_id] = job
+        heapq.heappush(self._heap, (priority, next(self._seq), job))
+        self._counters["enqueued"] += 1
+        self._evict(keep=key)
+        self._start_workers()
+        self._cond.notify()
+        return job
+
+    def _forget(self, key):
+        # _cond를 잡은 상태에서 호출
+        job = self._by_key.pop(key)
+        self._by_id.pop(job.job_id, None)
+        self._finished.pop(key, None)
+        return job
+
+    def _evict(self, keep):
+        # _cond를 잡은 상태에서 호출. 끝난 작업부터 잊고, 그래도 넘치면 오래된 대기 작업을 취소
+        while len(self._by_key) > self.max_jobs:
+            if self._finished:
+                self._forget(next(iter(self._finished)))
+                self._counters["evicted"] += 1
+                continue
+            victim = next((k for k, job in self._by_key.items() if job.status == "queued" and k != keep), None)
+            if victim is None:
+                return   # 남은 것은 실행 중인 작업뿐: 끝나면 다음 등록 때 정리
+            job = self._forget(victim)
+            job.status = "cancelled"
+            job.error = "Evicted before it ran (too many pending image jobs)."
+            job.done.set()
+            self._counters["cancelled"] += 1
+            self._stale += 1
+        self._compact_heap()
+
+    def _compact_heap(self):
+        # _cond를 잡은 상태에서 호출. 건너뛸 항목이 절반을 넘으면 heap을 다시 만들어 크기를 묶어 둠
+        if self._stale <= 64 or self._stale * 2 <= len(self._heap):
+            return
+        self._heap = [entry for entry in self._heap if entry[2].status == "queued" and entry[0] == entry[2].priority]
+        heapq.heapify(self._heap)
+        self._stale = 0
+
+    def enqueue_recipe(self, recipe_id: str, dish: str, steps: list, current_step: int = 0) -> list:
+        """
+        Queue image generation for every step, nearest to `current_step` first (ahead before behind).
+        """
+        order = sorted(range(len(steps)), key=lambda i: (abs(i - current_step), i < current_step))
+        with self._cond:
+            return [self._submit(recipe_id, i, dish, steps[i], rank) for rank, i in enumerate(order)]
+
+    def request(self, recipe_id: str, step_index: int, dish: str, step_desc: str) -> ImageJob:
+        """
+        Job for this step, created if needed and moved to the front of the queue.
+        """
+        with self._cond:
+            return self._submit(recipe_id, step_index, dish, step_desc, PRIORITY_REQUESTED)
+
+    def get(self, job_id: str):
+        with self._cond:
+            return self._by_id.get(job_id)
+
+    # ─── 워커 ───
+    def _worker(self):
+        while True:
+            with self._cond:
+                while True:
+                    while not self._heap:
+                        self._cond.wait()
+                    priority, _, job = heapq.heappop(self._heap)
+                    # 우선순위가 바뀌어 다시 들어간 작업의 옛 항목과 취소된 작업은 건너뜀
+                    if job.status == "queued" and priority == job.priority:
+                        break
+                    self._stale = max(0, self._stale - 1)
+                job.status = "running"
+
+            QUEUE_WAIT_SECONDS.observe(time.time() - job.created_at, "image_job")
+            start = time.perf_counter()
+            fallback = False
+            try:
+                url = self._generate(job.dish, job.step_index, job.step_desc)
+            except Exception as e:
+                print(f"[Image Job Error] {e}")
+                job.error = str(e)
+                url = self._fallback(job.dish, job.step_index) if self._fallback else None
+                fallback = True
+
+            with self._cond:
+                job.url = url
+                job.status = "done"
+                job.finished_at = time.time()
+                key = (job.recipe_id, job.step_index)
+                if self._by_key.get(key) is job:
+                    self._finished[key] = job
+                self._counters["completed"] += 1
+                self._counters["fallbacks"] += fallback
+                self._counters["total_sec"] += time.perf_counter() - start
+            job.done.set()
+
+    def stats(self) -> dict:
+        with self._cond:
+            data = dict(self._counters)
+            data["queued"] = sum(1 for job in self._by_key.values() if job.status == "queued")
+            data["running"] = sum(1 for job in self._by_key.values() if job.status == "running")
+            data["jobs"] = len(self._by_key)
+            data["workers"] = len(self._threads)
+        return data
@@ -0,0 +1,169 @@
+# image_store.py
+
+import os
+import re
+import hashlib
+import threading
+import urllib.request
+from collections import OrderedDict
+
+# ——— 이미지 저장소 설정 (환경 변수로 조정 가능) ———
+IMAGE_STORE_DIR = os.getenv(
+    "AICHEF_IMAGE_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".image_store")
+)
+IMAGE_STORE_MAX_BYTES = int(os.getenv("AICHEF_IMAGE_STORE_BYTES", 512 * 1024 * 1024))   # 512 MB
+IMAGE_FETCH_MAX_BYTES = 10 * 1024 * 1024
+IMAGE_FETCH_TIMEOUT_SEC = 15
+
+EXTENSIONS = {"image/png": "png", "image/jpeg": "jpg", "image/webp": "webp", "image/gif": "gif"}
+MIMETYPES = {ext: mime for mime, ext in EXTENSIONS.items()}
+
+# <sha256>.<ext> — URL 경로로 받은 이름은 이 형식만 허용
+NAME_RE = re.compile(r"^[0-9a-f]{64}\.(png|jpg|webp|gif)$")
+
+
+def sniff_content_type(data: bytes):
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if data.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    if data[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    return None
+
+
+class ImageStore:
+    """
+    Content-addressed on-disk image store: each image is saved once under
+    the SHA-256 of its bytes, so a name never changes meaning and can be
+    served as immutable. Least recently served files are removed once the
+    directory exceeds `max_bytes`.
+    """
+
+    def __init__(self, store_dir: str = IMAGE_STORE_DIR, max_bytes: int = IMAGE_STORE_MAX_BYTES):
+        self.store_dir = store_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index = OrderedDict()   # name -> size, least recently used first
+        self._bytes = 0
+        self._counters = {"stores": 0, "dedup_hits": 0, "fetch_errors": 0, "evictions": 0}
+        self._load_index()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.store_dir, name)
+
+    def _load_index(self):
+        try:
+            os.makedirs(self.store_dir, exist_ok=True)
+            entries = [
+                (e.stat().st_mtime, e.name, e.stat().st_size)
+                for e in os.scandir(self.store_dir)
+                if e.is_file() and not e.name.endswith(".tmp")
+            ]
+        except OSError as e:
+            print(f"[Image Store Error] Cannot read store directory {self.store_dir}: {e}")
+            return
+        for _, name, size in sorted(entries):
+            self._index[name] = size
+            self._bytes += size
+
+    def put(self, data: bytes, content_type: str = None):
+        """
+        Store `data` and return its name (`<sha256>.<ext>`), or None if it is not a supported image.
+        """
+        content_type = content_type if content_type in EXTENSIONS else sniff_content_type(data)
+        if content_type is None:
+            return None
+        name = f"{hashlib.sha256(data).hexdigest()}.{EXTENSIONS[content_type]}"
+        self.put_named(name, data)
+        return name
+
+    def put_named(self, name: str, data: bytes):
+        """
+        Store `data` under an explicit file name (e.g. a derived variant of a stored image).
+        """
+        size = len(data)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if name in self._index:
+                self._index.move_to_end(name)
+                self._counters["dedup_hits"] += 1
+                return
+            tmp_path = f"{self._path(name)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, self._path(name))
+            except OSError as e:
+                print(f"[Image Store Error] Failed to write {name}: {e}")
+                return
+            self._index[name] = size
+            self._bytes += size
+            self._counters["stores"] += 1
+            self._evict()
+
+    def _evict(self):
+        # _lock을 잡은 상태에서 호출
+        while self._bytes > self.max_bytes and self._index:
+            name, size = self._index.popitem(last=False)
+            self._bytes -= size
+            self._counters["evictions"] += 1
+            try:
+                os.remove(self._path(name))
+            except OSError:
+                pass
+
+    def path(self, name: str):
+        """
+        Filesystem path for a stored image (marking it recently used), or None.
+        """
+        with self._lock:
+            if name not in self._index:
+                return None
+            self._index.move_to_end(name)
+        path = self._path(name)
+        try:
+            # 재시작 후에도 최근 사용 순서가 유지되도록 수정 시각 갱신
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def find(self, digest: str):
+        """
+        Name of the stored original with this SHA-256 digest (any format), or None.
+        """
+        with self._lock:
+            for ext in MIMETYPES:
+                if f"{digest}.{ext}" in self._index:
+                    return f"{digest}.{ext}"
+        return None
+
+    def fetch(self, url: str):
+        """
+        Download `url` into the store. Returns the stored name, or None on failure.
+        """
+        try:
+            with urllib.request.urlopen(url, timeout=IMAGE_FETCH_TIMEOUT_SEC) as response:
+                data = response.read(IMAGE_FETCH_MAX_BYTES + 1)
+                content_type = response.headers.get_content_type()
+        except Exception as e:
+            print(f"[Image Store Error] Failed to download {url}: {e}")
+            with self._lock:
+                self._counters["fetch_errors"] += 1
+            return None
+        if len(data) > IMAGE_FETCH_MAX_BYTES:
+            print(f"[Image Store Error] Image too large: {url}")
+            return None
+        return self.put(data, content_type)
+
+    def stats(self) -> dict:
+        with self._lock:
+            data = dict(self._counters)
+            data["entries"] = len(self._index)
+            data["bytes"] = self._bytes
+        return data
@@ -0,0 +1,133 @@
+# image_variants.py
+
+import io
+import os
+import re
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# ——— 반응형 이미지 변형 설정 ———
+# 원본은 512x512이므로 가장 큰 변형은 같은 크기로 다시 인코딩만 함 (PNG 대비 용량 절감)
+VARIANT_WIDTHS = (256, 384, 512)
+VARIANT_WORKERS = int(os.getenv("AICHEF_VARIANT_WORKERS", 2))
+
+# 확장자 -> (Pillow 포맷, 저장 옵션)
+VARIANT_FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+# <sha256>.w<width>.<webp|jpg> — 원본 이미지의 해시와 폭으로 이름을 정함
+VARIANT_RE = re.compile(r"^([0-9a-f]{64})\.w(\d+)\.(webp|jpg)$")
+
+
+def variant_name(digest: str, width: int, ext: str) -> str:
+    return f"{digest}.w{width}.{ext}"
+
+
+def encode_variant(data: bytes, width: int, ext: str) -> bytes:
+    """
+    Re-encode image `data` as `ext` ("webp" or "jpg"), scaled down to at most `width` pixels wide.
+    """
+    from PIL import Image
+
+    fmt, options = VARIANT_FORMATS[ext]
+    with Image.open(io.BytesIO(data)) as image:
+        image.load()
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.LANCZOS)
+        if fmt == "JPEG" or image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGB")
+        out = io.BytesIO()
+        image.save(out, fmt, **options)
+    return out.getvalue()
+
+
+def srcset(url: str):
+    """
+    `srcset` strings ({"webp": ..., "jpg": ...}) for an image served from the local store, or None.
+    """
+    match = re.match(r"^/images/([0-9a-f]{64})\.\w+$", url or "")
+    if not match:
+        return None
+    digest = match.group(1)
+    return {
+        ext: ", ".join(f"/images/{variant_name(digest, w, ext)} {w}w" for w in VARIANT_WIDTHS)
+        for ext in VARIANT_FORMATS
+    }
+
+
+class VariantBuilder:
+    """
+    Builds image variants on first request in a small worker pool and saves
+    them next to the original in the ImageStore. Concurrent requests for the
+    same variant share one encode.
+
+    `submit(name)` returns a Future resolving to the name to serve: the variant
+    itself, the original if the variant cannot be built (e.g. Pillow is not
+    installed), or None if the original is not in the store.
+    """
+
+    def __init__(self, store, workers: int = VARIANT_WORKERS):
+        self.store = store
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pending = {}   # variant name -> Future
+        self._counters = {"built": 0, "shared": 0, "failures": 0, "encode_sec": 0.0}
+
+    def submit(self, name: str):
+        with self._lock:
+            future = self._pending.get(name)
+            if future is not None:
+                self._counters["shared"] += 1
+                return future
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="image-variant")
+            future = self._pending[name] = self._executor.submit(self._build, name)
+        future.add_done_callback(lambda _: self._forget(name))
+        return future
+
+    def _forget(self, name: str):
+        with self._lock:
+            self._pending.pop(name, None)
+
+    def _build(self, name: str):
+        match = VARIANT_RE.match(name)
+        if not match:
+            return None
+        digest, width, ext = match.group(1), int(match.group(2)), match.group(3)
+        original = self.store.find(digest)
+        if original is None:
+            return None
+        if width not in VARIANT_WIDTHS:
+            return original
+        if self.store.path(name) is not None:
+            return name
+
+        try:
+            with open(self.store.path(original), "rb") as f:
+                data = f.read()
+            start = time.perf_counter()
+            encoded = encode_variant(data, width, ext)
+            elapsed = time.perf_counter() - start
+        except Exception as e:
+            print(f"[Image Variant Error] {name}: {e}")
+            with self._lock:
+                self._counters["failures"] += 1
+            return original
+
+        self.store.put_named(name, encoded)
+        with self._lock:
+            self._counters["built"] += 1
+            self._counters["encode_sec"] += elapsed
+        print(f"[Image Variant] {name}: {len(data)} -> {len(encoded)} bytes in {elapsed * 1000:.1f} ms")
+        return name if self.store.path(name) is not None else original
+
+    def stats(self) -> dict:
+        with self._lock:
+            data = dict(self._counters)
+            data["pending"] = len(self._pending)
+        return data
@@ -0,0 +1,213 @@
+# intent_matcher.py
+
+import re
+from collections import namedtuple
+
+# ——— 명령어 표 (한국어 + 영어) ———
+# 같은 문장에 여러 표현이 들어 있으면 가장 긴 표현의 의도를 고릅니다.
+# 예) "다음에 다시 알려줘" → "다시 알려줘"(repeat)가 "다음"(next)보다 길어서 repeat
+NAVIGATION_INTENTS = {
+    "next": ["다음 단계", "다음", "넥스트", "next step", "next"],
+    "repeat": ["다시 알려줘", "다시 말해줘", "반복", "리핏", "뭐라고", "repeat", "again", "say that again"],
+    "previous": ["이전 단계", "이전", "전 단계", "프리비어스", "previous step", "previous", "go back"],
+    "ingredients": ["재료 확인", "재료 목록", "재료 뭐였지", "ingredients", "what ingredients", "list ingredients"],
+    "tools": ["도구 확인", "도구 목록", "도구 뭐였지", "tools", "what tools", "list tools"],
+    "current_step": ["현재 단계", "지금 몇 단계", "current step", "what step", "which step"],
+    "finish": ["요리 종료", "요리 끝", "그만할래", "그만", "종료", "스탑", "finish", "stop", "exit"],
+}
+
+READY_INTENTS = {
+    "start": ["시작", "준비 됐어", "준비됐어", "다음", "네", "응", "next", "start", "ready", "yes", "ok", "okay"],
+    # "다음에 다시 알려줘"처럼 미루는 말은 "다음"이 들어 있어도 시작이 아님 (우선순위로 start보다 먼저)
+    "later": ["다음에", "나중에", "이따가", "잠깐만", "아직", "later", "not yet", "not ready", "wait"],
+}
+
+# 되돌리기 어려운 의도(단계 넘기기, 종료, 시작)는 표현이 다른 말을 꾸미고 있으면 인정하지 않습니다.
+# 예) "다음에 할게"(다음 + 에), "next time", "next door neighbor called", "the exit sign"
+# 한국어 표현 바로 뒤에 붙으면 명령이 아닌 조사
+DEFERRING_KO_PARTICLES = ("에",)
+# 영어 표현 바로 다음 단어가 이것이면 명령이 아님
+NOT_COMMAND_NEXT_WORDS = {"time", "door", "week", "weekend", "day", "month", "year", "sign", "to"}
+
+IntentMatch = namedtuple("IntentMatch", ["intent", "phrase", "fuzzy"])
+
+_PUNCT_RE = re.compile(r"[^\w\s]")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    return _SPACE_RE.sub(" ", _PUNCT_RE.sub(" ", (text or "").lower())).strip()
+
+
+def _is_latin(phrase: str) -> bool:
+    return phrase.isascii()
+
+
+def _edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Levenshtein distance, stopping early once every cell in a row exceeds `limit`.
+    """
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+        if min(cur) > limit:
+            return limit + 1
+        prev = cur
+    return prev[-1]
+
+
+class IntentMatcher:
+    """
+    Compiles every trigger phrase into one Aho-Corasick automaton and returns
+    a single intent per transcript in one pass.
+
+    - Whitespace is ignored while matching, so "준비됐어" and "준비 됐어" are
+      the same phrase.
+    - Every phrase must start at the start of a word. English phrases must
+      also end at a word boundary, so "ok" no longer fires inside "cook";
+      Korean phrases may be followed by particles/endings ("반복해줘").
+    - Intents in `strict` (destructive ones such as next/finish/start) do
+      not match when the phrase only modifies what follows it, i.e. a
+      Korean phrase followed by DEFERRING_KO_PARTICLES ("다음에 할게") or an
+      English phrase followed by one of NOT_COMMAND_NEXT_WORDS ("next time",
+      "the exit sign"), and never match fuzzily.
+    - The longest matching phrase wins; `priorities` can raise an intent
+      above that.
+    - If nothing matches exactly and `fuzzy` is on, phrases of at least
+      `fuzzy_min_len` characters may match with one edit (two edits for
+      phrases of eight or more characters), to absorb STT spelling errors.
+    """
+
+    def __init__(self, intents: dict, priorities: dict = None, fuzzy: bool = True, fuzzy_min_len: int = 4,
+                 strict: tuple = ()):
+        self.priorities = priorities or {}
+        self.strict = set(strict)
+        self.fuzzy = fuzzy
+        self.fuzzy_min_len = fuzzy_min_len
+        self._phrases = []          # (intent, phrase, compact phrase)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]            # node -> [phrase index]
+        for intent, phrases in intents.items():
+            for phrase in phrases:
+                compact = normalize(phrase).replace(" ", "")
+                self._phrases.append((intent, phrase, compact))
+                self._insert(compact, len(self._phrases) - 1)
+        self._build_fail_links()
+
+    # ─── 오토마타 구성 ───
+    def _insert(self, word: str, index: int):
+        node = 0
+        for ch in word:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(index)
+
+    def _build_fail_links(self):
+        queue = list(self._goto[0].values())
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(ch, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    # ─── 매칭 ───
+    def _rank(self, index: int, start: int):
+        intent, _, compact = self._phrases[index]
+        return (self.priorities.get(intent, 0), len(compact), -start)
+
+    def match(self, text: str):
+        """
+        Returns IntentMatch(intent, phrase, fuzzy) or None.
+        """
+        norm = normalize(text)
+        if not norm:
+            return None
+        # 공백을 뺀 문자열로 매칭하고, 영어 단어 경계 확인을 위해 원래 위치를 기억
+        positions = [i for i, ch in enumerate(norm) if ch != " "]
+        compact = norm.replace(" ", "")
+
+        best, best_rank = None, None
+        node = 0
+        for end, ch in enumerate(compact):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for index in self._out[node]:
+                intent, phrase, word = self._phrases[index]
+                start = end - len(word) + 1
+                first, last = positions[start], positions[end]
+                if first > 0 and norm[first - 1] != " ":
+                    continue
+                if _is_latin(phrase) and not self._on_word_boundary(norm, first, last):
+                    continue
+                if intent in self.strict and self._modifies_next_word(norm, last, _is_latin(phrase)):
+                    continue
+                rank = self._rank(index, start)
+                if best_rank is None or rank > best_rank:
+                    best, best_rank = index, rank
+
+        if best is not None:
+            intent, phrase, _ = self._phrases[best]
+            return IntentMatch(intent, phrase, False)
+        if self.fuzzy:
+            return self._fuzzy_match(norm)
+        return None
+
+    @staticmethod
+    def _on_word_boundary(norm: str, start: int, end: int) -> bool:
+        before = norm[start - 1] if start > 0 else " "
+        after = norm[end + 1] if end + 1 < len(norm) else " "
+        return not before.isalnum() and not after.isalnum()
+
+    @staticmethod
+    def _modifies_next_word(norm: str, end: int, latin: bool) -> bool:
+        if latin:
+            following = norm[end + 1:].split(" ", 2)
+            return len(following) > 1 and following[1] in NOT_COMMAND_NEXT_WORDS
+        return norm.startswith(DEFERRING_KO_PARTICLES, end + 1)
+
+    def _fuzzy_match(self, norm: str):
+        words = norm.split(" ")
+        best, best_rank = None, None
+        for index, (intent, phrase, compact) in enumerate(self._phrases):
+            if len(compact) < self.fuzzy_min_len or intent in self.strict:
+                continue
+            limit = 2 if len(compact) >= 8 else 1
+            n_words = phrase.count(" ") + 1
+            for i in range(len(words) - n_words + 1):
+                window = "".join(words[i:i + n_words])
+                if abs(len(window) - len(compact)) > limit:
+                    continue
+                distance = _edit_distance(window, compact, limit)
+                if distance > limit:
+                    continue
+                rank = (self.priorities.get(intent, 0), -distance, len(compact), -i)
+                if best_rank is None or rank > best_rank:
+                    best, best_rank = index, rank
+        if best is None:
+            return None
+        intent, phrase, _ = self._phrases[best]
+        return IntentMatch(intent, phrase, True)
+
+    def intent(self, text: str):
+        found = self.match(text)
+        return found.intent if found else None
+
+
+navigation_matcher = IntentMatcher(NAVIGATION_INTENTS, strict=("next", "finish"))
+ready_matcher = IntentMatcher(READY_INTENTS, priorities={"later": 1}, strict=("start",))
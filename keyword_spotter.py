@@ -0,0 +1,225 @@
+# keyword_spotter.py
+
+import os
+import time
+import wave
+import threading
+import numpy as np
+
+# 명령어 템플릿 위치: <KWS_TEMPLATE_DIR>/<language_code>/<label>/*.wav
+# label(폴더 이름)이 그대로 인식 결과 문자열이 됩니다. 예) kws_templates/ko-KR/다음/01.wav
+KWS_TEMPLATE_DIR = os.getenv(
+    "AICHEF_KWS_TEMPLATE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "kws_templates")
+)
+# 이보다 긴 발화는 명령어가 아니라고 보고 바로 클라우드 STT로 넘김
+# (VAD가 붙이는 pre-roll 0.3초와 끝 무음 0.7초 포함)
+KWS_MAX_UTTERANCE_SEC = 2.5
+# 되돌릴 수 없는 명령(요리 종료)은 로컬에서 확정하지 않고 클라우드 인식 결과로 확인
+KWS_CLOUD_ONLY_LABELS = {"stop", "그만"}
+
+# ─── MFCC ───
+_MEL_CACHE = {}
+
+
+def _mel_filterbank(sample_rate: int, n_fft: int, n_mels: int) -> np.ndarray:
+    key = (sample_rate, n_fft, n_mels)
+    bank = _MEL_CACHE.get(key)
+    if bank is not None:
+        return bank
+    hz_to_mel = lambda hz: 2595.0 * np.log10(1.0 + hz / 700.0)
+    mel_to_hz = lambda mel: 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+    mels = np.linspace(hz_to_mel(60.0), hz_to_mel(sample_rate / 2), n_mels + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mels) / sample_rate).astype(int)
+    bank = np.zeros((n_mels, n_fft // 2 + 1), dtype=np.float32)
+    for m in range(1, n_mels + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        if center > left:
+            bank[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            bank[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    _MEL_CACHE[key] = bank
+    return bank
+
+
+def _dct_matrix(n_in: int, n_out: int) -> np.ndarray:
+    n = np.arange(n_in)
+    k = np.arange(n_out)[:, None]
+    return np.cos(np.pi * k * (2 * n + 1) / (2 * n_in)).astype(np.float32)
+
+
+def mfcc(samples: np.ndarray, sample_rate: int = 16000, n_mfcc: int = 13, n_mels: int = 26,
+         frame_ms: int = 25, hop_ms: int = 10) -> np.ndarray:
+    """
+    (frames, n_mfcc) MFCC matrix with per-utterance mean/variance normalization.
+    """
+    x = np.asarray(samples, dtype=np.float32) / 32768.0
+    x = np.append(x[0], x[1:] - 0.97 * x[:-1])
+    frame_len = sample_rate * frame_ms // 1000
+    hop = sample_rate * hop_ms // 1000
+    if len(x) < frame_len:
+        x = np.pad(x, (0, frame_len - len(x)))
+    n_frames = 1 + (len(x) - frame_len) // hop
+    idx = np.arange(frame_len)[None, :] + hop * np.arange(n_frames)[:, None]
+    frames = x[idx] * np.hamming(frame_len).astype(np.float32)
+    n_fft = 1 << (frame_len - 1).bit_length()
+    power = np.abs(np.fft.rfft(frames, n_fft)) ** 2 / n_fft
+    log_mel = np.log(power @ _mel_filterbank(sample_rate, n_fft, n_mels).T + 1e-10)
+    coeffs = log_mel @ _dct_matrix(n_mels, n_mfcc).T
+    coeffs -= coeffs.mean(axis=0)
+    coeffs /= coeffs.std(axis=0) + 1e-6
+    return coeffs
+
+
+def trim_silence(samples: np.ndarray, sample_rate: int = 16000, floor_db: float = 30.0,
+                 noise_margin_db: float = 10.0) -> np.ndarray:
+    """
+    Cut leading/trailing 10 ms blocks quieter than `floor_db` below the loudest
+    one, or within `noise_margin_db` of the background level (e.g. a range hood).
+    """
+    block = sample_rate // 100
+    n = len(samples) // block
+    if n == 0:
+        return samples
+    blocks = samples[:n * block].astype(np.float32).reshape(n, block)
+    energy_db = 10.0 * np.log10(np.mean(blocks * blocks, axis=1) + 1e-6)
+    threshold = max(energy_db.max() - floor_db, np.percentile(energy_db, 10) + noise_margin_db)
+    loud = np.flatnonzero(energy_db > min(threshold, energy_db.max() - 1.0))
+    return samples[loud[0] * block:(loud[-1] + 1) * block]
+
+
+# ─── DTW ───
+def dtw_distance(query: np.ndarray, template: np.ndarray) -> float:
+    """
+    Length-normalized DTW distance. Each query frame advances the template by
+    0, 1 or 2 frames, so one row of the cost matrix is computed per numpy
+    operation instead of one cell per Python step.
+    """
+    cost = np.sqrt(((query[:, None, :] - template[None, :, :]) ** 2).sum(axis=2))
+    inf = np.float32(np.inf)
+    acc = np.full(template.shape[0], inf, dtype=np.float64)
+    acc[0] = cost[0, 0]
+    for i in range(1, cost.shape[0]):
+        stay = acc
+        step = np.concatenate(([inf], acc[:-1]))
+        skip = np.concatenate(([inf, inf], acc[:-2]))
+        acc = cost[i] + np.minimum(np.minimum(stay, step), skip)
+    return float(acc[-1] / (query.shape[0] + template.shape[0]))
+
+
+# ─── 키워드 검출기 ───
+class KeywordSpotter:
+    """
+    On-device spotter for a small fixed command vocabulary using MFCC
+    templates and DTW. `spot()` returns the best label only when it is both
+    close enough (`max_distance`) and clearly better than the best other
+    label (`min_margin`); otherwise it returns None and the caller falls back
+    to cloud STT.
+    """
+
+    # 기본 임계값: 배포 템플릿에서 화자 하나씩 빼고 나머지로 맞춰 본 결과, 오인식은 모두
+    # 거리 1.43 이상 또는 차이 17% 이하였음. 오인식("stop")이 폴백보다 비싸므로 보수적으로 잡음
+    def __init__(self, sample_rate: int = 16000, max_distance: float = 1.4, min_margin: float = 0.3):
+        self.sample_rate = sample_rate
+        self.max_distance = max_distance
+        self.min_margin = min_margin
+        self._templates = []   # (label, mfcc)
+        self._lock = threading.Lock()
+        self._stats = {"spotted": 0, "fallbacks": 0, "skipped_long": 0, "total_sec": 0.0}
+
+    def __len__(self):
+        return len(self._templates)
+
+    def labels(self) -> list:
+        return sorted({label for label, _ in self._templates})
+
+    def features(self, samples: np.ndarray) -> np.ndarray:
+        return mfcc(trim_silence(samples, self.sample_rate), self.sample_rate)
+
+    def add_template(self, label: str, samples: np.ndarray):
+        self._templates.append((label, self.features(samples)))
+
+    def load_templates(self, directory: str) -> int:
+        """
+        Load `<directory>/<label>/*.wav` (16-bit mono at `sample_rate`). Returns the template count.
+        """
+        count = 0
+        if not os.path.isdir(directory):
+            return 0
+        for label in sorted(os.listdir(directory)):
+            label_dir = os.path.join(directory, label)
+            if not os.path.isdir(label_dir):
+                continue
+            for name in sorted(os.listdir(label_dir)):
+                if name.lower().endswith(".wav"):
+                    self.add_template(label, read_wav(os.path.join(label_dir, name), self.sample_rate))
+                    count += 1
+        return count
+
+    def score(self, samples: np.ndarray) -> list:
+        """
+        [(distance, label), ...] best-per-label, sorted ascending.
+        """
+        query = self.features(samples)
+        best = {}
+        for label, template in self._templates:
+            d = dtw_distance(query, template)
+            if d < best.get(label, np.inf):
+                best[label] = d
+        return sorted((d, label) for label, d in best.items())
+
+    def spot(self, pcm) -> tuple:
+        """
+        Returns (label or None, distance, elapsed_sec) for one utterance of 16-bit PCM.
+        """
+        start = time.perf_counter()
+        samples = np.frombuffer(pcm, dtype=np.int16) if isinstance(pcm, (bytes, bytearray)) else pcm
+        label, distance = None, float("inf")
+        if len(samples) > KWS_MAX_UTTERANCE_SEC * self.sample_rate:
+            outcome = "skipped_long"
+        elif not self._templates:
+            outcome = "fallbacks"
+        else:
+            # 템플릿과 길이가 너무 달라 정렬되지 않은 label은 빠짐 (DTW는 한 프레임에 최대 2프레임까지만 진행)
+            ranked = self.score(samples) or [(float("inf"), None)]
+            distance, best = ranked[0]
+            runner_up = ranked[1][0] if len(ranked) > 1 else np.inf
+            confident = distance <= self.max_distance and (runner_up - distance) >= self.min_margin * runner_up
+            label = best if confident else None
+            outcome = "spotted" if confident else "fallbacks"
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._stats[outcome] += 1
+            self._stats["total_sec"] += elapsed
+        return label, distance, elapsed
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats)
+
+
+def read_wav(path: str, sample_rate: int = 16000) -> np.ndarray:
+    """
+    16-bit mono WAV as int16 samples, linearly resampled to `sample_rate` if needed.
+    """
+    with wave.open(path, "rb") as wf:
+        if wf.getsampwidth() != 2 or wf.getnchannels() != 1:
+            raise ValueError(f"{path}: expected 16-bit mono WAV")
+        rate = wf.getframerate()
+        samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+    if rate != sample_rate:
+        positions = np.arange(0, len(samples), rate / sample_rate)
+        samples = np.interp(positions, np.arange(len(samples)), samples).astype(np.int16)
+    return samples
+
+
+def load_keyword_spotter(language_code: str, sample_rate: int = 16000):
+    """
+    Spotter with templates from KWS_TEMPLATE_DIR/<language_code>, or None if there are none.
+    """
+    spotter = KeywordSpotter(sample_rate=sample_rate)
+    count = spotter.load_templates(os.path.join(KWS_TEMPLATE_DIR, language_code))
+    if count == 0:
+        print(f"[KWS] No command templates for {language_code}; using cloud STT only")
+        return None
+    print(f"[KWS] Loaded {count} template(s) for {', '.join(spotter.labels())}")
+    return spotter
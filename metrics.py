@@ -0,0 +1,262 @@
+# metrics.py
+#
+# 의존성 없는 Prometheus 텍스트 형식(0.0.4) 지표. 관측 한 번은 락 하나와 이진 탐색뿐이라
+# 운영 환경에서 항상 켜 두어도 됩니다 (benchmarks/bench_metrics.py 참고).
+# 웹 서버는 /metrics로, 음성 비서는 AICHEF_METRICS_PORT를 설정하면 별도 HTTP 스레드로 노출합니다.
+
+import os
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+METRICS_PORT = os.getenv("AICHEF_METRICS_PORT")
+
+# 초 단위 버킷: Gemini 생성(수 초)부터 파싱(수 ms)까지
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def _header(self) -> list:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labelvalues, amount: float = 1):
+        with self._lock:
+            self._series[labelvalues] = self._series.get(labelvalues, 0) + amount
+
+    def render(self) -> list:
+        with self._lock:
+            series = sorted(self._series.items())
+        return self._header() + [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in series]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labelvalues, amount: float = 1):
+        self.inc(*labelvalues, amount=-amount)
+
+    def set(self, *labelvalues, value: float):
+        with self._lock:
+            self._series[labelvalues] = value
+
+    @contextmanager
+    def track(self, *labelvalues):
+        self.inc(*labelvalues)
+        try:
+            yield
+        finally:
+            self.dec(*labelvalues)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labelvalues):
+        # 누적 합은 출력할 때 계산하고, 관측 시에는 해당 버킷 하나만 증가
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def time(self, *labelvalues):
+        """
+        `with STAGE_SECONDS.time("recipe_parse"): ...` observes the block's duration.
+        """
+        return _Timer(self, labelvalues)
+
+    def render(self) -> list:
+        with self._lock:
+            series = sorted((k, (list(v[0]), v[1], v[2])) for k, v in self._series.items())
+        lines = self._header()
+        for key, (counts, total, count) in series:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class _Timer:
+    # @contextmanager보다 훨씬 가벼운 컨텍스트 매니저 (요청마다 여러 번 쓰임)
+    __slots__ = ("histogram", "labelvalues", "start")
+
+    def __init__(self, histogram: Histogram, labelvalues: tuple):
+        self.histogram = histogram
+        self.labelvalues = labelvalues
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labelvalues)
+        return False
+
+
+class _Callback(_Metric):
+    """
+    Metric read at scrape time from `fn()`, which returns a number or {labelvalues tuple: number}.
+    Used to export counters that other modules already keep (cache stats, queue stats).
+    """
+
+    def __init__(self, name: str, help_text: str, kind: str, fn, labelnames: tuple = ()):
+        super().__init__(name, help_text, labelnames)
+        self.kind = kind
+        self.fn = fn
+
+    def render(self) -> list:
+        try:
+            values = self.fn()
+        except Exception as e:
+            print(f"[Metrics Error] {self.name}: {e}")
+            return []
+        if not isinstance(values, dict):
+            values = {(): values}
+        return self._header() + [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}"
+                                 for k, v in sorted(values.items())]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _register(self, metric):
+        with self._lock:
+            # 같은 이름으로 다시 등록하면 (예: 모듈 재로드) 기존 지표를 그대로 사용
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help_text: str, labelnames: tuple = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: tuple = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def callback(self, name: str, help_text: str, kind: str, fn, labelnames: tuple = ()):
+        """
+        Export a value computed at scrape time (replaces an earlier callback with the same name).
+        """
+        with self._lock:
+            self._metrics[name] = _Callback(name, help_text, kind, fn, labelnames)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+# ——— 공통 지표 ———
+STAGE_SECONDS = metrics.histogram(
+    "aichef_stage_duration_seconds",
+    "Duration of one pipeline stage (gemini_generate, gemini_stream_open, gemini_stream_body, "
+    "recipe_parse, image_generate, image_fetch, tts_synthesize, stt_finalize).",
+    ("stage",),
+)
+QUEUE_WAIT_SECONDS = metrics.histogram(
+    "aichef_queue_wait_seconds",
+    "Time spent waiting before work started (gemini_rate_limit, image_job).",
+    ("queue",),
+)
+UPSTREAM_ERRORS = metrics.counter(
+    "aichef_upstream_errors_total",
+    "Failed upstream calls by upstream (gemini, image, tts, stt) and kind (error, overloaded).",
+    ("upstream", "kind"),
+)
+HTTP_IN_FLIGHT = metrics.gauge(
+    "aichef_http_requests_in_flight",
+    "HTTP requests currently being handled, by endpoint.",
+    ("endpoint",),
+)
+HTTP_SECONDS = metrics.histogram(
+    "aichef_http_request_duration_seconds",
+    "HTTP request handling time by endpoint.",
+    ("endpoint",),
+)
+
+
+def export_stats(prefix: str, help_text: str, stats_fn, counters: tuple = (), gauges: tuple = ()):
+    """
+    Export keys of an existing `stats()` dict as `<prefix>_<key>_total` counters and `<prefix>_<key>` gauges.
+    """
+    for key in counters:
+        metrics.callback(f"{prefix}_{key}_total", f"{help_text} ({key}).", "counter", lambda key=key: stats_fn()[key])
+    for key in gauges:
+        metrics.callback(f"{prefix}_{key}", f"{help_text} ({key}).", "gauge", lambda key=key: stats_fn()[key])
+
+
+def serve_metrics(port: int):
+    """
+    Serve /metrics from a daemon thread (for processes without a web server, e.g. the voice assistants).
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"[Metrics] Serving http://0.0.0.0:{port}/metrics")
+    return server
@@ -0,0 +1,107 @@
+# recipe_batch.py
+#
+# 식단 계획용 일괄 레시피 생성. 요리 목록에서 중복을 없애고, 캐시에 있는 레시피는 바로 돌려준 뒤
+# 나머지는 동시 실행 수를 제한해 Gemini로 생성하면서 끝나는 순서대로 결과를 내보냅니다.
+
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from recipe_cache import normalize_dish_name
+from recipe_core import generate_recipe, generate_recipe_async, recipe_cache, recipe_cache_key
+
+# ——— 일괄 요청 설정 ———
+BATCH_MAX_DISHES = int(os.getenv("AICHEF_BATCH_MAX_DISHES", 50))
+BATCH_CONCURRENCY = int(os.getenv("AICHEF_BATCH_CONCURRENCY", 8))
+
+
+def dedupe_dishes(dishes: list) -> tuple:
+    """
+    Returns (unique dish names in request order, number of duplicates dropped).
+    Dishes are compared the way the recipe cache keys them ("Kimchi  Jjim" == "kimchi jjim").
+    """
+    seen = set()
+    unique = []
+    for dish in dishes:
+        dish = dish.strip()
+        key = normalize_dish_name(dish)
+        if key and key not in seen:
+            seen.add(key)
+            unique.append(dish)
+    return unique, len(dishes) - len(unique)
+
+
+def split_cached(dishes: list) -> tuple:
+    """
+    Returns (cached dishes, dishes that need a Gemini call).
+    Only peeks at the cache; `generate_recipe()` records the hit or miss.
+    """
+    hits, misses = [], []
+    for dish in dishes:
+        cached = recipe_cache.get(recipe_cache_key(dish), record_stats=False)
+        (hits if cached is not None else misses).append(dish)
+    return hits, misses
+
+
+def _generate_safely(generate, dish: str) -> str:
+    try:
+        return generate(dish)
+    except Exception as e:
+        print(f"[Batch Error] {dish}: {e}")
+        return f"Error: {e}"
+
+
+async def _generate_safely_async(generate, dish: str) -> str:
+    try:
+        return await generate(dish)
+    except Exception as e:
+        print(f"[Batch Error] {dish}: {e}")
+        return f"Error: {e}"
+
+
+def run_batch(dishes: list, concurrency: int = BATCH_CONCURRENCY, generate=generate_recipe):
+    """
+    Yields (dish, recipe text or "Error..." string, cached) for every dish:
+    cache hits first, then misses as they finish, at most `concurrency` at a time.
+    A failing dish yields its error string and does not stop the others.
+    """
+    hits, misses = split_cached(dishes)
+    for dish in hits:
+        yield dish, _generate_safely(generate, dish), True
+    if not misses:
+        return
+
+    pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="recipe-batch")
+    try:
+        futures = {pool.submit(_generate_safely, generate, dish): dish for dish in misses}
+        for future in as_completed(futures):
+            yield futures[future], future.result(), False
+    finally:
+        # 클라이언트가 끊겨 중간에 닫히면 아직 시작하지 않은 요리는 생성하지 않음
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def run_batch_async(dishes: list, concurrency: int = BATCH_CONCURRENCY, generate=generate_recipe_async):
+    """
+    Async generator version of `run_batch()`.
+    """
+    hits, misses = split_cached(dishes)
+    for dish in hits:
+        yield dish, await _generate_safely_async(generate, dish), True
+    if not misses:
+        return
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(dish):
+        async with semaphore:
+            return dish, await _generate_safely_async(generate, dish)
+
+    tasks = [asyncio.ensure_future(one(dish)) for dish in misses]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            dish, text = await next_done
+            yield dish, text, False
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,215 @@
+# recipe_cache.py
+
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+# ——— 캐시 설정 (환경 변수로 조정 가능) ———
+CACHE_DIR = os.getenv(
+    "AICHEF_RECIPE_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".recipe_cache")
+)
+MEMORY_MAX_BYTES = int(os.getenv("AICHEF_RECIPE_CACHE_MEMORY_BYTES", 4 * 1024 * 1024))   # 4 MB
+DISK_MAX_BYTES = int(os.getenv("AICHEF_RECIPE_CACHE_DISK_BYTES", 64 * 1024 * 1024))      # 64 MB
+TTL_SEC = int(os.getenv("AICHEF_RECIPE_CACHE_TTL_SEC", 7 * 24 * 3600))                   # 7 days
+
+
+def normalize_dish_name(dish_name: str) -> str:
+    """
+    "  Kimchi   Jjim " -> "kimchi jjim"
+    """
+    return " ".join((dish_name or "").lower().split())
+
+
+def make_cache_key(dish_name: str, model_name: str, prompt_version: str) -> str:
+    raw = "\x1f".join([normalize_dish_name(dish_name), model_name, prompt_version])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class RecipeCache:
+    """
+    Two-tier cache for raw Gemini recipe text.
+    Tier 1 is an in-process LRU bounded by bytes, tier 2 is one JSON file per key
+    on disk, also bounded by bytes. Both tiers expire entries after `ttl_sec`.
+    """
+
+    def __init__(self, cache_dir: str = CACHE_DIR, memory_max_bytes: int = MEMORY_MAX_BYTES,
+                 disk_max_bytes: int = DISK_MAX_BYTES, ttl_sec: int = TTL_SEC):
+        self.cache_dir = cache_dir
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self.ttl_sec = ttl_sec
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()      # key -> (stored_at, text, size)
+        self._memory_bytes = 0
+        self._disk_index = OrderedDict()  # key -> size, oldest access first
+        self._disk_bytes = 0
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "expired": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+        }
+        self._load_disk_index()
+
+    # ─── 디스크 인덱스 ───
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _load_disk_index(self):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            entries = [
+                (e.stat().st_mtime, e.name[:-len(".json")], e.stat().st_size)
+                for e in os.scandir(self.cache_dir)
+                if e.is_file() and e.name.endswith(".json")
+            ]
+        except OSError as e:
+            print(f"[Cache Error] Cannot read cache directory {self.cache_dir}: {e}")
+            return
+        for _, key, size in sorted(entries):
+            self._disk_index[key] = size
+            self._disk_bytes += size
+
+    def _is_expired(self, stored_at: float) -> bool:
+        return self.ttl_sec > 0 and time.time() - stored_at > self.ttl_sec
+
+    # ─── 메모리 계층 ───
+    def _memory_put(self, key: str, stored_at: float, text: str):
+        size = len(text.encode("utf-8"))
+        if size > self.memory_max_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old:
+            self._memory_bytes -= old[2]
+        self._memory[key] = (stored_at, text, size)
+        self._memory_bytes += size
+        while self._memory_bytes > self.memory_max_bytes:
+            _, (_, _, evicted_size) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_size
+            self._counters["memory_evictions"] += 1
+
+    def _memory_drop(self, key: str):
+        old = self._memory.pop(key, None)
+        if old:
+            self._memory_bytes -= old[2]
+
+    # ─── 디스크 계층 ───
+    def _disk_read(self, key: str):
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            return entry["stored_at"], entry["text"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _disk_write(self, key: str, stored_at: float, text: str):
+        payload = json.dumps({"stored_at": stored_at, "text": text}, ensure_ascii=False)
+        size = len(payload.encode("utf-8"))
+        if size > self.disk_max_bytes:
+            return
+        tmp_path = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"[Cache Error] Failed to write cache entry: {e}")
+            return
+        self._disk_bytes -= self._disk_index.pop(key, 0)
+        self._disk_index[key] = size
+        self._disk_bytes += size
+        while self._disk_bytes > self.disk_max_bytes and self._disk_index:
+            evicted_key, evicted_size = self._disk_index.popitem(last=False)
+            self._disk_bytes -= evicted_size
+            self._counters["disk_evictions"] += 1
+            try:
+                os.remove(self._path(evicted_key))
+            except OSError:
+                pass
+
+    def _disk_drop(self, key: str):
+        self._disk_bytes -= self._disk_index.pop(key, 0)
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _disk_touch(self, key: str):
+        if key in self._disk_index:
+            self._disk_index.move_to_end(key)
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            pass
+
+    # ─── 공개 API ───
+    def get(self, key: str, record_stats: bool = True):
+        """
+        Return the cached text for `key`, or None on a miss.
+        Pass record_stats=False for internal re-checks that should not
+        count towards the hit ratio.
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry:
+                if not self._is_expired(entry[0]):
+                    self._memory.move_to_end(key)
+                    if record_stats:
+                        self._counters["memory_hits"] += 1
+                    return entry[1]
+                self._memory_drop(key)
+                self._disk_drop(key)
+                self._counters["expired"] += 1
+                entry = None
+            else:
+                entry = self._disk_read(key)
+                if entry and self._is_expired(entry[0]):
+                    self._disk_drop(key)
+                    self._counters["expired"] += 1
+                    entry = None
+
+            if entry is None:
+                if record_stats:
+                    self._counters["misses"] += 1
+                return None
+
+            stored_at, text = entry
+            self._disk_touch(key)
+            self._memory_put(key, stored_at, text)
+            if record_stats:
+                self._counters["disk_hits"] += 1
+            return text
+
+    def put(self, key: str, text: str):
+        with self._lock:
+            stored_at = time.time()
+            self._memory_put(key, stored_at, text)
+            self._disk_write(key, stored_at, text)
+            self._counters["stores"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+            for key in list(self._disk_index):
+                self._disk_drop(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            data = dict(self._counters)
+            data["memory_entries"] = len(self._memory)
+            data["memory_bytes"] = self._memory_bytes
+            data["disk_entries"] = len(self._disk_index)
+            data["disk_bytes"] = self._disk_bytes
+        hits = data["memory_hits"] + data["disk_hits"]
+        lookups = hits + data["misses"]
+        data["hit_ratio"] = round(hits / lookups, 4) if lookups else 0.0
+        return data
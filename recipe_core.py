@@ -0,0 +1,301 @@
+# recipe_core.py
+#
+# 레시피 생성(Gemini) 핵심 로직. 오디오 관련 모듈(PyAudio, Google TTS/STT)을 가져오지 않으므로
+# 웹 서버(app.py, app_async.py)는 이 모듈만 사용합니다.
+
+import os
+import time
+import threading
+from clients import registry, gemini_model, use_fake_backends
+from recipe_cache import RecipeCache, make_cache_key
+from singleflight import SingleFlight, AsyncSingleFlight
+from resilience import gemini_guard, OverloadedError
+from metrics import STAGE_SECONDS, UPSTREAM_ERRORS
+
+# ——— Gemini(Generative AI) 로드 ———
+# import 시점에는 SDK를 불러오거나 configure하지 않고, 처음 호출할 때 한 번만 수행
+_UNLOADED = object()
+genai = _UNLOADED
+_genai_lock = threading.Lock()
+
+def _load_genai():
+    if use_fake_backends():
+        from fake_backends import genai as module
+        return module
+    try:
+        import generativeai as module
+        if not hasattr(module, "configure"):
+            raise ImportError
+    except ImportError:
+        try:
+            import google.generativeai as module
+        except ImportError:
+            print("Error: Cannot find Gemini module. Run 'pip install google-generativeai' or 'pip install generativeai'.")
+            return None
+
+    api_key = os.getenv("GEMINI_API_KEY")
+    if api_key:
+        module.configure(api_key=api_key)
+    else:
+        print("Error: GEMINI_API_KEY environment variable is not set.")
+    return module
+
+def get_genai():
+    """
+    The Gemini SDK module (imported and configured on first call), or None if it is not installed.
+    """
+    global genai
+    if genai is _UNLOADED:
+        with _genai_lock:
+            if genai is _UNLOADED:
+                genai = _load_genai()
+    return genai
+
+# ——— Gemini 레시피 생성 함수 ———
+GEMINI_MODEL_NAME = "models/gemini-1.5-pro-latest"
+# 아래 프롬프트를 수정하면 반드시 버전을 올려서 이전 캐시 항목이 재사용되지 않도록 합니다.
+PROMPT_VERSION = "1"
+
+RECIPE_PROMPT_TEMPLATE = '''
+Please provide a detailed cooking recipe for the dish named "{dish_name}". 
+Use the following format exactly, including headings:
+
+【Dish Name】: [Insert dish name]
+
+【Total Time】: [Insert estimated total time, or "Unknown" if not available]
+
+【Ingredients】:
+- [Ingredient 1 (quantity)]
+- [Ingredient 2 (quantity)]
+- ...
+
+【Tools】:
+- [Tool 1]
+- [Tool 2]
+- ...
+
+【Steps】:
+1. [First step detailed description]
+2. [Second step detailed description]
+3. ...
+
+【Tips】 (optional; if none, write "No special tips"):
+- [Any additional tip or caution]
+
+Make sure not to repeat tool names inside the step descriptions. List ingredient quantities (e.g., "Pork (300g)").
+'''
+
+# 할당량 초과/장애로 요청을 받지 못했을 때의 오류 문자열 접두어 (웹 서버는 503으로 응답)
+GEMINI_OVERLOADED_ERROR = "Error: Gemini is temporarily overloaded"
+
+def _timed_call(stage: str, fn, *args, **kwargs):
+    # gemini_guard 안에서 시도 한 번만 잼 (대기열/백오프 시간은 aichef_queue_wait_seconds)
+    with STAGE_SECONDS.time(stage):
+        return fn(*args, **kwargs)
+
+async def _timed_call_async(stage: str, fn, *args, **kwargs):
+    with STAGE_SECONDS.time(stage):
+        return await fn(*args, **kwargs)
+
+recipe_cache = RecipeCache()
+# 같은 요리에 대한 동시 요청은 하나의 Gemini 호출을 공유합니다.
+recipe_flights = SingleFlight()
+
+def recipe_cache_key(dish_name: str) -> str:
+    return make_cache_key(dish_name, GEMINI_MODEL_NAME, PROMPT_VERSION)
+
+# ─── 동기/비동기 버전이 함께 쓰는 단계 ───
+def _unavailable_reason():
+    # Gemini를 부를 수 없는 이유 (부를 수 있으면 None)
+    if not get_genai():
+        return "Gemini module is not installed."
+    if not os.getenv("GEMINI_API_KEY"):
+        return "GEMINI_API_KEY environment variable is not set."
+    return None
+
+def _cached_recipe(key: str, use_cache: bool, record_stats: bool = True):
+    return recipe_cache.get(key, record_stats=record_stats) if use_cache else None
+
+def _recipe_request(dish_name: str):
+    return gemini_model(get_genai(), GEMINI_MODEL_NAME), RECIPE_PROMPT_TEMPLATE.format(dish_name=dish_name)
+
+def _gemini_error(e: Exception, action: str) -> str:
+    # 실패를 세고 기록한 뒤 호출자에게 돌려줄 오류 문자열 (과부하는 웹 서버가 503으로 응답)
+    if isinstance(e, OverloadedError):
+        UPSTREAM_ERRORS.inc("gemini", "overloaded")
+        print(f"[Gemini Overloaded] {e}")
+        return f"{GEMINI_OVERLOADED_ERROR}: {e}"
+    UPSTREAM_ERRORS.inc("gemini", "error")
+    print(f"[Gemini Error] Failed to {action}: {e}")
+    return f"Error during Gemini API call: {e}"
+
+def _store_recipe(key: str, recipe_text: str) -> str:
+    recipe_text = recipe_text.strip()
+    if recipe_text:
+        recipe_cache.put(key, recipe_text)
+    return recipe_text
+
+# ─── 동기 버전 ───
+def _generate_and_cache(dish_name: str, key: str, use_cache: bool) -> str:
+    # 앞선 호출이 방금 끝나 캐시를 채웠을 수 있으므로 한 번 더 확인
+    cached = _cached_recipe(key, use_cache, record_stats=False)
+    if cached is not None:
+        return cached
+
+    try:
+        model, prompt = _recipe_request(dish_name)
+        with registry.timed(f"gemini:{GEMINI_MODEL_NAME}"):
+            response = gemini_guard.call(_timed_call, "gemini_generate", model.generate_content, prompt)
+        recipe_text = response.text
+    except Exception as e:
+        return _gemini_error(e, "generate recipe")
+    return _store_recipe(key, recipe_text)
+
+def generate_recipe(dish_name: str, use_cache: bool = True) -> str:
+    """
+    Send an English-language prompt to Gemini to get a recipe for `dish_name`.
+    Returns the raw text response. Successful responses are cached by
+    (normalized dish name, model, prompt version); errors are never cached.
+    Concurrent calls for the same dish wait on a single Gemini request.
+    """
+    reason = _unavailable_reason()
+    if reason:
+        return f"Error: {reason}"
+
+    key = recipe_cache_key(dish_name)
+    cached = _cached_recipe(key, use_cache)
+    if cached is not None:
+        return cached
+
+    return recipe_flights.do(key, _generate_and_cache, dish_name, key, use_cache)
+
+def stream_recipe(dish_name: str, use_cache: bool = True):
+    """
+    Generator version of `generate_recipe()` that yields the response text
+    chunk by chunk using Gemini's streaming generation. A cached recipe is
+    yielded as a single chunk; a fully streamed recipe is written to the cache.
+    Raises RuntimeError when Gemini is unavailable or the call fails.
+    """
+    reason = _unavailable_reason()
+    if reason:
+        raise RuntimeError(reason)
+
+    key = recipe_cache_key(dish_name)
+    cached = _cached_recipe(key, use_cache)
+    if cached is not None:
+        yield cached
+        return
+
+    parts = []
+    try:
+        model, prompt = _recipe_request(dish_name)
+        with registry.timed(f"gemini:{GEMINI_MODEL_NAME}"):
+            # 재시도는 스트림을 여는 호출까지만 (이미 보낸 조각은 되돌릴 수 없음)
+            response = gemini_guard.call(_timed_call, "gemini_stream_open", model.generate_content, prompt, stream=True)
+        body_start = time.perf_counter()
+        for chunk in response:
+            text = chunk.text
+            if text:
+                parts.append(text)
+                yield text
+        STAGE_SECONDS.observe(time.perf_counter() - body_start, "gemini_stream_body")
+    except Exception as e:
+        raise RuntimeError(_gemini_error(e, "stream recipe")) from e
+    _store_recipe(key, "".join(parts))
+
+# ——— 비동기 버전 (app_async.py) ———
+# 이벤트 루프 하나에서 동시에 수백 개의 Gemini 호출을 기다릴 수 있도록 스레드를 잡지 않는 API 사용
+recipe_flights_async = AsyncSingleFlight()
+
+async def _generate_and_cache_async(dish_name: str, key: str, use_cache: bool) -> str:
+    cached = _cached_recipe(key, use_cache, record_stats=False)
+    if cached is not None:
+        return cached
+
+    try:
+        model, prompt = _recipe_request(dish_name)
+        with registry.timed(f"gemini:{GEMINI_MODEL_NAME}"):
+            response = await gemini_guard.call_async(_timed_call_async, "gemini_generate", model.generate_content_async, prompt)
+        recipe_text = response.text
+    except Exception as e:
+        return _gemini_error(e, "generate recipe")
+    return _store_recipe(key, recipe_text)
+
+async def generate_recipe_async(dish_name: str, use_cache: bool = True) -> str:
+    """
+    Coroutine version of `generate_recipe()` with the same caching, coalescing and error strings.
+    """
+    reason = _unavailable_reason()
+    if reason:
+        return f"Error: {reason}"
+
+    key = recipe_cache_key(dish_name)
+    cached = _cached_recipe(key, use_cache)
+    if cached is not None:
+        return cached
+
+    return await recipe_flights_async.do(key, _generate_and_cache_async, dish_name, key, use_cache)
+
+async def stream_recipe_async(dish_name: str, use_cache: bool = True):
+    """
+    Async generator version of `stream_recipe()`.
+    Raises RuntimeError when Gemini is unavailable or the call fails.
+    """
+    reason = _unavailable_reason()
+    if reason:
+        raise RuntimeError(reason)
+
+    key = recipe_cache_key(dish_name)
+    cached = _cached_recipe(key, use_cache)
+    if cached is not None:
+        yield cached
+        return
+
+    parts = []
+    try:
+        model, prompt = _recipe_request(dish_name)
+        with registry.timed(f"gemini:{GEMINI_MODEL_NAME}"):
+            response = await gemini_guard.call_async(
+                _timed_call_async, "gemini_stream_open", model.generate_content_async, prompt, stream=True
+            )
+        body_start = time.perf_counter()
+        async for chunk in response:
+            text = chunk.text
+            if text:
+                parts.append(text)
+                yield text
+        STAGE_SECONDS.observe(time.perf_counter() - body_start, "gemini_stream_body")
+    except Exception as e:
+        raise RuntimeError(_gemini_error(e, "stream recipe")) from e
+    _store_recipe(key, "".join(parts))
+
+# ——— 단계 이미지 생성 ———
+IMAGE_MODEL_NAME = "models/image-alpha-001"
+IMAGE_URL_PREFIX = "/images/"   # ImageStore에 저장된 이미지를 서빙하는 경로
+
+def placeholder_image_url(dish: str, idx: int) -> str:
+    return f"https://via.placeholder.com/300x200?text={dish.replace(' ', '+')}_step{idx+1}"
+
+def generate_step_image(dish: str, idx: int, step_desc: str, store=None) -> str:
+    """
+    Return an image URL illustrating step `idx` of `dish`, or a placeholder URL if generation fails.
+    With an `ImageStore`, the generated image is downloaded into it and a local
+    `/images/<sha256>.<ext>` URL is returned (the remote URL if the download fails).
+    Blocking call; async callers run it in a worker thread.
+    """
+    try:
+        model = gemini_model(get_genai(), IMAGE_MODEL_NAME)
+        prompt = f"An illustrative photo of how to do step {idx+1} of making {dish}: {step_desc}"
+        with registry.timed(f"gemini:{IMAGE_MODEL_NAME}"), STAGE_SECONDS.time("image_generate"):
+            response = model.generate_image(prompt=prompt, size="512x512")
+        url = response.data[0].url
+    except Exception as e:
+        UPSTREAM_ERRORS.inc("image", "error")
+        print(f"[Image API Error] {e}")
+        return placeholder_image_url(dish, idx)
+    if store is not None:
+        with STAGE_SECONDS.time("image_fetch"):
+            name = store.fetch(url)
+        if name is not None:
+            return f"{IMAGE_URL_PREFIX}{name}"
+    return url
@@ -0,0 +1,155 @@
+# recipe_parser.py
+
+import re
+import time
+
+# ——— 섹션 제목 (영문 【...】 형식과 한글 **...:** 형식 모두 지원) ———
+SECTION_ALIASES = {
+    "dish_name": ["dish name", "요리 이름"],
+    "total_time": ["total time", "전체 소요 시간"],
+    "ingredients": ["ingredients", "재료"],
+    "tools": ["tools", "필요한 도구"],
+    "steps": ["steps", "만드는 단계"],
+    "tips": ["tips", "팁"],
+}
+_SECTION_BY_ALIAS = {
+    alias: section for section, aliases in SECTION_ALIASES.items() for alias in aliases
+}
+
+# ——— 줄 머리 패턴: 첫 글자로 종류를 먼저 가른 뒤, 필요한 경우에만 패턴 하나를 적용합니다 ———
+#   heading  【Ingredients】:  /  【Tips】 (optional ...):  /  **재료:**  /  **Steps**:
+#   step     1. Cut the pork.       (재료/도구 섹션에서는 항목으로 취급)
+#   item     - Pork (300g)          (재료/도구 섹션에서만 사용. "*For the sauce:*" 같은 소제목/설명 줄은 버림)
+HEADING_RE = re.compile(
+    r"(?:【\s*(?P<bracket>[^】]+?)\s*】|\*\*\s*(?P<bold>[^*:]+?)\s*:?\s*\*\*)"
+    r"\s*(?:\([^)]*\))?\s*:?\s*(?P<rest>.*)"
+)
+STEP_RE = re.compile(r"\d+[.)]\s+(?=\S)")
+
+LIST_SECTIONS = ("ingredients", "tools")
+INLINE_SECTIONS = ("dish_name", "total_time")
+# 필드 → 스트리밍 이벤트 이름
+EVENT_NAMES = {
+    "dish_name": "dish_name", "total_time": "total_time",
+    "ingredients": "ingredient", "tools": "tool", "steps": "step",
+}
+
+
+def empty_recipe() -> dict:
+    return {"dish_name": "", "total_time": "", "ingredients": [], "tools": [], "steps": [], "tips": ""}
+
+
+def parse_structured_recipe(recipe_text: str, defaults: dict = None) -> dict:
+    """
+    Parse a full Gemini response (either heading style) into
+    dish_name / total_time / ingredients / tools / steps / tips.
+    One pass over the lines through the same section state machine
+    IncrementalRecipeParser uses, so both give the same result.
+    Fields that were not found keep the values in `defaults`.
+    """
+    parser = IncrementalRecipeParser()
+    try:
+        parser._apply_lines((recipe_text or "").split("\n"))
+        parser.close()
+    except Exception as e:
+        print(f"[Parser Error] Parsing recipe failed: {e}")
+        print(f"Partial text: {(recipe_text or '')[:300]}")
+
+    recipe = parser.recipe
+    for field, value in (defaults or {}).items():
+        if not recipe.get(field):
+            recipe[field] = value
+    return recipe
+
+
+class IncrementalRecipeParser:
+    """
+    Section parser for a recipe that arrives as a stream of text chunks.
+    `feed()` returns the events that became complete with this chunk, so a
+    caller can forward each ingredient, tool and step as soon as its line ends.
+    Events are (name, payload) pairs: dish_name, total_time, ingredient, tool,
+    step and, from `close()`, tips. `parse_sec` is the time spent parsing so far.
+    """
+
+    def __init__(self):
+        self.recipe = empty_recipe()
+        self._section = None
+        self._pending = ""
+        self._tips_lines = []
+        self.parse_sec = 0.0
+
+    def feed(self, chunk: str) -> list:
+        start = time.perf_counter()
+        events = []
+        if "\n" in chunk:
+            *lines, self._pending = (self._pending + chunk).split("\n")
+            self._apply_lines(lines, events)
+        else:
+            self._pending += chunk
+        self.parse_sec += time.perf_counter() - start
+        return events
+
+    def close(self) -> list:
+        start = time.perf_counter()
+        events = []
+        if self._pending:
+            self._apply_lines([self._pending], events)
+            self._pending = ""
+        tips = "\n".join(self._tips_lines).strip()
+        if tips:
+            self.recipe["tips"] = tips
+            events.append(("tips", {"text": tips}))
+        self.parse_sec += time.perf_counter() - start
+        return events
+
+    def _apply_lines(self, lines: list, events: list = None):
+        """
+        Apply complete lines to the recipe. With `events`, also appends one
+        event per field filled.
+        """
+        recipe = self.recipe
+        section = self._section
+        tips_lines = self._tips_lines
+        for line in lines:
+            raw = line.strip()
+            if not raw:
+                continue
+            first = raw[0]
+            if first == "【" or (first == "*" and raw[1:2] == "*"):
+                m = HEADING_RE.match(raw)
+                heading = m and _SECTION_BY_ALIAS.get((m.group("bracket") or m.group("bold")).strip().lower())
+                if heading:
+                    section = heading
+                    rest = m.group("rest").strip()
+                    if rest and section in INLINE_SECTIONS:
+                        recipe[section] = rest
+                        if events is not None:
+                            events.append((section, {"text": rest}))
+                    elif rest and section == "tips":
+                        tips_lines.append(rest)
+                    continue
+            if section is None:
+                continue
+
+            if section == "tips":
+                tips_lines.append(raw)
+                continue
+            if first.isdigit():
+                # 단계 섹션의 번호 줄, 또는 재료/도구 섹션의 번호 매긴 항목
+                if section != "steps" and section not in LIST_SECTIONS:
+                    continue
+                m = STEP_RE.match(raw)
+                if m is None:
+                    continue
+                text = raw[m.end():]
+            elif section in LIST_SECTIONS and (first == "-" or first == "•" or (first == "*" and raw[1:2].isspace())):
+                text = raw[1:].lstrip()
+                if not text:
+                    continue
+            else:
+                continue
+            items = recipe[section]
+            items.append(text)
+            if events is not None:
+                events.append((EVENT_NAMES[section], {"index": len(items) - 1, "text": text}))
+        self._section = section
@@ -0,0 +1,52 @@
+# recipe_store.py
+
+import os
+import time
+import uuid
+import threading
+from collections import OrderedDict
+
+# ——— 세션 저장소 설정 ———
+STORE_MAX_ENTRIES = int(os.getenv("AICHEF_RECIPE_STORE_MAX_ENTRIES", 1000))
+STORE_TTL_SEC = int(os.getenv("AICHEF_RECIPE_STORE_TTL_SEC", 6 * 3600))   # 6 hours
+
+
+class RecipeStore:
+    """
+    Server-side store for recipes that were already served to a page.
+    Maps a recipe id to its parsed recipe so follow-up requests
+    (e.g. /api/image) can look a step up in O(1) instead of regenerating.
+    """
+
+    def __init__(self, max_entries: int = STORE_MAX_ENTRIES, ttl_sec: int = STORE_TTL_SEC):
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # recipe_id -> (stored_at, parsed recipe)
+
+    def save(self, recipe: dict) -> str:
+        recipe_id = uuid.uuid4().hex
+        with self._lock:
+            self._entries[recipe_id] = (time.time(), recipe)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return recipe_id
+
+    def get(self, recipe_id: str):
+        """
+        Return the parsed recipe for `recipe_id`, or None if unknown or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(recipe_id)
+            if not entry:
+                return None
+            stored_at, recipe = entry
+            if self.ttl_sec > 0 and time.time() - stored_at > self.ttl_sec:
+                del self._entries[recipe_id]
+                return None
+            self._entries.move_to_end(recipe_id)
+            return recipe
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
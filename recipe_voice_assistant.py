@@ -4,9 +4,13 @@ import os
 import re
 import sys
 from google.oauth2 import service_account
-from google.cloud import speech
-from generate_recipe_gemini_api import generate_recipe, tts_speak
-from stt_tts_test_code import MicrophoneStream, request_generator
+from generate_recipe_gemini_api import generate_recipe, tts_speak, warmup_tts, synthesize_speech, play_pcm
+from stt_session import SpeechSession
+from recipe_parser import parse_structured_recipe
+from speech_prefetch import SpeechPrefetcher
+from intent_matcher import navigation_matcher, ready_matcher
+from metrics import METRICS_PORT, serve_metrics
+from tracing import TurnTracer
 
 # ─── Load GCP Credentials ───
 def load_credentials():
@@ -24,41 +28,36 @@ def load_credentials():
 CREDS = load_credentials()
 
 # ─── STT Listening Function ───
-def listen_for_trigger(timeout_sec: int = 15) -> str:
+# One recognition session (client + open mic) for the whole cooking run
+_stt_session = None
+
+def listen_for_trigger(timeout_sec: int = 15, tracer: TurnTracer = None, commands: bool = False) -> str:
     """
     Capture microphone input and return it as a lowercase English string.
+    Returns an empty string if nothing is recognized within `timeout_sec`.
+    With `tracer`, the utterance starts a new traced turn.
+    Pass `commands=True` only when waiting for a navigation command (allows on-device spotting).
     """
-    client = speech.SpeechClient(credentials=CREDS)
-    config = speech.RecognitionConfig(
-        encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-        sample_rate_hertz=16000,
-        language_code="en-US",
-    )
-    streaming_config = speech.StreamingRecognitionConfig(
-        config=config, interim_results=False
-    )
-
-    mic = MicrophoneStream()
-    mic.start()
-    transcript = ""
+    global _stt_session
+    if _stt_session is None:
+        _stt_session = SpeechSession(credentials=CREDS, language_code="en-US").start()
 
     print("[STT] Listening for command...")
-
-    try:
-        for resp in client.streaming_recognize(
-            streaming_config, request_generator()
-        ):
-            if resp.results and resp.results[0].is_final:
-                transcript = resp.results[0].alternatives[0].transcript.lower().strip()
-                print(f"[STT] Recognized: '{transcript}'")
-                break
-    except Exception as e:
-        print(f"[STT Error] {e}")
-    finally:
-        mic.stop()
-
+    transcript = _stt_session.listen(timeout_sec, commands=commands)
+    if transcript:
+        print(f"[STT] Recognized: '{transcript}'")
+    else:
+        print(f"[STT] Nothing recognized within {timeout_sec}s")
+    if tracer is not None:
+        tracer.begin(transcript, _stt_session.last_marks)
     return transcript
 
+def stop_listening():
+    global _stt_session
+    if _stt_session is not None:
+        _stt_session.stop()
+        _stt_session = None
+
 # ─── Extract Dish Name: fixed “tell me how to make [dish]” ───
 def extract_dish_name(query: str) -> str:
     """
@@ -79,110 +78,94 @@ def extract_dish_name(query: str) -> str:
 
     return ""  # pattern not matched
 
-# ─── Parse Structured Recipe (English headings) ───
-def parse_structured_recipe(recipe_text: str) -> dict:
-    data = {
-        "dish_name": "Unknown",
-        "total_time": "Unknown",
-        "ingredients": [],
-        "tools": [],
-        "steps": [],
-        "tips": "No special tips"
-    }
-
-    if not recipe_text or recipe_text.startswith("Error"):
-        print(f"[Parser] Invalid recipe text: {recipe_text}")
-        return data
-
-    try:
-        # Dish Name
-        dn = re.search(r"【Dish Name】:\s*(.+?)(?=\n|$)", recipe_text, re.IGNORECASE)
-        if dn:
-            data["dish_name"] = dn.group(1).strip()
-
-        # Total Time
-        tt = re.search(r"【Total Time】:\s*(.+?)(?=\n|$)", recipe_text, re.IGNORECASE)
-        if tt:
-            data["total_time"] = tt.group(1).strip()
-
-        # Ingredients block
-        ing_block = re.search(
-            r"【Ingredients】:\s*\n(.*?)(?=\n【Tools】:|\n【Steps】:|\Z)",
-            recipe_text, re.DOTALL | re.IGNORECASE
-        )
-        if ing_block:
-            lines = ing_block.group(1).strip().split("\n")
-            data["ingredients"] = [
-                line.strip().lstrip("- ").strip()
-                for line in lines if line.strip().startswith("-")
-            ]
-
-        # Tools block
-        tools_block = re.search(
-            r"【Tools】:\s*\n(.*?)(?=\n【Steps】:|\n【Tips】:|\Z)",
-            recipe_text, re.DOTALL | re.IGNORECASE
-        )
-        if tools_block:
-            lines = tools_block.group(1).strip().split("\n")
-            data["tools"] = [
-                line.strip().lstrip("- ").strip()
-                for line in lines if line.strip().startswith("-")
-            ]
-
-        # Steps block
-        steps_block = re.search(
-            r"【Steps】:\s*\n(.*?)(?=\n【Tips】:|\Z)",
-            recipe_text, re.DOTALL | re.IGNORECASE
-        )
-        if steps_block:
-            lines = steps_block.group(1).strip().split("\n")
-            raw_steps = [
-                line.strip() for line in lines
-                if re.match(r"^\d+\.\s+", line.strip())
-            ]
-            data["steps"] = [
-                re.sub(r"^\d+\.\s*", "", step).strip() for step in raw_steps
-            ]
-
-        # Tips block
-        tips_block = re.search(r"【Tips】:\s*(.+?)(?=\Z)", recipe_text, re.DOTALL | re.IGNORECASE)
-        if tips_block:
-            data["tips"] = tips_block.group(1).strip()
-
-    except Exception as e:
-        print(f"[Parser Error] Parsing recipe failed: {e}")
-        print(f"Partial text: {recipe_text[:300]}")
-
-    return data
+# ─── Recipe Parsing Defaults (used for fields that were not found) ───
+RECIPE_DEFAULTS = {
+    "dish_name": "Unknown",
+    "total_time": "Unknown",
+    "tips": "No special tips",
+}
+
+# ─── Fixed Prompts (pre-synthesized into the TTS cache at startup) ───
+PROMPT_GREETING = "Hello! To begin, please say: 'Tell me how to make [dish name]'."
+PROMPT_SAY_DISH = "Please say exactly: 'Tell me how to make [dish name]'."
+PROMPT_NO_INGREDIENTS = "Ingredient list is not available."
+PROMPT_NO_TOOLS = "Tool list is not available."
+PROMPT_READY = "When you are ready, say 'Start' or 'Next'."
+PROMPT_READY_RETRY = "Please say 'Start' or 'Next' when ready."
+PROMPT_COMMANDS = "Say 'Next step', 'Previous step', 'Repeat', 'Ingredients', 'Tools', or 'Finish'."
+PROMPT_NOT_HEARD = "Sorry, I didn't catch that. What would you like to do?"
+PROMPT_COMPLETED = "You have completed all steps. Enjoy your meal!"
+PROMPT_AT_FIRST_STEP = "You are already at the first step."
+PROMPT_FINISH = "Okay, ending the recipe guidance. Thank you!"
+
+STATIC_PROMPTS = [
+    PROMPT_GREETING,
+    PROMPT_SAY_DISH,
+    PROMPT_NO_INGREDIENTS,
+    PROMPT_NO_TOOLS,
+    PROMPT_READY,
+    PROMPT_READY_RETRY,
+    PROMPT_COMMANDS,
+    PROMPT_NOT_HEARD,
+    PROMPT_COMPLETED,
+    PROMPT_AT_FIRST_STEP,
+    PROMPT_FINISH,
+]
+
+# ─── Step Phrases (shared by the loop and the prefetcher so the texts match exactly) ───
+def step_phrase(steps: list, idx: int) -> str:
+    return f"Step {idx + 1}: {steps[idx]}"
+
+def repeat_phrase(steps: list, idx: int) -> str:
+    return f"Repeating step {idx + 1}: {steps[idx]}"
+
+def back_phrase(steps: list, idx: int) -> str:
+    return f"Going back to step {idx + 1}: {steps[idx]}"
+
+def adjacent_step_phrases(steps: list, idx: int) -> list:
+    """
+    Phrases the user is likely to trigger next while on step `idx`, most likely first.
+    """
+    phrases = []
+    if idx + 1 < len(steps):
+        phrases.append(step_phrase(steps, idx + 1))
+    phrases.append(repeat_phrase(steps, idx))
+    if idx > 0:
+        phrases.append(back_phrase(steps, idx - 1))
+    return phrases
 
 # ─── Main: Step-by-Step Voice Loop ───
 def run_step_by_step():
+    # Per-turn timings (end of speech → STT → intent → TTS → playback start) as JSONL (tracing.TRACE_DIR)
+    tracer = TurnTracer("recipe_voice_assistant")
+    speak = tracer.speaker(tts_speak)
+
     # 1) Prompt in English
-    prompt_en = "Hello! To begin, please say: 'Tell me how to make [dish name]'."
-    print(prompt_en)
-    tts_speak(prompt_en)
+    print(PROMPT_GREETING)
+    speak(PROMPT_GREETING)
 
     # 2) Listen for exact phrase
-    raw_query = listen_for_trigger()
+    raw_query = listen_for_trigger(tracer=tracer)
     dish_query = extract_dish_name(raw_query)
+    tracer.intent("dish" if dish_query else None)
     print(f"[Dish Query] Raw: '{raw_query}' → Extracted: '{dish_query}'")
 
     # 3) If pattern not matched, ask again
     if not dish_query:
-        tts_speak("Please say exactly: 'Tell me how to make [dish name]'.")
+        speak(PROMPT_SAY_DISH)
         return
 
     # 4) Confirm and look up recipe
-    tts_speak(f"Looking up the recipe for {dish_query}. Please wait.")
+    speak(f"Looking up the recipe for {dish_query}. Please wait.")
 
     # 5) Fetch recipe
     full_recipe_text = generate_recipe(dish_query)
     if not full_recipe_text or full_recipe_text.startswith("Error"):
-        tts_speak(f"Sorry, I couldn't retrieve the recipe for {dish_query}. {full_recipe_text}")
+        speak(f"Sorry, I couldn't retrieve the recipe for {dish_query}. {full_recipe_text}")
         return
 
     # 6) Parse recipe
-    recipe_data = parse_structured_recipe(full_recipe_text)
+    recipe_data = parse_structured_recipe(full_recipe_text, defaults=RECIPE_DEFAULTS)
     dish_to_speak = recipe_data["dish_name"] if recipe_data["dish_name"] != "Unknown" else dish_query
     ingredients = recipe_data.get("ingredients", [])
     tools = recipe_data.get("tools", [])
@@ -190,97 +173,112 @@ def run_step_by_step():
     tips = recipe_data.get("tips", "No special tips")
 
     if not steps:
-        tts_speak(f"Sorry, I couldn't parse the steps for {dish_to_speak}.")
+        speak(f"Sorry, I couldn't parse the steps for {dish_to_speak}.")
         return
 
+    # Synthesize the first step while ingredients and tools are being read out
+    prefetcher = SpeechPrefetcher(synthesize_speech, play_pcm)
+    speak_step = tracer.speaker(prefetcher.speak)
+    prefetcher.prefetch([step_phrase(steps, 0)])
+
     # 7) Announce ingredients and tools
-    tts_speak(f"Starting instructions for {dish_to_speak}.")
+    speak(f"Starting instructions for {dish_to_speak}.")
     if ingredients:
         ing_str = ", ".join(ingredients)
-        tts_speak(f"You will need the following ingredients: {ing_str}.")
+        speak(f"You will need the following ingredients: {ing_str}.")
     else:
-        tts_speak("Ingredient list is not available.")
+        speak(PROMPT_NO_INGREDIENTS)
 
     if tools:
         tools_str = ", ".join(tools)
-        tts_speak(f"You will also need these tools: {tools_str}.")
+        speak(f"You will also need these tools: {tools_str}.")
     else:
-        tts_speak("Tool list is not available.")
+        speak(PROMPT_NO_TOOLS)
 
     # 8) Wait for “start” or “next”
-    tts_speak("When you are ready, say 'Start' or 'Next'.")
+    speak(PROMPT_READY)
     ready = False
     while not ready:
-        cmd = listen_for_trigger(timeout_sec=20)
-        if any(k in cmd for k in ["start", "next", "yes", "ok"]):
+        cmd = listen_for_trigger(timeout_sec=20, tracer=tracer, commands=True)
+        intent = ready_matcher.intent(cmd)
+        tracer.intent(intent)
+        if intent == "start":
             ready = True
         else:
-            tts_speak("Please say 'Start' or 'Next' when ready.")
+            speak(PROMPT_READY_RETRY)
 
     # 9) Read first step
     current_idx = 0
-    tts_speak(f"Step 1: {steps[current_idx]}")
+    speak_step(step_phrase(steps, current_idx))
 
     # 10) Step navigation loop
     while current_idx < len(steps):
-        tts_speak("Say 'Next step', 'Previous step', 'Repeat', 'Ingredients', 'Tools', or 'Finish'.")
-        cmd = listen_for_trigger(timeout_sec=25)
+        # Prepare next / repeat / previous audio while the user is on this step
+        prefetcher.prefetch(adjacent_step_phrases(steps, current_idx))
+        speak(PROMPT_COMMANDS)
+        cmd = listen_for_trigger(timeout_sec=25, tracer=tracer, commands=True)
 
         if not cmd:
-            tts_speak("Sorry, I didn't catch that. What would you like to do?")
+            speak(PROMPT_NOT_HEARD)
             continue
 
+        intent = navigation_matcher.intent(cmd)
+        tracer.intent(intent)
+
         # Next step
-        if any(k in cmd for k in ["next step", "next"]):
+        if intent == "next":
             current_idx += 1
             if current_idx < len(steps):
-                tts_speak(f"Step {current_idx + 1}: {steps[current_idx]}")
+                speak_step(step_phrase(steps, current_idx))
             else:
-                tts_speak("You have completed all steps. Enjoy your meal!")
+                speak(PROMPT_COMPLETED)
                 if tips and tips.lower() != "no special tips":
-                    tts_speak(f"One final tip: {tips}")
+                    speak(f"One final tip: {tips}")
                 break
 
         # Repeat current step
-        elif any(k in cmd for k in ["repeat", "again"]):
-            tts_speak(f"Repeating step {current_idx + 1}: {steps[current_idx]}")
+        elif intent == "repeat":
+            speak_step(repeat_phrase(steps, current_idx))
 
         # Previous step
-        elif any(k in cmd for k in ["previous step", "previous"]):
+        elif intent == "previous":
             if current_idx > 0:
                 current_idx -= 1
-                tts_speak(f"Going back to step {current_idx + 1}: {steps[current_idx]}")
+                speak_step(back_phrase(steps, current_idx))
             else:
-                tts_speak("You are already at the first step.")
+                speak(PROMPT_AT_FIRST_STEP)
 
         # Ingredients inquiry
-        elif any(k in cmd for k in ["ingredients", "what ingredients", "list ingredients"]):
+        elif intent == "ingredients":
             if ingredients:
                 ing_str = ", ".join(ingredients)
-                tts_speak(f"Ingredients: {ing_str}.")
+                speak(f"Ingredients: {ing_str}.")
             else:
-                tts_speak("Ingredient list is not available.")
+                speak(PROMPT_NO_INGREDIENTS)
 
         # Tools inquiry
-        elif any(k in cmd for k in ["tools", "what tools", "list tools"]):
+        elif intent == "tools":
             if tools:
                 tools_str = ", ".join(tools)
-                tts_speak(f"Tools: {tools_str}.")
+                speak(f"Tools: {tools_str}.")
             else:
-                tts_speak("Tool list is not available.")
+                speak(PROMPT_NO_TOOLS)
 
         # Current step inquiry
-        elif any(k in cmd for k in ["current step", "what step", "which step"]):
-            tts_speak(f"You are on step {current_idx + 1}: {steps[current_idx]}")
+        elif intent == "current_step":
+            speak(f"You are on step {current_idx + 1}: {steps[current_idx]}")
 
         # Finish
-        elif any(k in cmd for k in ["finish", "stop", "exit"]):
-            tts_speak("Okay, ending the recipe guidance. Thank you!")
+        elif intent == "finish":
+            speak(PROMPT_FINISH)
             break
 
         # Unrecognized command
         else:
-            tts_speak(f"Sorry, I didn't understand '{cmd}'. Please try again.")
+            speak(f"Sorry, I didn't understand '{cmd}'. Please try again.")
+
+    prefetcher.close()
+    tracer.close()
 
 if __name__ == "__main__":
     key = os.getenv("GEMINI_API_KEY")
@@ -297,7 +295,15 @@ if __name__ == "__main__":
             p = pyaudio.PyAudio()
             p.terminate()
             print("PyAudio check passed.")
-            run_step_by_step()
+            # Pre-synthesize fixed prompts in the background
+            warmup_tts(STATIC_PROMPTS)
+            # Expose TTS/STT metrics on /metrics when AICHEF_METRICS_PORT is set
+            if METRICS_PORT:
+                serve_metrics(int(METRICS_PORT))
+            try:
+                run_step_by_step()
+            finally:
+                stop_listening()
         except ImportError:
             print("Error: PyAudio library not found. Please install it.")
         except Exception as e_main:
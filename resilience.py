@@ -0,0 +1,321 @@
+# resilience.py
+#
+# 외부 API(Gemini) 호출 보호: 할당량에 맞춘 토큰 버킷, 재시도 가능한 오류에 대한
+# 지터가 있는 지수 백오프, 상류가 계속 실패할 때 빠르게 거절하는 서킷 브레이커.
+
+import os
+import re
+import time
+import math
+import random
+import asyncio
+import threading
+from metrics import QUEUE_WAIT_SECONDS
+
+# ——— Gemini 호출 보호 설정 (환경 변수로 할당량에 맞게 조정) ———
+GEMINI_RATE_PER_SEC = float(os.getenv("AICHEF_GEMINI_RATE_PER_SEC", 2.0))
+GEMINI_BURST = int(os.getenv("AICHEF_GEMINI_BURST", 5))
+GEMINI_MAX_QUEUE_WAIT_SEC = float(os.getenv("AICHEF_GEMINI_MAX_QUEUE_WAIT_SEC", 10))
+GEMINI_MAX_RETRIES = int(os.getenv("AICHEF_GEMINI_MAX_RETRIES", 3))
+BACKOFF_BASE_SEC = 0.5
+BACKOFF_MAX_SEC = 8.0
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("AICHEF_GEMINI_BREAKER_FAILURES", 5))
+BREAKER_RESET_SEC = float(os.getenv("AICHEF_GEMINI_BREAKER_RESET_SEC", 30))
+
+# 일시적인 과부하/장애로 보고 재시도하는 오류 (google.api_core.exceptions 클래스 이름, HTTP 코드)
+RETRYABLE_ERROR_NAMES = {"ResourceExhausted", "TooManyRequests", "ServiceUnavailable",
+                         "InternalServerError", "DeadlineExceeded", "GatewayTimeout"}
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class OverloadedError(RuntimeError):
+    """
+    The call was not made (or gave up) because the upstream is overloaded.
+    `retry_after` is a suggested delay in seconds.
+    """
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimitedError(OverloadedError):
+    pass
+
+
+class CircuitOpenError(OverloadedError):
+    pass
+
+
+class RetriesExhaustedError(OverloadedError):
+    pass
+
+
+def is_retryable(error: Exception) -> bool:
+    if any(cls.__name__ in RETRYABLE_ERROR_NAMES for cls in type(error).__mro__):
+        return True
+    code = getattr(error, "code", None)
+    if isinstance(code, int) and code in RETRYABLE_STATUS_CODES:
+        return True
+    # 예: "429 Resource has been exhausted (e.g. check quota)."
+    match = re.match(r"\s*(\d{3})\b", str(error))
+    return bool(match) and int(match.group(1)) in RETRYABLE_STATUS_CODES
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE_SEC, cap: float = BACKOFF_MAX_SEC) -> float:
+    """
+    "Full jitter" backoff: uniform in [0, min(cap, base * 2^attempt)].
+    """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at `rate` tokens/sec, holding at most `burst`.
+    `reserve()` books a token and returns how long the caller must wait for
+    it, so waiting happens outside the lock (time.sleep or asyncio.sleep).
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        # _lock을 잡은 상태에서 호출
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return max(0.0, (1 - self._tokens) / self.rate)
+
+    def reserve(self, max_wait: float):
+        """
+        Returns seconds to wait for a token, or None (nothing reserved) if that exceeds `max_wait`.
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            wait = max(0.0, (1 - self._tokens) / self.rate)
+            if wait > max_wait:
+                return None
+            # 토큰이 음수가 될 수 있음: 뒤에 온 호출은 앞선 예약만큼 더 기다림
+            self._tokens -= 1
+            return wait
+
+
+class CircuitBreaker:
+    """
+    closed → open after `failure_threshold` consecutive upstream failures;
+    open → half_open after `reset_sec`, letting one probe call through;
+    the probe's result closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int, reset_sec: float):
+        self.failure_threshold = failure_threshold
+        self.reset_sec = reset_sec
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self.opened = 0
+
+    def remaining_open_sec(self) -> float:
+        with self._lock:
+            if self.state != "open":
+                return 0.0
+            return max(0.0, self._opened_at + self.reset_sec - time.monotonic())
+
+    def allow(self):
+        """
+        Raises CircuitOpenError if the call must be shed.
+        """
+        with self._lock:
+            if self.state == "open":
+                remaining = self._opened_at + self.reset_sec - time.monotonic()
+                if remaining > 0:
+                    raise CircuitOpenError(f"circuit open, retry in {math.ceil(remaining)} s", remaining)
+                self.state = "half_open"
+                self._probing = False
+            if self.state == "half_open":
+                if self._probing:
+                    raise CircuitOpenError("circuit half-open, probe in progress", 1.0)
+                self._probing = True
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.opened += 1
+                    print(f"[Resilience] Circuit opened after {self._failures} consecutive failure(s)")
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def release_probe(self):
+        # 상류와 무관한 오류로 끝난 시험 호출은 결과로 치지 않음
+        with self._lock:
+            self._probing = False
+
+
+class Guard:
+    """
+    Wraps upstream calls with rate limiting, retries and a circuit breaker.
+    `bucket` and `breaker` may be None to disable that layer.
+
+    `call(fn, *args)` / `await call_async(fn, *args)` return fn's result,
+    raise OverloadedError (RateLimitedError, CircuitOpenError,
+    RetriesExhaustedError) when the call is shed or keeps failing with a
+    retryable error, and re-raise non-retryable errors unchanged.
+    """
+
+    def __init__(self, name: str, bucket: TokenBucket = None, breaker: CircuitBreaker = None,
+                 max_retries: int = GEMINI_MAX_RETRIES, max_queue_wait: float = GEMINI_MAX_QUEUE_WAIT_SEC):
+        self.name = name
+        self.bucket = bucket
+        self.breaker = breaker
+        self.max_retries = max_retries
+        self.max_queue_wait = max_queue_wait
+        self._lock = threading.Lock()
+        self._counters = {
+            "calls": 0, "attempts": 0, "successes": 0, "retries": 0, "retryable_errors": 0, "other_errors": 0,
+            "rejected_rate_limited": 0, "rejected_circuit_open": 0, "gave_up": 0,
+            "queue_waits": 0, "queue_wait_sec": 0.0, "max_queue_wait_sec": 0.0,
+        }
+
+    def _count(self, name: str, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def retry_after(self) -> int:
+        """
+        Suggested Retry-After (whole seconds) for a client that was turned away.
+        """
+        wait = 1.0
+        if self.bucket is not None:
+            wait = max(wait, self.bucket.wait_time())
+        if self.breaker is not None:
+            wait = max(wait, self.breaker.remaining_open_sec())
+        return math.ceil(wait)
+
+    # ─── 시도 전/후 공통 단계 ───
+    def _before_attempt(self) -> float:
+        """
+        Checks the breaker and books a token; returns how long to wait before calling.
+        """
+        if self.breaker is not None:
+            try:
+                self.breaker.allow()
+            except CircuitOpenError:
+                self._count("rejected_circuit_open")
+                raise
+        if self.bucket is None:
+            return 0.0
+        wait = self.bucket.reserve(self.max_queue_wait)
+        if wait is None:
+            if self.breaker is not None:
+                self.breaker.release_probe()
+            self._count("rejected_rate_limited")
+            raise RateLimitedError(f"{self.name} rate limit queue is full", self.bucket.wait_time())
+        QUEUE_WAIT_SECONDS.observe(wait, f"{self.name}_rate_limit")
+        if wait > 0:
+            with self._lock:
+                self._counters["queue_waits"] += 1
+                self._counters["queue_wait_sec"] += wait
+                self._counters["max_queue_wait_sec"] = max(self._counters["max_queue_wait_sec"], wait)
+        return wait
+
+    def _after_error(self, error: Exception, attempt: int):
+        """
+        Returns the backoff delay before the next attempt, or raises if there is none.
+        """
+        if not is_retryable(error):
+            if self.breaker is not None:
+                self.breaker.release_probe()
+            self._count("other_errors")
+            raise error
+        self._count("retryable_errors")
+        if self.breaker is not None:
+            self.breaker.record_failure()
+        if attempt >= self.max_retries or (self.breaker is not None and self.breaker.state == "open"):
+            self._count("gave_up")
+            raise RetriesExhaustedError(f"{self.name} failed after {attempt + 1} attempt(s): {error}",
+                                        self.retry_after()) from error
+        self._count("retries")
+        return backoff_delay(attempt)
+
+    def _after_success(self):
+        if self.breaker is not None:
+            self.breaker.record_success()
+        self._count("successes")
+
+    # ─── 호출 ───
+    def call(self, fn, *args, **kwargs):
+        self._count("calls")
+        attempt = 0
+        while True:
+            wait = self._before_attempt()
+            if wait > 0:
+                time.sleep(wait)
+            self._count("attempts")
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                time.sleep(self._after_error(e, attempt))
+                attempt += 1
+                continue
+            except BaseException:
+                # 취소/인터럽트로 끝난 시험 호출이 half-open 상태를 막지 않도록
+                if self.breaker is not None:
+                    self.breaker.release_probe()
+                raise
+            self._after_success()
+            return result
+
+    async def call_async(self, fn, *args, **kwargs):
+        self._count("calls")
+        attempt = 0
+        while True:
+            wait = self._before_attempt()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._count("attempts")
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                await asyncio.sleep(self._after_error(e, attempt))
+                attempt += 1
+                continue
+            except BaseException:
+                # 취소/인터럽트로 끝난 시험 호출이 half-open 상태를 막지 않도록
+                if self.breaker is not None:
+                    self.breaker.release_probe()
+                raise
+            self._after_success()
+            return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            data = dict(self._counters)
+        if self.breaker is not None:
+            data["circuit_state"] = self.breaker.state
+            data["circuit_opened"] = self.breaker.opened
+        return data
+
+
+gemini_guard = Guard(
+    "gemini",
+    TokenBucket(GEMINI_RATE_PER_SEC, GEMINI_BURST),
+    CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_SEC),
+)
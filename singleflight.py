@@ -0,0 +1,109 @@
+# singleflight.py
+
+import asyncio
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    In-flight request table: concurrent `do()` calls with the same key share
+    one execution of `fn`. The first caller runs it, everyone else waits and
+    receives the same result (or the same exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._counters = {"executions": 0, "coalesced": 0}
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                self._counters["executions"] += 1
+                leader = True
+            else:
+                call.waiters += 1
+                self._counters["coalesced"] += 1
+                leader = False
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> dict:
+        with self._lock:
+            data = dict(self._counters)
+            data["in_flight"] = len(self._calls)
+        return data
+
+
+class AsyncSingleFlight:
+    """
+    asyncio version of `SingleFlight` for coroutine functions. Must be used
+    from a single event loop; waiters do not hold a thread while they wait.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._counters = {"executions": 0, "coalesced": 0}
+
+    async def do(self, key, fn, *args, **kwargs):
+        future = self._calls.get(key)
+        if future is not None:
+            self._counters["coalesced"] += 1
+            # 대기 중인 요청이 취소되어도 공유 호출은 계속 진행
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self._counters["executions"] += 1
+        try:
+            result = await fn(*args, **kwargs)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()   # 기다리는 쪽이 없어도 "never retrieved" 경고가 나지 않게
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def stats(self) -> dict:
+        data = dict(self._counters)
+        data["in_flight"] = len(self._calls)
+        return data
@@ -0,0 +1,78 @@
+# speech_prefetch.py
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class SpeechPrefetcher:
+    """
+    Synthesizes phrases that are likely to be spoken next (next step, previous
+    step, repeat of the current step) in the background, and keeps a small
+    bounded window of ready audio so navigation commands can start playback
+    immediately.
+    """
+
+    def __init__(self, synthesize, play, max_ready: int = 6, max_workers: int = 2):
+        self._synthesize = synthesize
+        self._play = play
+        self.max_ready = max_ready
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tts-prefetch")
+        self._lock = threading.Lock()
+        self._window = OrderedDict()   # text -> Future[pcm bytes | None]
+        self._counters = {"requested": 0, "ready_hits": 0, "inflight_hits": 0, "misses": 0, "evicted": 0}
+
+    def prefetch(self, texts):
+        """
+        Start synthesizing `texts` (most important first) unless already in the window.
+        """
+        with self._lock:
+            for text in texts:
+                if not text:
+                    continue
+                if text in self._window:
+                    self._window.move_to_end(text)
+                    continue
+                self._window[text] = self._pool.submit(self._synthesize, text)
+                self._counters["requested"] += 1
+            while len(self._window) > self.max_ready:
+                _, future = self._window.popitem(last=False)
+                future.cancel()
+                self._counters["evicted"] += 1
+
+    def get(self, text: str):
+        """
+        Return prefetched audio for `text` (waiting if it is still being synthesized),
+        or None if it was never prefetched.
+        """
+        with self._lock:
+            future = self._window.get(text)
+            if future is None:
+                self._counters["misses"] += 1
+                return None
+            self._counters["ready_hits" if future.done() else "inflight_hits"] += 1
+        try:
+            return future.result()
+        except Exception as e:
+            print(f"[TTS Prefetch Error] {e}")
+            return None
+
+    def speak(self, text: str, block: bool = True):
+        """
+        Play `text`, using prefetched audio when available.
+        """
+        pcm_data = self.get(text)
+        if pcm_data is None:
+            pcm_data = self._synthesize(text)
+        if not pcm_data:
+            return None
+        return self._play(pcm_data, block=block)
+
+    def stats(self) -> dict:
+        with self._lock:
+            data = dict(self._counters)
+            data["window"] = len(self._window)
+        return data
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,341 @@
+# stt_session.py
+
+import time
+import queue
+import itertools
+import threading
+from stt_tts_test_code import MicrophoneStream, request_generator, RATE
+from clients import registry, speech_client, speech_module
+from metrics import STAGE_SECONDS, UPSTREAM_ERRORS, export_stats
+
+# Google streaming recognition은 스트림 하나당 약 305초로 제한되므로 그 전에 새 스트림으로 교체
+STREAM_RESTART_SEC = 290
+# VAD 없이 쓸 때: listen() 호출 직후 도착하는 결과는 방금 재생한 안내 음성을 인식한 것일 수 있으므로 버림
+# (VAD가 있으면 발화가 시작된 시점으로 판단)
+SETTLE_SEC = 0.3
+# 오류로 스트림이 끊긴 뒤 재연결까지 기다리는 시간
+RECONNECT_BACKOFF_SEC = 0.5
+
+
+class SpeechSession:
+    """
+    One long-lived recognition session per cooking run.
+    Reuses a single SpeechClient and a single open microphone, runs
+    `streaming_recognize` on a background thread, transparently starts a new
+    stream before the provider's duration limit, and hands each final
+    transcript to `listen()`. Audio captured while a stream is being
+    replaced stays in the mic's ring buffer and is sent on the next stream;
+    audio captured before a `listen()` call (e.g. while a prompt was
+    playing) is discarded by that call. Each mic owns its buffer, so a
+    stopped session never leaks audio into the next one.
+
+    With `use_vad` (default), audio passes through a local EnergyVAD first:
+    silence is never uploaded, a stream is opened only once speech starts,
+    and it is closed as soon as the VAD detects the end of the utterance.
+    `listen()` only returns utterances whose speech started after the call:
+    one still in progress (e.g. the prompt picked up by the mic) is cut off
+    there, and its transcript is dropped when it arrives.
+
+    With `spot_commands` and command templates for the session language
+    (keyword_spotter.KWS_TEMPLATE_DIR; en-US and ko-KR ship, synthesized with
+    espeak-ng), short utterances heard by `listen(commands=True)` are also
+    matched on-device at end of utterance. A confident match is handed to
+    `listen()` right away, and the cloud result for that utterance is
+    dropped. Anything else, including KWS_CLOUD_ONLY_LABELS such as "stop",
+    uses the cloud transcript. Off by default until the templates are real
+    recordings.
+
+    `audio_source` is a factory for the audio input (default
+    MicrophoneStream); e.g. `lambda: WavFileStream("recipe_reply.wav", speed=4)`
+    replays a recording through the same path without an audio device.
+    """
+
+    def __init__(self, credentials=None, language_code: str = "en-US",
+                 alternative_language_codes=None, restart_after_sec: float = STREAM_RESTART_SEC,
+                 use_vad: bool = True, spot_commands: bool = False, audio_source=None):
+        self.credentials = credentials
+        self.audio_source = audio_source or MicrophoneStream
+        self.language_code = language_code
+        self.alternative_language_codes = alternative_language_codes or []
+        self.restart_after_sec = restart_after_sec
+
+        self._vad = None
+        self._spotter = None
+        if use_vad:
+            try:
+                from vad import EnergyVAD
+                self._vad = EnergyVAD(sample_rate=RATE)
+            except ImportError as e:
+                print(f"[STT] VAD disabled, sending all audio: {e}")
+        # 발화 경계를 알아야 하므로 키워드 검출은 VAD가 있을 때만 사용
+        if spot_commands and self._vad is not None:
+            from keyword_spotter import load_keyword_spotter, KWS_CLOUD_ONLY_LABELS
+            self._spotter = load_keyword_spotter(language_code, sample_rate=RATE)
+            self._cloud_only_labels = KWS_CLOUD_ONLY_LABELS
+
+        self._client = None
+        self._mic = None
+        self._thread = None
+        self._stopping = threading.Event()
+        # listen()이 새 질문을 시작했음을 알림: 진행 중인 발화를 끊고 VAD를 초기화
+        self._new_turn = threading.Event()
+        # 현재 listen()이 명령어(다음/이전/…)를 기다리는지: 그때만 키워드 검출 사용
+        self._commands_expected = False
+        self._transcripts = queue.Queue()   # (arrived_at, speech_start, transcript, marks)
+        # 마지막으로 listen()이 돌려준 발화의 시점들 (tracing.TurnTracer가 사용)
+        self.last_marks = {}
+        self._lock = threading.Lock()
+        self._stream_ended_at = None
+        self._stream_ended_by_error = False
+        self._stats = {
+            "streams": 0,
+            "restarts": 0,
+            "reconnects": 0,
+            "errors": 0,
+            "finals": 0,
+            "utterances": 0,
+            "local_commands": 0,
+            "restart_latency_sec": [],
+            "reconnect_latency_sec": [],
+        }
+
+    # ─── 시작/종료 ───
+    def start(self):
+        if self._thread is not None:
+            return self
+        self._client = speech_client(self.credentials)
+        self._mic = self.audio_source()
+        buffer = self._mic.buffer
+        # 인식이 밀려서 버퍼가 차 가는지(backpressure)와 버린 오디오를 /metrics에서 볼 수 있게 함
+        export_stats("aichef_mic_buffer", "Microphone ring buffer", buffer.stats,
+                     counters=("dropped_frames", "discarded_frames", "overflows"),
+                     gauges=("buffered_frames", "high_water_frames", "fill_ratio"))
+        self._mic.start()
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="stt-session", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stopping.set()
+        try:
+            self._mic.stop()
+        except Exception as e:
+            print(f"[STT Error] Failed to stop microphone: {e}")
+        self._thread.join(timeout=5)
+        self._thread = None
+        print(f"[STT] Session closed: {self.report()}")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    # ─── 백그라운드 인식 루프 ───
+    def _streaming_config(self):
+        speech = speech_module()
+        config = speech.RecognitionConfig(
+            encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
+            sample_rate_hertz=RATE,
+            language_code=self.language_code,
+            alternative_language_codes=self.alternative_language_codes,
+        )
+        return speech.StreamingRecognitionConfig(config=config, interim_results=False)
+
+    def _requests(self, utterance: dict):
+        # 스트림 제한 시간은 첫 오디오를 보낸 시점부터 계산 (VAD 사용 시 말하기 전까지는 스트림이 없음)
+        deadline = None
+        audio = [] if self._spotter is not None else None
+
+        def should_stop():
+            return self._stopping.is_set() or self._new_turn.is_set() or \
+                (deadline is not None and time.monotonic() >= deadline)
+
+        for req in request_generator(self._mic.buffer, should_stop=should_stop, vad=self._vad):
+            if deadline is None:
+                # VAD 사용 시 첫 오디오 = 발화 시작 (listen()이 이보다 먼저 시작된 발화를 버림)
+                utterance["speech_start"] = time.monotonic()
+                deadline = utterance["speech_start"] + self.restart_after_sec
+                self._record_stream_started()
+            if audio is not None:
+                audio.append(req.audio_content)
+            yield req
+
+        if self._new_turn.is_set():
+            self._new_turn.clear()
+            if self._vad is not None:
+                # 끊긴 발화의 남은 상태(진행 중/프리롤)를 버리고 다음 발화를 처음부터 감지
+                self._vad.reset()
+            utterance["interrupted"] = True
+            return
+
+        # 마지막 오디오를 보낸 시점: 여기서부터 최종 결과까지가 클라우드 응답 지연
+        utterance["sent_at"] = time.perf_counter()
+        if self._vad is not None and self._vad.utterance_ended:
+            # VAD가 마지막으로 음성을 들은 시점 (여기서 end_silence_ms 동안 조용해야 발화 끝으로 판단)
+            utterance["speech_end"] = self._vad.last_voiced_at
+        if audio and self._vad.utterance_ended and self._commands_expected:
+            self._spot_locally(b"".join(audio), utterance)
+
+    def _spot_locally(self, pcm: bytes, utterance: dict):
+        label, distance, elapsed = self._spotter.spot(pcm)
+        if label is None or label in self._cloud_only_labels:
+            return
+        with self._lock:
+            if utterance["answered"] is not None:
+                return
+            utterance["answered"] = "local"
+            self._stats["local_commands"] += 1
+        print(f"[KWS] '{label}' (distance {distance:.2f}) in {elapsed * 1000:.1f} ms")
+        self._transcripts.put((time.monotonic(), utterance.get("speech_start"), label, self._marks(utterance, "local")))
+
+    def _deliver_cloud(self, transcript: str, utterance: dict):
+        if utterance.get("sent_at") is not None:
+            # 마지막 오디오를 보낸 뒤 최종 인식 결과가 오기까지
+            finalize_sec = time.perf_counter() - utterance["sent_at"]
+            registry.record_call("speech", finalize_sec)
+            STAGE_SECONDS.observe(finalize_sec, "stt_finalize")
+        with self._lock:
+            if utterance["answered"] == "local":
+                return
+            utterance["answered"] = "cloud"
+            self._stats["finals"] += 1
+        self._transcripts.put((time.monotonic(), utterance.get("speech_start"), transcript,
+                               self._marks(utterance, "cloud")))
+
+    def _marks(self, utterance: dict, source: str) -> dict:
+        # 모두 time.perf_counter() 값. VAD 없이는 말이 끝난 시점을 알 수 없으므로 speech_end는 None
+        return {
+            "stt_source": source,
+            "speech_end": utterance.get("speech_end"),
+            "vad_end": utterance.get("sent_at"),
+            "stt_final": time.perf_counter(),
+        }
+
+    def _record_stream_started(self):
+        with self._lock:
+            self._stats["streams"] += 1
+            if self._stream_ended_at is None:
+                return
+            latency = time.perf_counter() - self._stream_ended_at
+            key = "reconnect" if self._stream_ended_by_error else "restart"
+            self._stats[f"{key}s"] += 1
+            self._stats[f"{key}_latency_sec"].append(latency)
+            self._stream_ended_at = None
+
+    def _run(self):
+        streaming_config = self._streaming_config()
+        while not self._stopping.is_set():
+            # 한 발화에 대해 로컬 검출과 클라우드 결과 중 먼저 나온 쪽만 전달
+            utterance = {"answered": None}
+            requests = self._requests(utterance)
+            if self._vad is not None:
+                # 발화가 시작될 때까지 기다렸다가 스트림을 연다 (무음 동안 열린 스트림은 타임아웃됨)
+                try:
+                    first = next(requests)
+                except StopIteration:
+                    continue
+                requests = itertools.chain([first], requests)
+            failed = False
+            try:
+                for resp in self._client.streaming_recognize(streaming_config, requests):
+                    for result in resp.results:
+                        if result.is_final and result.alternatives:
+                            transcript = result.alternatives[0].transcript.lower().strip()
+                            if transcript:
+                                self._deliver_cloud(transcript, utterance)
+            except Exception as e:
+                failed = True
+                self._stats["errors"] += 1
+                UPSTREAM_ERRORS.inc("stt", "error")
+                if not self._stopping.is_set():
+                    print(f"[STT Error] {e}")
+            with self._lock:
+                if not failed and (utterance.get("interrupted") or self._vad is not None and self._vad.utterance_ended):
+                    # 발화 단위로(또는 listen()이) 닫은 스트림은 재시작이 아니므로 지연 시간에 넣지 않음
+                    self._stats["utterances"] += 1
+                    self._stream_ended_at = None
+                else:
+                    self._stream_ended_at = time.perf_counter()
+                self._stream_ended_by_error = failed
+            if failed and not self._stopping.is_set():
+                time.sleep(RECONNECT_BACKOFF_SEC)
+
+    # ─── 공개 API ───
+    def listen(self, timeout_sec: float = 15, commands: bool = False) -> str:
+        """
+        Wait up to `timeout_sec` for the next final transcript spoken after this call.
+        Returns "" on timeout. Timestamps of the returned utterance are left
+        in `last_marks`. Pass `commands=True` when the answer is expected to
+        be a navigation command, so it may be recognized on-device.
+        """
+        self._commands_expected = commands
+        if self._thread is None:
+            self.start()
+        else:
+            # 지난 listen() 이후 쌓였지만 아직 보내지 않은 오디오는 이번 질문에 대한 답이 아님
+            self._mic.buffer.clear()
+            if self._vad is not None:
+                self._new_turn.set()
+        self.last_marks = {}
+        since = time.monotonic()
+        deadline = since + timeout_sec
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return ""
+            try:
+                arrived_at, speech_start, transcript, marks = self._transcripts.get(timeout=remaining)
+            except queue.Empty:
+                return ""
+            if speech_start is not None and self._vad is not None:
+                current = speech_start >= since
+            else:
+                current = arrived_at >= since + SETTLE_SEC
+            if current:
+                self.last_marks = marks
+                return transcript
+
+    def stats(self) -> dict:
+        with self._lock:
+            data = dict(self._stats)
+            data["restart_latency_sec"] = list(self._stats["restart_latency_sec"])
+            data["reconnect_latency_sec"] = list(self._stats["reconnect_latency_sec"])
+        data["client"] = registry.stats().get("speech")
+        if self._vad is not None:
+            data["vad"] = dict(self._vad.stats)
+        if self._spotter is not None:
+            data["kws"] = self._spotter.stats()
+        if self._mic is not None:
+            data["mic_buffer"] = self._mic.buffer.stats()
+        return data
+
+    def report(self) -> str:
+        data = self.stats()
+
+        def summary(values):
+            if not values:
+                return "n/a"
+            return f"mean {sum(values) / len(values) * 1000:.1f} ms, max {max(values) * 1000:.1f} ms"
+
+        text = (
+            f"{data['streams']} stream(s), {data['finals']} final(s), "
+            f"{data['restarts']} restart(s) [{summary(data['restart_latency_sec'])}], "
+            f"{data['reconnects']} reconnect(s) [{summary(data['reconnect_latency_sec'])}]"
+        )
+        vad = data.get("vad")
+        if vad and vad["bytes_in"]:
+            dropped = 1 - vad["bytes_out"] / vad["bytes_in"]
+            text += f", {data['utterances']} utterance(s), VAD dropped {dropped:.0%} of mic audio"
+        if self._spotter is not None:
+            text += f", {data['local_commands']} command(s) recognized on-device"
+        mic = data.get("mic_buffer")
+        if mic:
+            text += (f", mic buffer peak {mic['high_water_frames'] / RATE:.1f}s"
+                     f" of {mic['capacity_frames'] / RATE:.0f}s")
+            if mic["dropped_frames"]:
+                text += f", dropped {mic['dropped_frames'] / RATE:.1f}s of audio in {mic['overflows']} overflow(s)"
+        return text
@@ -1,26 +1,34 @@
 # stt_tts_test_code.py
 
 import os
-import queue
+import time
 import threading
-import pyaudio
 import wave
-from google.cloud import speech, texttospeech
+from audio_buffer import AudioRingBuffer
+from clients import speech_client, tts_client, speech_module, texttospeech_module
 
 # 오디오 스트림 설정
 RATE = 16000
 CHUNK = int(RATE / 10)  # 100ms
-FORMAT = pyaudio.paInt16
+SAMPLE_WIDTH = 2        # 16-bit (pyaudio.paInt16)
 CHANNELS = 1
+# 스트림마다 잡아 두는 링 버퍼 크기 (초). 인식기가 이보다 오래 밀리면 가장 오래된 오디오부터 버림
+MIC_BUFFER_SEC = float(os.getenv("AICHEF_MIC_BUFFER_SEC", 10))
 
-audio_queue = queue.Queue()
 
-# 마이크에서 들어오는 오디오를 큐에 저장
+def new_audio_buffer() -> AudioRingBuffer:
+    return AudioRingBuffer(int(MIC_BUFFER_SEC * RATE), sample_rate=RATE, frame_bytes=SAMPLE_WIDTH * CHANNELS)
+
+# 마이크에서 들어오는 오디오를 이 스트림의 링 버퍼에 저장
 class MicrophoneStream:
     def __init__(self):
+        import pyaudio  # type: ignore
+
+        self.buffer = new_audio_buffer()
+        self._continue = pyaudio.paContinue
         self.pa = pyaudio.PyAudio()
         self.stream = self.pa.open(
-            format=FORMAT,
+            format=self.pa.get_format_from_width(SAMPLE_WIDTH),
             channels=CHANNELS,
             rate=RATE,
             input=True,
@@ -29,8 +37,8 @@ class MicrophoneStream:
         )
 
     def _callback(self, in_data, frame_count, time_info, status):
-        audio_queue.put(in_data)
-        return (None, pyaudio.paContinue)
+        self.buffer.write(in_data)
+        return (None, self._continue)
 
     def start(self):
         self.stream.start_stream()
@@ -40,22 +48,118 @@ class MicrophoneStream:
         self.stream.stop_stream()
         self.stream.close()
         self.pa.terminate()
-        audio_queue.put(None)
+        self.buffer.close()
         print("[Mic] 녹음 종료")
 
+# WAV 파일을 마이크 대신 링 버퍼로 흘려 보냄 (오디오 장치 없이 재생/측정)
+class WavFileStream:
+    """
+    Drop-in replacement for MicrophoneStream that feeds WAV clips into its
+    own `buffer` in CHUNK-sized pieces, at `speed` x real time (0 = as fast
+    as possible, waiting for buffer space instead of dropping audio). The
+    VAD, request_generator() and SpeechSession then run as they would with
+    a microphone.
+
+    Clips are resampled to RATE and separated by `gap_sec` of silence
+    (also before the first clip). `speech_ended_at` collects, per clip, the
+    perf_counter time at which its last loud sample was "spoken".
+    """
+
+    def __init__(self, paths, speed: float = 1.0, gap_sec: float = 2.0, loud_threshold: int = 500):
+        import numpy as np
+        from keyword_spotter import read_wav
+
+        if isinstance(paths, str):
+            paths = [paths]
+        self.speed = speed
+        gap = np.zeros(int(gap_sec * RATE), dtype=np.int16)
+        pieces, self.speech_end_offsets, pos = [gap], [], len(gap)
+        for path in paths:
+            clip = read_wav(path, RATE)
+            loud = np.flatnonzero(np.abs(clip.astype(np.int32)) > loud_threshold)
+            if loud.size:
+                self.speech_end_offsets.append(pos + int(loud[-1]) + 1)
+            pieces += [clip, gap]
+            pos += len(clip) + len(gap)
+        # 마이크처럼 항상 CHUNK 단위로 전달되도록 끝을 무음으로 채움
+        pieces.append(np.zeros(-pos % CHUNK, dtype=np.int16))
+        self._samples = np.concatenate(pieces)
+        self.buffer = new_audio_buffer()
+        self.duration_sec = len(self._samples) / RATE
+        self.speech_ended_at = []
+        self.chunks = 0
+        self.finished = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        ends = list(self.speech_end_offsets)
+        start = time.perf_counter()
+        for n, offset in enumerate(range(0, len(self._samples), CHUNK)):
+            if self._stopping.is_set():
+                return
+            chunk = self._samples[offset:offset + CHUNK]
+            if self.speed > 0:
+                # 마이크처럼 조각 하나가 다 녹음된 시점에 전달
+                delay = start + (offset + len(chunk)) / RATE / self.speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            else:
+                self.buffer.wait_for_space(len(chunk))
+            self.buffer.write(chunk)
+            self.chunks += 1
+            while ends and ends[0] <= offset + len(chunk):
+                end = ends.pop(0)
+                self.speech_ended_at.append(start + end / RATE / self.speed if self.speed > 0 else time.perf_counter())
+        self.finished.set()
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="wav-stream", daemon=True)
+        self._thread.start()
+        print(f"[Mic] WAV 재생 시작 ({self.duration_sec:.1f}초, {self.speed:g}배속)")
+
+    def stop(self):
+        self._stopping.set()
+        # 먼저 닫아서 빈 공간을 기다리던 재생 스레드를 깨움
+        self.buffer.close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        print("[Mic] WAV 재생 종료")
+
 # Streaming 요청 생성기
-def request_generator():
+def request_generator(buffer: AudioRingBuffer, should_stop=None, vad=None):
+    """
+    마이크 링 버퍼(`buffer`)의 오디오를 CHUNK 단위로 읽어 StreamingRecognizeRequest로 내보냅니다.
+    버퍼가 닫히고 남은 오디오를 다 보내면 끝납니다.
+    `should_stop`을 주면 0.1초마다 확인해서 True가 되면 (버퍼는 비우지 않고) 스트림을 끝냅니다.
+    `vad`(vad.EnergyVAD)를 주면 무음 구간은 보내지 않고, 발화가 끝났다고 판단되면
+    그 자리에서 스트림을 끝내서 인식기가 최종 결과를 바로 돌려주게 합니다.
+    """
+    speech = speech_module()
     while True:
-        chunk = audio_queue.get()
+        if should_stop is not None and should_stop():
+            return
+        # 버퍼를 가리키는 memoryview (복사 없음). 요청에 담을 때만 bytes로 복사
+        chunk = buffer.read(CHUNK, timeout=None if should_stop is None else 0.1)
         if chunk is None:
+            if buffer.closed:
+                return
+            continue
+        if vad is None:
+            yield speech.StreamingRecognizeRequest(audio_content=bytes(chunk))
+            continue
+        for voiced in vad.process(chunk):
+            yield speech.StreamingRecognizeRequest(audio_content=bytes(voiced))
+        if vad.utterance_ended:
             return
-        yield speech.StreamingRecognizeRequest(audio_content=chunk)
 
 # (이 파일만으로는 콘솔 STT+TTS 전체 흐름이 동작함)
 # 필요한 경우 하단의 예제 함수를 참조하세요.
 
-def streaming_transcribe_and_synthesize():
-    stt_client = speech.SpeechClient()
+def streaming_transcribe_and_synthesize(mic):
+    speech = speech_module()
+    texttospeech = texttospeech_module()
+    stt_client = speech_client()
     config = speech.RecognitionConfig(
         encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
         sample_rate_hertz=RATE,
@@ -68,10 +172,10 @@ def streaming_transcribe_and_synthesize():
     )
     responses = stt_client.streaming_recognize(
         config=streaming_config,
-        requests=request_generator()
+        requests=request_generator(mic.buffer)
     )
 
-    tts_client = texttospeech.TextToSpeechClient()
+    tts = tts_client()
     for resp in responses:
         for result in resp.results:
             if result.is_final:
@@ -86,7 +190,7 @@ def streaming_transcribe_and_synthesize():
                 audio_config = texttospeech.AudioConfig(
                     audio_encoding=texttospeech.AudioEncoding.LINEAR16
                 )
-                tts_resp = tts_client.synthesize_speech(
+                tts_resp = tts.synthesize_speech(
                     input=synthesis_input,
                     voice=voice,
                     audio_config=audio_config
@@ -102,7 +206,7 @@ if __name__ == '__main__':
     mic = MicrophoneStream()
     try:
         mic.start()
-        streaming_transcribe_and_synthesize()
+        streaming_transcribe_and_synthesize(mic)
     except KeyboardInterrupt:
         pass
     finally:
@@ -0,0 +1,11 @@
+# tests/conftest.py
+#
+# 저장소 루트의 모듈을 그대로 가져올 수 있게 하고, 레시피 디스크 캐시는 임시 폴더를 쓰게 합니다.
+#   python -m pytest tests
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("AICHEF_RECIPE_CACHE_DIR", tempfile.mkdtemp(prefix="aichef_test_cache_"))
@@ -0,0 +1,117 @@
+# tests/test_intents.py
+#
+# 표 기반 명령어 사례로 IntentMatcher를 검증합니다.
+# 같은 표로 기존 any(k in cmd ...) 체인과 정확도/속도를 비교하는 것은 benchmarks/bench_intents.py
+
+from intent_matcher import navigation_matcher, ready_matcher
+
+# (발화, 기대 의도)  — None은 알 수 없는 명령
+NAVIGATION_CASES = [
+    ("다음", "next"),
+    ("다음 단계", "next"),
+    ("다음 단계로 가자", "next"),
+    ("넥스트", "next"),
+    ("next", "next"),
+    ("Next step, please.", "next"),
+    ("다음에 다시 알려줘", "repeat"),
+    ("다시 알려줘", "repeat"),
+    ("반복해줘", "repeat"),
+    ("뭐라고?", "repeat"),
+    ("repeat", "repeat"),
+    ("say that again", "repeat"),
+    ("repeet", "repeat"),
+    ("이전", "previous"),
+    ("이전 단계로 돌아가", "previous"),
+    ("previous step", "previous"),
+    ("go back", "previous"),
+    ("previus", "previous"),
+    ("재료 확인", "ingredients"),
+    ("재료 뭐였지?", "ingredients"),
+    ("what ingredients do I need", "ingredients"),
+    ("ingrediants", "ingredients"),
+    ("도구 목록", "tools"),
+    ("list tools", "tools"),
+    ("현재 단계", "current_step"),
+    ("지금 몇단계야", "current_step"),
+    ("which step am I on", "current_step"),
+    ("what stepp", "current_step"),
+    ("요리 종료", "finish"),
+    ("그만할래", "finish"),
+    ("stop", "finish"),
+    ("exit", "finish"),
+    ("스탑", "finish"),
+    ("", None),
+    ("음", None),
+    ("i want to cook", None),
+    ("the oven is hot", None),
+    ("textbook", None),
+    # 되돌리기 어려운 명령은 단어 경계 확인, 뒤 말을 꾸미는 경우 제외 (오타 보정 없음)
+    ("exist", None),
+    ("text me", None),
+    ("the exit sign", None),
+    ("next door neighbor called", None),
+    ("다음에 할게", None),
+    ("그다음 재료는 뭐야", None),
+    ("ok next step please", "next"),
+    ("다음으로 넘어가자", "next"),
+    ("종료해줘", "finish"),
+    ("다음 단계 알려줘", "next"),
+    ("다음 단계 부탁해요", "next"),
+    ("다음 단계로 넘어가 줘", "next"),
+    ("the next one", "next"),
+    ("next time", None),
+    ("stop cooking", "finish"),
+    ("finish cooking", "finish"),
+    ("요리 끝", "finish"),
+]
+
+READY_CASES = [
+    ("시작", "start"),
+    ("준비됐어", "start"),
+    ("준비 됐어요", "start"),
+    ("네", "start"),
+    ("ok", "start"),
+    ("okay let's go", "start"),
+    ("yes please", "start"),
+    ("start", "start"),
+    ("cookbook", None),
+    ("다음에 다시 알려줘", "later"),
+    ("나중에 시작할게", "later"),
+    ("wait a moment", "later"),
+    ("next", "start"),
+    ("다음", "start"),
+    ("시작해", "start"),
+    ("시작할게", "start"),
+    ("응 시작해", "start"),
+    ("네 준비됐어요", "start"),
+    ("시작해주세요", "start"),
+    ("yes I am ready", "start"),
+    ("ready", "start"),
+    ("I'm not ready yet", "later"),
+    ("next time", None),
+    ("the next door neighbor called", None),
+]
+
+
+def mismatches(matcher, cases: list) -> list:
+    return [(text, expected, matcher.intent(text)) for text, expected in cases if matcher.intent(text) != expected]
+
+
+def test_navigation_intents():
+    assert mismatches(navigation_matcher, NAVIGATION_CASES) == []
+
+
+def test_ready_intents():
+    assert mismatches(ready_matcher, READY_CASES) == []
+
+
+def test_exact_match_is_preferred_over_fuzzy():
+    found = navigation_matcher.match("previous step")
+    assert found.intent == "previous" and not found.fuzzy
+    found = navigation_matcher.match("previus")
+    assert found.intent == "previous" and found.fuzzy
+
+
+def test_strict_intents_never_match_fuzzily():
+    assert navigation_matcher.intent("stap") is None
+    assert navigation_matcher.intent("finsh") is None
@@ -0,0 +1,96 @@
+# tests/test_recipe_parser.py
+#
+# 통합 레시피 파서의 동작 검증: 전체 파싱과 스트리밍 파싱이 같은 결과를 내는지, 두 제목 형식,
+# 재료/도구 섹션의 소제목/설명 줄 제외. 기존 파서와의 속도 비교는 benchmarks/bench_parser.py
+
+import os
+import glob
+
+import pytest
+
+from recipe_parser import IncrementalRecipeParser, parse_structured_recipe
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "corpus")
+CORPUS = sorted(glob.glob(os.path.join(CORPUS_DIR, "*.txt")))
+
+
+def read(name: str) -> str:
+    with open(os.path.join(CORPUS_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def parse_streamed(text: str, chunk_size: int):
+    parser = IncrementalRecipeParser()
+    events = []
+    for i in range(0, len(text), chunk_size):
+        events.extend(parser.feed(text[i:i + chunk_size]))
+    events.extend(parser.close())
+    return parser.recipe, events
+
+
+@pytest.mark.parametrize("chunk_size", [1, 16, 4096])
+@pytest.mark.parametrize("path", CORPUS, ids=os.path.basename)
+def test_streamed_parse_matches_full_parse(path, chunk_size):
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    recipe, _ = parse_streamed(text, chunk_size)
+    assert recipe == parse_structured_recipe(text)
+
+
+def test_bracket_headings():
+    recipe = parse_structured_recipe(read("en_carbonara.txt"))
+    assert recipe["dish_name"] == "Spaghetti Carbonara"
+    assert recipe["total_time"] == "25 minutes"
+    assert recipe["ingredients"][0] == "Spaghetti (200g)"
+    assert recipe["tools"] == ["Large pot", "Frying pan", "Mixing bowl", "Whisk"]
+    assert len(recipe["steps"]) == 6
+    assert recipe["tips"].startswith("- Never return the pan")
+
+
+def test_bold_headings():
+    recipe = parse_structured_recipe(read("ko_kimchi_jjim.txt"))
+    assert recipe["dish_name"] == "김치찜"
+    assert recipe["total_time"] == "약 1시간"
+    assert recipe["ingredients"][0] == "묵은지 (1/2포기)"
+    assert recipe["steps"][-1] == "대파를 넣고 2분 더 끓인 뒤 밥과 함께 내 주세요."
+    assert recipe["tips"] == "김치가 많이 시어 있을수록 맛이 깊어집니다. 설탕으로 신맛을 조절하세요."
+
+
+def test_list_sections_keep_only_items():
+    recipe = parse_structured_recipe(read("en_japchae_subheaders.txt"))
+    assert recipe["ingredients"] == [
+        "Sweet potato starch noodles (200g)",
+        "Sesame oil (1 tablespoon)",
+        "Soy sauce (4 tablespoons)",
+        "Sugar (2 tablespoons)",
+        "Garlic, minced (2 cloves)",
+    ]
+    assert recipe["tools"] == ["Large pot", "Wok or large frying pan"]
+    assert recipe["tips"] == "Cut the noodles with scissors so they are easier to eat."
+
+
+def test_numbered_items_in_list_sections():
+    recipe = parse_structured_recipe("【Ingredients】:\n1. Rice (2 cups)\n2) Water\n【Steps】:\n1. Cook.\n")
+    assert recipe["ingredients"] == ["Rice (2 cups)", "Water"]
+    assert recipe["steps"] == ["Cook."]
+
+
+def test_streamed_events():
+    _, events = parse_streamed(read("en_japchae_subheaders.txt"), 16)
+    names = [name for name, _ in events]
+    assert names[:2] == ["dish_name", "total_time"]
+    assert names.count("ingredient") == 5 and names.count("tool") == 2 and names.count("step") == 4
+    assert names[-1] == "tips"
+    ingredients = [payload for name, payload in events if name == "ingredient"]
+    assert [payload["index"] for payload in ingredients] == [0, 1, 2, 3, 4]
+    assert ingredients[2]["text"] == "Soy sauce (4 tablespoons)"
+
+
+def test_defaults_fill_missing_fields():
+    recipe = parse_structured_recipe("", defaults={"dish_name": "정보 없음", "tips": "특별한 팁 없음"})
+    assert recipe["dish_name"] == "정보 없음"
+    assert recipe["tips"] == "특별한 팁 없음"
+    assert recipe["steps"] == []
+
+    recipe = parse_structured_recipe(read("ko_doenjang_jjigae.txt"), defaults={"dish_name": "정보 없음"})
+    assert recipe["dish_name"] == "된장찌개"
@@ -0,0 +1,73 @@
+# tests/test_singleflight.py
+#
+# 같은 요리에 대한 동시 요청이 느린 가짜 Gemini 호출 한 번을 공유하는지 확인합니다.
+# 처리 시간 측정은 benchmarks/bench_singleflight.py
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import recipe_core
+from clients import registry
+from resilience import Guard
+
+
+class FakeSlowGenai:
+    """
+    Stand-in for the `genai` module: every generate_content call sleeps
+    `latency_sec` and is counted.
+    """
+
+    def __init__(self, latency_sec: float):
+        self.latency_sec = latency_sec
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def GenerativeModel(self, model_name: str):
+        return self
+
+    def generate_content(self, prompt: str):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency_sec)
+        return type("FakeResponse", (), {"text": "【Dish Name】: Kimchi Jjim\n【Steps】:\n1. Simmer.\n"})()
+
+
+@pytest.fixture
+def fake_genai(monkeypatch):
+    fake = FakeSlowGenai(latency_sec=0.2)
+    monkeypatch.setenv("GEMINI_API_KEY", "fake-key")
+    monkeypatch.setattr(recipe_core, "genai", fake)
+    # 가짜 백엔드에는 할당량이 없으므로 Gemini 호출 속도를 제한하지 않음
+    monkeypatch.setattr(recipe_core, "gemini_guard", Guard("gemini", max_retries=0))
+    registry.reset()   # 이전 백엔드로 만든 모델을 재사용하지 않도록
+    recipe_core.recipe_cache.clear()
+    yield fake
+    registry.reset()
+    recipe_core.recipe_cache.clear()
+
+
+def test_concurrent_requests_share_one_upstream_call(fake_genai):
+    n = 20
+    # 대소문자/공백이 달라도 같은 요리로 정규화되어야 함
+    dishes = ["kimchi jjim", "Kimchi Jjim", "  kimchi   jjim "]
+    barrier = threading.Barrier(n)
+
+    def request(i):
+        barrier.wait()
+        return recipe_core.generate_recipe(dishes[i % len(dishes)])
+
+    with ThreadPoolExecutor(max_workers=n) as pool:
+        results = list(pool.map(request, range(n)))
+
+    assert fake_genai.calls == 1
+    assert len(set(results)) == 1
+    assert not results[0].startswith("Error")
+
+
+def test_later_request_is_served_from_cache(fake_genai):
+    first = recipe_core.generate_recipe("kimchi jjim")
+    assert recipe_core.generate_recipe("Kimchi Jjim") == first
+    assert fake_genai.calls == 1
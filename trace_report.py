@@ -0,0 +1,108 @@
+# trace_report.py
+#
+# 음성 비서 턴 기록(tracing.TurnTracer가 쓴 JSONL)을 여러 세션에 걸쳐 모아
+# 단계별 p50/p95와 전체 지연에서 차지하는 비중을 출력합니다.
+#   python trace_report.py [파일 또는 디렉터리 ...] [--intent next] [--assistant recipe_step_by_step]
+
+import os
+import sys
+import json
+import math
+import glob
+import argparse
+from tracing import STAGES, TRACE_DIR
+
+
+def percentile(values: list, p: float) -> float:
+    # nearest-rank
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def trace_files(paths: list) -> list:
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "*.jsonl"))))
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            print(f"[Trace] Not found: {path}", file=sys.stderr)
+    return files
+
+
+def load_turns(files: list) -> list:
+    turns = []
+    for path in files:
+        with open(path, encoding="utf-8") as f:
+            for lineno, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    turns.append(json.loads(line))
+                except json.JSONDecodeError:
+                    print(f"[Trace] Skipping malformed line {path}:{lineno}", file=sys.stderr)
+    return turns
+
+
+def report(turns: list):
+    sessions = {turn["session"] for turn in turns}
+    heard = sum(1 for turn in turns if turn.get("transcript"))
+    print(f"{len(turns)} turn(s) from {len(sessions)} session(s), {heard} with recognized speech")
+
+    per_stage = {name: [] for name, _, _ in STAGES}
+    for turn in turns:
+        for name, value in turn.get("stages_ms", {}).items():
+            if name in per_stage:
+                per_stage[name].append(value)
+
+    totals = per_stage["total"]
+    total_mean = sum(totals) / len(totals) if totals else 0.0
+    print(f"{'stage':<14}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}{'share':>8}")
+    dominant = None
+    for name, _, _ in STAGES:
+        values = per_stage[name]
+        if not values:
+            print(f"{name:<14}{0:>6}{'-':>10}{'-':>10}{'-':>10}{'-':>8}")
+            continue
+        mean = sum(values) / len(values)
+        share = f"{mean / total_mean:.0%}" if total_mean and name != "total" else ""
+        print(f"{name:<14}{len(values):>6}{percentile(values, 50):>10.1f}{percentile(values, 95):>10.1f}"
+              f"{mean:>10.1f}{share:>8}")
+        if name != "total" and (dominant is None or mean > dominant[1]):
+            dominant = (name, mean)
+    if dominant is not None:
+        print(f"dominant stage: {dominant[0]} (mean {dominant[1]:.1f} ms)")
+
+    sources = {}
+    for turn in turns:
+        if turn.get("stt_source"):
+            sources[turn["stt_source"]] = sources.get(turn["stt_source"], 0) + 1
+    if sources:
+        print("stt source: " + ", ".join(f"{k} {v}" for k, v in sorted(sources.items())))
+    failed = sum(1 for turn in turns if turn.get("error"))
+    if failed:
+        print(f"{failed} turn(s) without audio (TTS failed)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage latency of voice assistant turns.")
+    parser.add_argument("paths", nargs="*", help=f"JSONL files or directories (default: {TRACE_DIR})")
+    parser.add_argument("--intent", help="only turns with this intent (e.g. next)")
+    parser.add_argument("--assistant", help="only this assistant (recipe_step_by_step, recipe_voice_assistant)")
+    args = parser.parse_args()
+
+    files = trace_files(args.paths or [TRACE_DIR])
+    turns = load_turns(files)
+    if args.intent:
+        turns = [turn for turn in turns if turn.get("intent") == args.intent]
+    if args.assistant:
+        turns = [turn for turn in turns if turn.get("assistant") == args.assistant]
+    if not turns:
+        print("No traced turns found.")
+        return
+    report(turns)
+
+
+if __name__ == "__main__":
+    main()
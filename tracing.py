@@ -0,0 +1,157 @@
+# tracing.py
+#
+# 음성 비서의 대화 한 턴(사용자가 말을 끝낸 순간 → 응답 음성이 들리기 시작한 순간)을 단계별 시각으로 기록합니다.
+# 세션마다 AICHEF_TRACE_DIR 아래에 JSONL 파일 하나를 만들고, 턴마다 한 줄씩 추가합니다.
+# 여러 세션을 모아 단계별 p50/p95를 보려면: python trace_report.py
+
+import os
+import json
+import time
+import threading
+
+# 빈 문자열로 설정하면 기록하지 않음
+TRACE_DIR = os.getenv("AICHEF_TRACE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".traces"))
+
+# 한 턴에서 기록하는 시점 (발생 순서)
+MARKS = ("speech_end", "vad_end", "stt_final", "intent", "tts_request", "tts_first_byte", "playback_start")
+
+# 보고서에 쓰는 단계: (이름, 시작 시점, 끝 시점)
+STAGES = (
+    ("vad_endpoint", "speech_end", "vad_end"),        # 말이 끝난 뒤 VAD가 발화 끝으로 판단하기까지 (무음 대기)
+    ("stt", "vad_end", "stt_final"),                  # 마지막 오디오를 보낸 뒤 최종 인식 결과까지
+    ("intent", "stt_final", "intent"),                # 인식 결과 → 명령 판단
+    ("dispatch", "intent", "tts_request"),            # 명령 판단 → 응답 음성 요청
+    ("tts", "tts_request", "tts_first_byte"),         # 합성(캐시/프리페치면 거의 0) → 재생할 PCM 준비
+    ("playback", "tts_first_byte", "playback_start"),  # 재생 대기열 → 스피커 출력 시작
+    ("total", "speech_end", "playback_start"),        # 사용자가 느끼는 전체 지연
+)
+
+
+def stage_durations(marks: dict) -> dict:
+    """
+    Stage durations in ms for the stages whose start and end marks were both recorded.
+    """
+    durations = {}
+    for name, start, end in STAGES:
+        if marks.get(start) is not None and marks.get(end) is not None:
+            durations[name] = round((marks[end] - marks[start]) * 1000, 1)
+    return durations
+
+
+class TurnTracer:
+    """
+    Records one JSONL line per dialogue turn of a voice assistant session.
+
+    A turn starts with `begin()` once STT returns (timestamps from
+    `SpeechSession.last_marks`), gets its `intent()`, and ends when the first
+    reply is spoken through a function wrapped with `speaker()`. Marks are
+    `time.perf_counter()` values and are written relative to the turn's first mark.
+    """
+
+    def __init__(self, assistant: str, trace_dir: str = TRACE_DIR):
+        self.assistant = assistant
+        self.session = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+        self.path = None
+        if trace_dir:
+            os.makedirs(trace_dir, exist_ok=True)
+            self.path = os.path.join(trace_dir, f"{assistant}-{self.session}.jsonl")
+        self.turns = 0
+        self._turn = None
+        self._pending = set()      # 재생 시작을 기다리는 턴의 PlaybackHandle
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def begin(self, transcript: str, marks: dict = None):
+        """
+        Start a turn for `transcript` ("" when nothing was heard); ends any unfinished one.
+        """
+        self.end()
+        marks = dict(marks or {})
+        source = marks.pop("stt_source", None)
+        marks = {name: at for name, at in marks.items() if at is not None}
+        with self._lock:
+            self._turn = {"transcript": transcript, "stt_source": source, "intent": None, "marks": marks}
+
+    def intent(self, intent: str):
+        with self._lock:
+            if self._turn is not None:
+                self._turn["intent"] = intent
+                self._turn["marks"]["intent"] = time.perf_counter()
+
+    def speaker(self, speak):
+        """
+        Wrap `speak(text, ...)` (tts_speak, SpeechPrefetcher.speak) so the first
+        reply after `begin()` records its TTS request, first audio byte and
+        playback start from the returned PlaybackHandle, and ends the turn.
+        Playback start is taken from a callback, so non-blocking calls
+        (block=False) are not held up; the turn is written once it starts.
+        """
+        def traced_speak(text: str, *args, **kwargs):
+            with self._lock:
+                turn, self._turn = self._turn, None
+            if turn is None:
+                return speak(text, *args, **kwargs)
+            number = self._number()
+            turn["marks"]["tts_request"] = time.perf_counter()
+            handle = speak(text, *args, **kwargs)
+            if handle is None:
+                turn["error"] = "tts_failed"
+                self._write(number, turn)
+                return handle
+
+            def started(handle):
+                if handle.error is not None:
+                    turn["error"] = "tts_failed"
+                else:
+                    # 합성이 끝나 PCM이 준비된 시점 = 첫 오디오 바이트
+                    turn["marks"]["tts_first_byte"] = handle.ready_at
+                    turn["marks"]["playback_start"] = handle.started_at
+                self._write(number, turn)
+                with self._lock:
+                    self._pending.discard(handle)
+
+            with self._lock:
+                self._pending.add(handle)
+            handle.on_started(started)
+            return handle
+        return traced_speak
+
+    def _number(self) -> int:
+        with self._lock:
+            self.turns += 1
+            return self.turns
+
+    def end(self):
+        with self._lock:
+            turn, self._turn = self._turn, None
+        if turn is not None:
+            self._write(self._number(), turn)
+
+    def _write(self, number: int, turn: dict):
+        marks = turn.pop("marks")
+        origin = min(marks.values()) if marks else 0.0
+        record = {
+            "session": self.session,
+            "assistant": self.assistant,
+            "turn": number,
+            "time": round(time.time(), 3),
+            **turn,
+            "marks_ms": {name: round((marks[name] - origin) * 1000, 1) for name in MARKS if marks.get(name) is not None},
+            "stages_ms": stage_durations(marks),
+        }
+        if self.path is None:
+            return
+        try:
+            with self._write_lock, open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"[Trace Error] Failed to write {self.path}: {e}")
+
+    def close(self, timeout: float = 5.0):
+        self.end()
+        with self._lock:
+            pending = list(self._pending)
+        for handle in pending:
+            handle.started.wait(timeout)
+        if self.path is not None and self.turns:
+            print(f"[Trace] {self.turns} turn(s) written to {self.path}")
@@ -0,0 +1,111 @@
+# tts_cache.py
+
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+
+# ——— TTS 캐시 설정 (환경 변수로 조정 가능) ———
+TTS_CACHE_DIR = os.getenv(
+    "AICHEF_TTS_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".tts_cache")
+)
+TTS_CACHE_MAX_BYTES = int(os.getenv("AICHEF_TTS_CACHE_BYTES", 128 * 1024 * 1024))   # 128 MB
+
+
+def make_tts_key(text: str, language_code: str, voice: str, encoding: str) -> str:
+    raw = "\x1f".join([text, language_code, voice, encoding])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """
+    On-disk cache of synthesized audio, one file per (text, language, voice, encoding).
+    Least recently played files are removed once the directory exceeds `max_bytes`.
+    """
+
+    def __init__(self, cache_dir: str = TTS_CACHE_DIR, max_bytes: int = TTS_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index = OrderedDict()   # key -> size, least recently used first
+        self._bytes = 0
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._load_index()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.pcm")
+
+    def _load_index(self):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            entries = [
+                (e.stat().st_mtime, e.name[:-len(".pcm")], e.stat().st_size)
+                for e in os.scandir(self.cache_dir)
+                if e.is_file() and e.name.endswith(".pcm")
+            ]
+        except OSError as e:
+            print(f"[TTS Cache Error] Cannot read cache directory {self.cache_dir}: {e}")
+            return
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._bytes += size
+
+    def get(self, key: str):
+        """
+        Return cached audio bytes for `key`, or None on a miss.
+        """
+        with self._lock:
+            if key not in self._index:
+                self._counters["misses"] += 1
+                return None
+            try:
+                with open(self._path(key), "rb") as f:
+                    audio = f.read()
+                os.utime(self._path(key))
+            except OSError:
+                self._bytes -= self._index.pop(key, 0)
+                self._counters["misses"] += 1
+                return None
+            self._index.move_to_end(key)
+            self._counters["hits"] += 1
+            return audio
+
+    def contains(self, key: str) -> bool:
+        with self._lock:
+            return key in self._index
+
+    def put(self, key: str, audio: bytes):
+        size = len(audio)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            tmp_path = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with open(tmp_path, "wb") as f:
+                    f.write(audio)
+                os.replace(tmp_path, self._path(key))
+            except OSError as e:
+                print(f"[TTS Cache Error] Failed to write cache entry: {e}")
+                return
+            self._bytes -= self._index.pop(key, 0)
+            self._index[key] = size
+            self._bytes += size
+            self._counters["stores"] += 1
+            while self._bytes > self.max_bytes and self._index:
+                evicted_key, evicted_size = self._index.popitem(last=False)
+                self._bytes -= evicted_size
+                self._counters["evictions"] += 1
+                try:
+                    os.remove(self._path(evicted_key))
+                except OSError:
+                    pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            data = dict(self._counters)
+            data["entries"] = len(self._index)
+            data["bytes"] = self._bytes
+        lookups = data["hits"] + data["misses"]
+        data["hit_ratio"] = round(data["hits"] / lookups, 4) if lookups else 0.0
+        return data
@@ -0,0 +1,122 @@
+# vad.py
+
+import time
+from collections import deque
+import numpy as np
+
+
+class EnergyVAD:
+    """
+    Energy / zero-crossing voice activity detector for 16-bit mono PCM chunks.
+
+    Each chunk is split into short frames. A frame counts as speech when its
+    energy is `margin_db` above the adaptive noise floor, and frames with a
+    high zero-crossing rate (hiss such as a range hood) need an extra
+    `noise_zcr_margin_db`. While no one is speaking, chunks are held in a
+    short pre-roll buffer instead of being sent. When speech starts, the
+    pre-roll is released so the first syllable is not clipped. After
+    `end_silence_ms` without speech, `process()` sets `utterance_ended`.
+    `last_voiced_at` is the perf_counter time at which the last chunk with
+    speech was processed, i.e. the measured end of speech (chunk resolution).
+    """
+
+    def __init__(self, sample_rate: int = 16000, frame_ms: int = 20, margin_db: float = 10.0,
+                 min_speech_db: float = -50.0, noise_zcr: float = 0.35, noise_zcr_margin_db: float = 6.0,
+                 min_speech_frames: int = 2, preroll_ms: int = 300, end_silence_ms: int = 700):
+        self.sample_rate = sample_rate
+        self.frame_len = sample_rate * frame_ms // 1000
+        self.margin_db = margin_db
+        self.min_speech_db = min_speech_db
+        self.noise_zcr = noise_zcr
+        self.noise_zcr_margin_db = noise_zcr_margin_db
+        self.min_speech_frames = min_speech_frames
+        self.preroll_ms = preroll_ms
+        self.end_silence_ms = end_silence_ms
+
+        self.noise_floor_db = None
+        self.in_speech = False
+        self.utterance_ended = False
+        self.last_voiced_at = None
+        self._silence_ms = 0.0
+        self._preroll = deque()
+        self._preroll_ms = 0.0
+        self.stats = {"chunks_in": 0, "chunks_out": 0, "bytes_in": 0, "bytes_out": 0, "utterances": 0}
+
+    def reset(self):
+        self.in_speech = False
+        self.utterance_ended = False
+        self._silence_ms = 0.0
+        self._preroll.clear()
+        self._preroll_ms = 0.0
+
+    # ─── 프레임 특징 ───
+    def _frame_features(self, samples: np.ndarray):
+        n_frames = max(1, len(samples) // self.frame_len)
+        frames = samples[:n_frames * self.frame_len].reshape(n_frames, -1) if len(samples) >= self.frame_len \
+            else samples.reshape(1, -1)
+        x = frames.astype(np.float32) / 32768.0
+        rms = np.sqrt(np.mean(x * x, axis=1) + 1e-12)
+        energy_db = 20.0 * np.log10(rms)
+        signs = np.signbit(frames)
+        zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+        return energy_db, zcr
+
+    def is_speech(self, chunk: bytes) -> bool:
+        samples = np.frombuffer(chunk, dtype=np.int16)
+        if samples.size == 0:
+            return False
+        energy_db, zcr = self._frame_features(samples)
+
+        if self.noise_floor_db is None:
+            self.noise_floor_db = float(np.min(energy_db))
+        threshold = np.maximum(self.noise_floor_db + self.margin_db, self.min_speech_db)
+        threshold = np.where(zcr > self.noise_zcr, threshold + self.noise_zcr_margin_db, threshold)
+        voiced = int(np.count_nonzero(energy_db > threshold)) >= min(self.min_speech_frames, len(energy_db))
+
+        # 말하지 않는 동안에만 잡음 바닥을 천천히 따라감 (갑자기 조용해지면 빠르게 내려감)
+        if not voiced:
+            quietest = float(np.min(energy_db))
+            rate = 0.5 if quietest < self.noise_floor_db else 0.05
+            self.noise_floor_db += rate * (quietest - self.noise_floor_db)
+        return voiced
+
+    # ─── 스트림 처리 ───
+    def process(self, chunk: bytes) -> list:
+        """
+        Feed one mic chunk; return the chunks that should be sent to the recognizer now.
+        """
+        chunk_ms = len(chunk) / 2 / self.sample_rate * 1000.0
+        self.stats["chunks_in"] += 1
+        self.stats["bytes_in"] += len(chunk)
+        self.utterance_ended = False
+        voiced = self.is_speech(chunk)
+        if voiced:
+            self.last_voiced_at = time.perf_counter()
+
+        if not self.in_speech:
+            if not voiced:
+                # 조각은 마이크 링 버퍼를 가리키는 memoryview일 수 있으므로 보관할 때만 복사
+                self._preroll.append((bytes(chunk), chunk_ms))
+                self._preroll_ms += chunk_ms
+                while self._preroll and self._preroll_ms - self._preroll[0][1] >= self.preroll_ms:
+                    self._preroll_ms -= self._preroll.popleft()[1]
+                return []
+            self.in_speech = True
+            self._silence_ms = 0.0
+            out = [c for c, _ in self._preroll] + [chunk]
+            self._preroll.clear()
+            self._preroll_ms = 0.0
+        else:
+            out = [chunk]
+            if voiced:
+                self._silence_ms = 0.0
+            else:
+                self._silence_ms += chunk_ms
+                if self._silence_ms >= self.end_silence_ms:
+                    self.in_speech = False
+                    self.utterance_ended = True
+                    self.stats["utterances"] += 1
+
+        self.stats["chunks_out"] += len(out)
+        self.stats["bytes_out"] += sum(len(c) for c in out)
+        return out